@@ -0,0 +1,6 @@
+"""
+Бенчмарки Excel-пайплайна: генератор синтетических таблиц и замер этапов.
+
+Запуск из папки Excel/:
+    python -m benchmarks.run_benchmarks
+"""
@@ -0,0 +1,305 @@
+"""
+Замер этапов Excel-пайплайна на синтетических таблицах разного размера.
+
+Для каждого размера генерируется таблица (benchmarks.workbook_generator) и отдельно
+замеряются: чтение листа (_read_shipments_sheet), ExcelParser.parse,
+aggregate_product_sizes, apply_latest_prices, build_catalog (те же размеры и цены
+одним проходом), validate_generated_outputs
+и write_json_atomic. Время — лучшее из --repeat запусков, пиковая память —
+отдельный запуск под tracemalloc (он сам замедляет код и не смешивается с таймингом).
+
+Результат сравнивается с benchmarks/baseline.json: этап считается регрессией,
+если он медленнее базы больше чем на --tolerance или потребляет больше памяти
+больше чем на --memory-tolerance. Код выхода 1 при регрессии.
+База зависит от машины: обновляйте её на той же машине (--update-baseline).
+
+Запуск из папки Excel/:
+    python -m benchmarks.run_benchmarks --sizes small,medium
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.workbook_generator import WorkbookSize, generate_workbook
+from catalog_builder import build_catalog
+from catalog_pricing import apply_latest_prices
+from data_validator import validate_generated_outputs
+from excel_parser import ExcelParser
+from json_storage import load_json_file, write_json_atomic
+from pipeline_api import build_meta
+from utils import aggregate_product_sizes
+from workbook_readers import READER_PANDAS, READERS
+
+if sys.platform == "win32":
+    import io
+
+    try:
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
+        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+    except AttributeError:
+        pass
+
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+
+SIZES: Dict[str, WorkbookSize] = {
+    "small": WorkbookSize(years=1, shipments_per_year=10, items_per_shipment=5),
+    "medium": WorkbookSize(years=2, shipments_per_year=50, items_per_shipment=8),
+    "large": WorkbookSize(years=3, shipments_per_year=150, items_per_shipment=10),
+}
+
+STAGE_READ_SHEET = "read_sheet"
+STAGE_PARSE = "parse"
+STAGE_AGGREGATE_SIZES = "aggregate_product_sizes"
+STAGE_PRICING = "apply_latest_prices"
+STAGE_BUILD_CATALOG = "build_catalog"
+STAGE_VALIDATION = "validate_generated_outputs"
+STAGE_WRITE_JSON = "write_json_atomic"
+
+STAGES = (
+    STAGE_READ_SHEET,
+    STAGE_PARSE,
+    STAGE_AGGREGATE_SIZES,
+    STAGE_PRICING,
+    STAGE_BUILD_CATALOG,
+    STAGE_VALIDATION,
+    STAGE_WRITE_JSON,
+)
+
+# Единица пропускной способности этапа: строки листа или позиции поставок
+STAGE_UNITS = {
+    STAGE_READ_SHEET: "rowCount",
+    STAGE_PARSE: "rowCount",
+    STAGE_AGGREGATE_SIZES: "itemCount",
+    STAGE_PRICING: "itemCount",
+    STAGE_BUILD_CATALOG: "itemCount",
+    STAGE_VALIDATION: "itemCount",
+    STAGE_WRITE_JSON: "itemCount",
+}
+UNIT_LABELS = {"rowCount": "строк/s", "itemCount": "позиций/s"}
+
+# Разница меньше миллисекунды — шум таймера, а не регрессия
+MIN_SECONDS_DELTA = 0.001
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Tuple[float, int]:
+    """Возвращает (лучшее время из repeat запусков, пик памяти tracemalloc в байтах)."""
+    durations = []
+    # Как timeit: сборщик мусора не должен случайно попадать в отдельные запуски
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            fn()
+            durations.append(time.perf_counter() - started_at)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(durations), peak
+
+
+def _quiet(fn: Callable[[], Any]) -> Callable[[], Any]:
+    """Глушит печать парсера и каталога, чтобы она не попадала в замер и отчёт."""
+    def run():
+        with redirect_stdout(StringIO()):
+            return fn()
+    return run
+
+
+def benchmark_size(size: WorkbookSize, work_dir: Path, reader: str, repeat: int, seed: int = 0) -> Dict[str, Any]:
+    """Генерирует таблицу размера size и замеряет все этапы."""
+    excel_file = work_dir / "benchmark.xlsx"
+    counts = generate_workbook(excel_file, size, seed=seed)
+
+    def read_sheet():
+        _, rows = ExcelParser(str(excel_file), [], reader=reader)._read_shipments_sheet()
+        for _ in rows:
+            pass
+
+    products: List[Dict[str, Any]] = []
+
+    def parse():
+        products.clear()
+        return ExcelParser(str(excel_file), products, reader=reader).parse()
+
+    shipments = _quiet(parse)()
+    products_data = {"products": products}
+    meta = build_meta()
+    output_dir = work_dir / "data"
+    jpg_dir = work_dir / "jpg"
+    jpg_dir.mkdir(exist_ok=True)
+
+    def write_json():
+        write_json_atomic(output_dir / "shipments.json", shipments)
+        write_json_atomic(output_dir / "products.json", products_data)
+
+    stage_functions = {
+        STAGE_READ_SHEET: read_sheet,
+        STAGE_PARSE: _quiet(parse),
+        STAGE_AGGREGATE_SIZES: lambda: aggregate_product_sizes(shipments, products),
+        STAGE_PRICING: lambda: apply_latest_prices(products_data, shipments),
+        STAGE_BUILD_CATALOG: lambda: build_catalog(products_data, shipments, jpg_dir),
+        STAGE_VALIDATION: lambda: validate_generated_outputs(shipments, products_data, meta),
+        STAGE_WRITE_JSON: write_json,
+    }
+
+    stages: Dict[str, Dict[str, Any]] = {}
+    for stage in STAGES:
+        seconds, peak_bytes = measure(stage_functions[stage], repeat)
+        units = counts[STAGE_UNITS[stage]]
+        stages[stage] = {
+            "seconds": round(seconds, 6),
+            "peakBytes": peak_bytes,
+            "throughput": round(units / seconds, 1) if seconds > 0 else None,
+        }
+
+    return {
+        "workbook": {
+            "years": size.years,
+            "shipmentsPerYear": size.shipments_per_year,
+            "itemsPerShipment": size.items_per_shipment,
+            **counts,
+        },
+        "stages": stages,
+    }
+
+
+def compare_with_baseline(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    memory_tolerance: float,
+) -> List[str]:
+    """Возвращает список регрессий относительно базы."""
+    regressions = []
+    for size_name, size_result in results["sizes"].items():
+        baseline_stages = baseline.get("sizes", {}).get(size_name, {}).get("stages", {})
+        for stage, measured in size_result["stages"].items():
+            reference = baseline_stages.get(stage)
+            if not reference:
+                continue
+            slower_by = measured["seconds"] - reference["seconds"]
+            if slower_by > MIN_SECONDS_DELTA and measured["seconds"] > reference["seconds"] * (1 + tolerance):
+                regressions.append(
+                    f"{size_name}/{stage}: {measured['seconds']:.4f}s при базе {reference['seconds']:.4f}s"
+                )
+            if measured["peakBytes"] > reference["peakBytes"] * (1 + memory_tolerance):
+                regressions.append(
+                    f"{size_name}/{stage}: пик {measured['peakBytes'] / 1024:.0f} KB "
+                    f"при базе {reference['peakBytes'] / 1024:.0f} KB"
+                )
+    return regressions
+
+
+def print_report(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    for size_name, size_result in results["sizes"].items():
+        workbook = size_result["workbook"]
+        print(
+            f"\n📊 {size_name}: {workbook['shipmentCount']} поставок, "
+            f"{workbook['itemCount']} позиций, {workbook['rowCount']} строк"
+        )
+        baseline_stages = baseline.get("sizes", {}).get(size_name, {}).get("stages", {})
+        for stage in STAGES:
+            measured = size_result["stages"][stage]
+            unit = UNIT_LABELS[STAGE_UNITS[stage]]
+            throughput = measured["throughput"]
+            throughput_text = f"{throughput:>12,.0f} {unit}" if throughput else f"{'—':>12} {unit}"
+            delta = ""
+            reference = baseline_stages.get(stage)
+            if reference and reference["seconds"] > 0:
+                delta = f"  {measured['seconds'] / reference['seconds'] - 1:+.0%} к базе"
+            print(
+                f"   {stage:<27} {measured['seconds'] * 1000:>9.2f} ms {throughput_text}"
+                f" {measured['peakBytes'] / 1024 / 1024:>8.2f} MB{delta}"
+            )
+
+
+def run_benchmarks(
+    size_names: List[str],
+    reader: str = READER_PANDAS,
+    repeat: int = 5,
+    tolerance: float = 0.3,
+    memory_tolerance: float = 0.1,
+    baseline_file: Path = BASELINE_FILE,
+    update_baseline: bool = False,
+) -> bool:
+    """Запускает замеры и возвращает False, если найдены регрессии."""
+    results: Dict[str, Any] = {"reader": reader, "repeat": repeat, "sizes": {}}
+    for size_name in size_names:
+        print(f"⏱️  Размер {size_name}...")
+        with TemporaryDirectory() as temp_dir:
+            results["sizes"][size_name] = benchmark_size(SIZES[size_name], Path(temp_dir), reader, repeat)
+
+    baseline = load_json_file(baseline_file) if baseline_file.exists() else {}
+    if baseline and baseline.get("reader") != reader:
+        print(f"⚠️  База снята с бэкендом {baseline.get('reader')}, сравнение не проводится")
+        baseline = {}
+    print_report(results, baseline)
+
+    if update_baseline:
+        merged = baseline if baseline else {"reader": reader, "sizes": {}}
+        merged["repeat"] = repeat
+        merged["sizes"].update(results["sizes"])
+        write_json_atomic(baseline_file, merged)
+        print(f"\n💾 База обновлена: {baseline_file}")
+        return True
+
+    if not baseline:
+        print("\nℹ️  Базы для сравнения нет: запустите с --update-baseline")
+        return True
+
+    regressions = compare_with_baseline(results, baseline, tolerance, memory_tolerance)
+    if regressions:
+        print("\n❌ Регрессии относительно базы:")
+        for regression in regressions:
+            print(f"   - {regression}")
+        return False
+    print("\n✅ Регрессий относительно базы нет")
+    return True
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Бенчмарки этапов Excel-пайплайна")
+    arg_parser.add_argument(
+        "--sizes",
+        default="small,medium",
+        help=f"размеры через запятую: {', '.join(SIZES)}",
+    )
+    arg_parser.add_argument("--reader", choices=READERS, default=READER_PANDAS, help="бэкенд чтения листа")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="запусков на этап, берётся лучший")
+    arg_parser.add_argument("--tolerance", type=float, default=0.3, help="допустимое замедление, доля")
+    arg_parser.add_argument("--memory-tolerance", type=float, default=0.1, help="допустимый рост пика памяти, доля")
+    arg_parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="файл базы")
+    arg_parser.add_argument("--update-baseline", action="store_true", help="записать результаты как новую базу")
+    args = arg_parser.parse_args()
+
+    names = [name.strip() for name in args.sizes.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SIZES]
+    if unknown:
+        arg_parser.error(f"неизвестные размеры: {', '.join(unknown)}")
+
+    success = run_benchmarks(
+        names,
+        reader=args.reader,
+        repeat=max(args.repeat, 1),
+        tolerance=args.tolerance,
+        memory_tolerance=args.memory_tolerance,
+        baseline_file=args.baseline,
+        update_baseline=args.update_baseline,
+    )
+    sys.exit(0 if success else 1)
@@ -0,0 +1,205 @@
+"""
+Генератор синтетических таблиц "Поставки" для бенчмарков.
+
+Структура повторяет настоящую таблицу: строка-разделитель года, блоки поставок
+через пустую строку, курс J и статус поставки F объединены на весь блок,
+образцы, позиции "(на уточнении)" с количеством в G, повторяющиеся модели
+в разных поставках, даты поступления и текстовые ETA у последних партий.
+Генерация детерминирована при одинаковом seed.
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, NamedTuple
+
+from openpyxl import Workbook
+
+SHEET_NAME = "Поставки"
+FIRST_YEAR = 2024
+COLUMN_COUNT = 16
+
+# Колонки листа (1-based, как в openpyxl)
+COL_SHIPMENT_NUM = 1
+COL_NAME = 3
+COL_COMPOSITION = 4
+COL_POSITION_STATUS = 5
+COL_SHIPMENT_STATUS = 6
+COL_QUANTITY = 7
+COL_PRICE_USD = 8
+COL_EXCHANGE_RATE = 10
+COL_COST_WITH_CARGO = 14
+COL_DATE = 16
+
+MODELS = (
+    "Плащ из замши",
+    "Юбка из замши",
+    "Брюки из замши",
+    "Жакет из замши в стиле 80-х",
+    "Жакет из кожи Hermes в стиле 80-х",
+    "Куртка-бомбер из кожи",
+    "Тренч из кожи",
+    "Юбка из кожи питона",
+    "Жакет приталенный из кожи питона",
+    "Дублёнка длинная из меха тасканы",
+    "Дублёнка короткая из меха кёрли",
+    "Шуба из меха норки",
+)
+
+COLORS = (
+    "коричневый", "чёрный", "бежевый", "серый", "белый",
+    "taupe", "mouse", "etoupe", "молочный", "шоколадный",
+)
+
+COMPOSITIONS = {
+    "замш": "100% Натуральная замша\nПодкладка: %70 Acetate %30 Polyester",
+    "кож": "100% Натуральная кожа\nПодкладка: 100% Viscose",
+    "мех": "100% Натуральный мех\nПодкладка: %70 Acetate %30 Polyester",
+}
+
+SIZES = ("XS", "S", "M", "L")
+
+SHIPMENT_STATUSES = ("Получено, оплачено ✅", "Получено, не оплачено 📦")
+OPEN_SHIPMENT_STATUS = "В работе 🧵"
+OPEN_ITEM_STATUS = "В производстве 🛠️"
+
+
+class WorkbookSize(NamedTuple):
+    """Размер синтетической таблицы: годы × поставки в году × позиции в поставке."""
+
+    years: int
+    shipments_per_year: int
+    items_per_shipment: int
+
+    @property
+    def shipment_count(self) -> int:
+        return self.years * self.shipments_per_year
+
+    @property
+    def item_count(self) -> int:
+        return self.shipment_count * self.items_per_shipment
+
+
+def _composition_for(model: str) -> str:
+    lowered = model.lower()
+    for root, composition in COMPOSITIONS.items():
+        if root in lowered:
+            return composition
+    return COMPOSITIONS["кож"]
+
+
+def _item_row(rng: random.Random, received: bool, sizes_unknown: bool = False) -> Dict[int, object]:
+    """Значения одной позиции: название с размерами, количество, цена, себестоимость."""
+    model = rng.choice(MODELS)
+    name = f"{model} — {rng.choice(COLORS)}"
+    kind = rng.random()
+    if sizes_unknown:
+        name += " (на уточнении)"
+        quantity = rng.randint(3, 20)
+    elif kind < 0.08:
+        name += " (образец XS-1)"
+        quantity = 1
+    elif kind < 0.12 and not received:
+        name += " (на уточнении)"
+        quantity = rng.randint(3, 20)
+    elif kind < 0.25:
+        quantity = rng.randint(2, 15)
+        name += f" (one size-{quantity})"
+    else:
+        sizes = {size: rng.randint(1, 9) for size in rng.sample(SIZES, rng.randint(1, len(SIZES)))}
+        name += " (" + ", ".join(f"{size}-{sizes[size]}" for size in SIZES if size in sizes) + ")"
+        quantity = sum(sizes.values())
+
+    price = rng.choice((120, 165, 180, 220, 280, 340, 95.5))
+    return {
+        COL_NAME: name,
+        COL_COMPOSITION: _composition_for(model),
+        COL_POSITION_STATUS: rng.choice(SHIPMENT_STATUSES) if received else OPEN_ITEM_STATUS,
+        COL_QUANTITY: quantity,
+        COL_PRICE_USD: price,
+        COL_COST_WITH_CARGO: round(price * 95.5 + rng.randint(500, 2500)),
+    }
+
+
+def generate_workbook(path: Path, size: WorkbookSize, seed: int = 0) -> Dict[str, int]:
+    """
+    Записывает синтетическую таблицу в path.
+
+    Returns:
+        {"rowCount", "shipmentCount", "itemCount"} — размеры для расчёта пропускной способности
+    """
+    rng = random.Random(seed)
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.title = SHEET_NAME
+
+    for column in range(1, COLUMN_COUNT + 1):
+        worksheet.cell(row=1, column=column, value=f"column-{column}")
+
+    row = 2
+    for year_index in range(size.years):
+        year = FIRST_YEAR + year_index
+        worksheet.cell(row=row, column=COL_SHIPMENT_NUM, value=year)
+        row += 1
+        is_last_year = year_index == size.years - 1
+
+        for shipment_index in range(size.shipments_per_year):
+            # В последнем году хвост поставок ещё в работе: ETA текстом и курс 0
+            received = not (is_last_year and shipment_index >= size.shipments_per_year * 3 // 4)
+            start_row = row
+            received_at = datetime(year, 1, 1) + timedelta(days=rng.randint(0, 360))
+
+            for item_index in range(size.items_per_shipment):
+                # У каждой поставки в работе последняя позиция ждёт размерную сетку
+                sizes_unknown = not received and item_index == size.items_per_shipment - 1
+                for column, value in _item_row(rng, received, sizes_unknown).items():
+                    worksheet.cell(row=row, column=column, value=value)
+                if received:
+                    worksheet.cell(row=row, column=COL_DATE, value=received_at)
+                elif item_index == 0:
+                    worksheet.cell(row=row, column=COL_DATE, value=f"ETA {rng.randint(1, 28)}.{rng.randint(1, 12)}")
+                row += 1
+
+            end_row = row - 1
+            worksheet.cell(row=start_row, column=COL_SHIPMENT_NUM, value=shipment_index + 1)
+            worksheet.cell(
+                row=start_row,
+                column=COL_SHIPMENT_STATUS,
+                value=rng.choice(SHIPMENT_STATUSES) if received else OPEN_SHIPMENT_STATUS,
+            )
+            worksheet.cell(row=start_row, column=COL_EXCHANGE_RATE, value=rng.choice((92.4, 95.5, 101.2)) if received else 0)
+            if end_row > start_row:
+                for column in (COL_SHIPMENT_STATUS, COL_EXCHANGE_RATE):
+                    worksheet.merge_cells(
+                        start_row=start_row,
+                        start_column=column,
+                        end_row=end_row,
+                        end_column=column,
+                    )
+            row += 1
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    workbook.save(path)
+    workbook.close()
+    return {
+        "rowCount": row - 1,
+        "shipmentCount": size.shipment_count,
+        "itemCount": size.item_count,
+    }
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Синтетическая таблица 'Поставки' для бенчмарков")
+    arg_parser.add_argument("output", type=Path, help="путь к создаваемому xlsx")
+    arg_parser.add_argument("--years", type=int, default=2)
+    arg_parser.add_argument("--shipments", type=int, default=20, help="поставок в году")
+    arg_parser.add_argument("--items", type=int, default=6, help="позиций в поставке")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    stats = generate_workbook(args.output, WorkbookSize(args.years, args.shipments, args.items), args.seed)
+    print(
+        f"✅ {args.output}: {stats['shipmentCount']} поставок, "
+        f"{stats['itemCount']} позиций, {stats['rowCount']} строк"
+    )
@@ -0,0 +1,97 @@
+"""
+Сборка каталога после парсинга за один проход.
+
+Раньше после разбора таблицы каталог обходился четыре раза: aggregate_product_sizes
+(все поставки), повторный infer_category для каждого товара, assign_product_photos
+и apply_latest_prices (все поставки ещё раз, после сортировки). build_catalog
+делает то же самое одним обходом поставок и одним обходом каталога:
+
+- поставки от новых к старым: размеры каждого productId (без позиций с sizesUnknown)
+  и первые встреченные price/cost — как в collect_latest_product_values;
+- каталог: sizes, photo, category (если её ещё нет: новый товар получает её
+  при создании, см. new_catalog_product) и price/cost.
+
+Результат совпадает с последовательным вызовом прежних функций, включая порядок
+ключей товара (photo перед price/cost).
+"""
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from catalog_pricing import LogFn, iter_shipments_newest_first, pricing_summary, update_product_price_cost
+from utils import index_catalog_photos, infer_category, set_product_photo, size_sort_key
+
+
+def build_catalog(
+    products_data: Dict[str, Any],
+    shipments: Iterable[Dict[str, Any]],
+    jpg_dir: Optional[Path] = None,
+    log: LogFn | None = None,
+) -> Dict[str, Any]:
+    """
+    Заполняет sizes, photo, category и актуальные price/cost товаров каталога.
+
+    jpg_dir — папка каталожных JPG; None — photo не трогается.
+
+    Returns:
+        Сводка цен в формате apply_latest_prices
+
+    Raises:
+        FileNotFoundError: jpg_dir передана, но не существует
+    """
+    files_by_name = index_catalog_photos(jpg_dir) if jpg_dir is not None else None
+
+    sizes_by_id: Dict[str, Set[str]] = defaultdict(set)
+    latest_prices: Dict[str, float] = {}
+    latest_costs: Dict[str, float] = {}
+    for shipment in iter_shipments_newest_first(shipments):
+        for item in shipment.get("rawItems", []):
+            product_id = item.get("productId")
+            if not product_id:
+                continue
+
+            if not item.get("sizesUnknown"):
+                sizes_by_id[product_id].update(item.get("sizes", {}))
+
+            price = item.get("price")
+            if isinstance(price, (int, float)) and product_id not in latest_prices:
+                latest_prices[product_id] = float(price)
+
+            cost = item.get("cost")
+            if isinstance(cost, (int, float)) and product_id not in latest_costs:
+                latest_costs[product_id] = float(cost)
+
+    products: List[Dict[str, Any]] = products_data.get("products", [])
+    catalog_ids: Set[str] = set()
+    updated_prices_count = 0
+    updated_costs_count = 0
+    for product in products:
+        product_id = product.get("id")
+        if not product_id:
+            continue
+        catalog_ids.add(product_id)
+
+        product["sizes"] = sorted(sizes_by_id.get(product_id, ()), key=size_sort_key)
+        if files_by_name is not None:
+            set_product_photo(product, files_by_name)
+        if not product.get("category") and product.get("name"):
+            product["category"] = infer_category(product["name"])
+
+        price_updated, cost_updated = update_product_price_cost(
+            product,
+            latest_prices.get(product_id),
+            latest_costs.get(product_id),
+        )
+        updated_prices_count += price_updated
+        updated_costs_count += cost_updated
+
+    missing_product_ids = sorted((set(latest_prices) | set(latest_costs)) - catalog_ids)
+    return pricing_summary(
+        latest_prices,
+        latest_costs,
+        updated_prices_count,
+        updated_costs_count,
+        missing_product_ids,
+        log,
+    )
@@ -0,0 +1,126 @@
+"""
+Фасетный индекс каталога для фильтрации без полного перебора товаров.
+
+Для каждого значения фасета хранится отсортированный список productId и его длина.
+Комбинация фильтров сводится к пересечению заранее посчитанных множеств.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Set
+
+from utils import SIZE_ORDER
+
+
+FACET_NAMES = ("category", "size", "inStock", "status", "photo")
+
+PHOTO_PRESENT = "present"
+PHOTO_MISSING = "missing"
+
+
+def _size_facet_sort_key(size: str) -> tuple:
+    normalized = size.lower()
+    index = SIZE_ORDER.index(normalized) if normalized in SIZE_ORDER else len(SIZE_ORDER)
+    return (index, size)
+
+
+def _facet_entry(product_ids: Set[str]) -> Dict[str, Any]:
+    sorted_ids = sorted(product_ids)
+    return {
+        "count": len(sorted_ids),
+        "productIds": sorted_ids,
+    }
+
+
+def build_facet_index(
+    products_data: Dict[str, Any],
+    shipments: Iterable[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Строит фасетный индекс по уже собранному каталогу.
+
+    - category: категория из infer_category (уже записана в product["category"])
+    - size: размеры из aggregate_product_sizes (product["sizes"])
+    - inStock: "true" / "false"
+    - status: статусы позиций поставок; позиция без статуса наследует статус поставки
+    - photo: "present" / "missing"
+    """
+    values: Dict[str, Dict[str, Set[str]]] = {name: defaultdict(set) for name in FACET_NAMES}
+    product_ids: Set[str] = set()
+
+    for product in products_data.get("products", []):
+        product_id = product.get("id")
+        if not product_id:
+            continue
+        product_ids.add(product_id)
+
+        category = product.get("category")
+        if category:
+            values["category"][category].add(product_id)
+
+        for size in product.get("sizes", []):
+            values["size"][size].add(product_id)
+
+        in_stock = "true" if product.get("inStock") else "false"
+        values["inStock"][in_stock].add(product_id)
+
+        photo = PHOTO_PRESENT if product.get("photo") else PHOTO_MISSING
+        values["photo"][photo].add(product_id)
+
+    for shipment in shipments:
+        shipment_status = shipment.get("status")
+        for item in shipment.get("rawItems", []):
+            product_id = item.get("productId")
+            status = item.get("status") or shipment_status
+            if product_id in product_ids and status:
+                values["status"][status].add(product_id)
+
+    facets: Dict[str, Dict[str, Any]] = {}
+    for facet_name, facet_values in values.items():
+        if facet_name == "size":
+            ordered_keys = sorted(facet_values, key=_size_facet_sort_key)
+        else:
+            ordered_keys = sorted(facet_values)
+        facets[facet_name] = {key: _facet_entry(facet_values[key]) for key in ordered_keys}
+
+    return {
+        "productCount": len(product_ids),
+        "facets": facets,
+    }
+
+
+def select_product_ids(
+    facet_index: Dict[str, Any],
+    selections: Mapping[str, Iterable[str]],
+) -> List[str]:
+    """
+    Возвращает productId, подходящие под выбранные фильтры.
+
+    Внутри одного фасета значения объединяются (ИЛИ), между фасетами пересекаются (И).
+    Пустой набор фильтров возвращает все товары индекса.
+    """
+    facets = facet_index.get("facets", {})
+    result: Set[str] | None = None
+
+    for facet_name, selected_values in selections.items():
+        facet = facets.get(facet_name)
+        if facet is None:
+            raise KeyError(f"Неизвестный фасет: {facet_name!r}")
+
+        matched: Set[str] = set()
+        for value in selected_values:
+            entry = facet.get(value)
+            if entry:
+                matched.update(entry["productIds"])
+
+        result = matched if result is None else result & matched
+        if not result:
+            return []
+
+    if result is None:
+        result = {
+            product_id
+            for entry in facets.get("inStock", {}).values()
+            for product_id in entry["productIds"]
+        }
+
+    return sorted(result)
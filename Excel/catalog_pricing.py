@@ -63,6 +63,57 @@ def collect_latest_product_values(
     return latest_prices, latest_costs
 
 
+def update_product_price_cost(
+    product: Dict[str, Any],
+    latest_price: float | None,
+    latest_cost: float | None,
+) -> Tuple[bool, bool]:
+    """
+    Проставляет в товар последние price/cost (целые числа пишутся как int).
+
+    Returns:
+        (изменилась ли цена, изменилась ли себестоимость)
+    """
+    price_updated = latest_price is not None and product.get("price") != latest_price
+    if price_updated:
+        product["price"] = int(latest_price) if latest_price.is_integer() else latest_price
+
+    cost_updated = latest_cost is not None and product.get("cost") != latest_cost
+    if cost_updated:
+        product["cost"] = int(latest_cost) if latest_cost.is_integer() else latest_cost
+
+    return price_updated, cost_updated
+
+
+def pricing_summary(
+    latest_prices: Dict[str, float],
+    latest_costs: Dict[str, float],
+    updated_prices_count: int,
+    updated_costs_count: int,
+    missing_product_ids: List[str],
+    log: LogFn | None = None,
+) -> Dict[str, Any]:
+    """Сводка обновления цен для логов и smoke-check'ов (и печать её через log)."""
+    if log:
+        log(f"✅ Актуальных цен найдено: {len(latest_prices)}")
+        log(f"✅ Актуальных себестоимостей найдено: {len(latest_costs)}")
+        log(f"✅ Обновлено цен в каталоге: {updated_prices_count}")
+        log(f"✅ Обновлено себестоимостей в каталоге: {updated_costs_count}")
+        if missing_product_ids:
+            log(
+                "⚠️  В поставках есть productId, которых нет в каталоге: "
+                + ", ".join(missing_product_ids)
+            )
+
+    return {
+        "latestPriceCount": len(latest_prices),
+        "latestCostCount": len(latest_costs),
+        "updatedPricesCount": updated_prices_count,
+        "updatedCostsCount": updated_costs_count,
+        "missingProductIds": missing_product_ids,
+    }
+
+
 def apply_latest_prices(
     products_data: Dict[str, Any],
     shipments: Iterable[Dict[str, Any]],
@@ -90,32 +141,19 @@ def apply_latest_prices(
     updated_costs_count = 0
 
     for product_id, product in products_by_id.items():
-        latest_price = latest_prices.get(product_id)
-        latest_cost = latest_costs.get(product_id)
-
-        if latest_price is not None and product.get("price") != latest_price:
-            product["price"] = int(latest_price) if latest_price.is_integer() else latest_price
-            updated_prices_count += 1
-
-        if latest_cost is not None and product.get("cost") != latest_cost:
-            product["cost"] = int(latest_cost) if latest_cost.is_integer() else latest_cost
-            updated_costs_count += 1
-
-    if log:
-        log(f"✅ Актуальных цен найдено: {len(latest_prices)}")
-        log(f"✅ Актуальных себестоимостей найдено: {len(latest_costs)}")
-        log(f"✅ Обновлено цен в каталоге: {updated_prices_count}")
-        log(f"✅ Обновлено себестоимостей в каталоге: {updated_costs_count}")
-        if missing_product_ids:
-            log(
-                "⚠️  В поставках есть productId, которых нет в каталоге: "
-                + ", ".join(missing_product_ids)
-            )
-
-    return {
-        "latestPriceCount": len(latest_prices),
-        "latestCostCount": len(latest_costs),
-        "updatedPricesCount": updated_prices_count,
-        "updatedCostsCount": updated_costs_count,
-        "missingProductIds": missing_product_ids,
-    }
+        price_updated, cost_updated = update_product_price_cost(
+            product,
+            latest_prices.get(product_id),
+            latest_costs.get(product_id),
+        )
+        updated_prices_count += price_updated
+        updated_costs_count += cost_updated
+
+    return pricing_summary(
+        latest_prices,
+        latest_costs,
+        updated_prices_count,
+        updated_costs_count,
+        missing_product_ids,
+        log,
+    )
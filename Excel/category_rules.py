@@ -0,0 +1,124 @@
+"""
+Правила категорий каталога: данные в category_rules.json, один скомпилированный матчер.
+
+Каждое правило — категория, приоритет и корни слов:
+
+    {"category": "Экзотика", "priority": 40, "roots": ["питон"]}
+
+Категория товара — правило с наибольшим приоритетом, хотя бы один корень которого
+встречается в названии (без учёта регистра). Новая категория добавляется строкой
+в category_rules.json без правки кода; ALLOWED_PRODUCT_CATEGORIES в data_validator
+собирается из того же файла.
+
+Все корни компилируются в одно регулярное выражение: альтернатива внутри lookahead
+находит корень в каждой позиции названия, а корни в ней упорядочены по приоритету,
+поэтому в каждой позиции побеждает самое приоритетное правило. Название сканируется
+один раз независимо от числа правил, а результат запоминается: в таблице одна модель
+встречается во многих строках.
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from json_storage import load_json_file
+
+CATEGORY_RULES_FILE = Path(__file__).parent / "category_rules.json"
+
+# Сколько разных названий помнит матчер (в каталоге их десятки, в больших таблицах — тысячи)
+MATCH_CACHE_SIZE = 16384
+
+
+class CategoryRule(NamedTuple):
+    """Правило категории: чем больше priority, тем раньше оно проверяется."""
+
+    category: str
+    priority: int
+    roots: Tuple[str, ...]
+
+
+def load_category_rules(path: Path = CATEGORY_RULES_FILE) -> List[CategoryRule]:
+    """
+    Читает и проверяет правила категорий.
+
+    Returns:
+        Правила от высокого приоритета к низкому
+
+    Raises:
+        OSError: файл не читается
+        ValueError: файл не JSON или правила противоречивы
+    """
+    payload = load_json_file(path)
+    raw_rules = payload.get("rules") if isinstance(payload, dict) else None
+    if not isinstance(raw_rules, list) or not raw_rules:
+        raise ValueError(f"{path.name}: rules должен быть непустым массивом")
+
+    rules = []
+    root_owners: Dict[str, str] = {}
+    priorities: Dict[int, str] = {}
+    for index, raw_rule in enumerate(raw_rules):
+        prefix = f"{path.name} → rules[{index}]"
+        if not isinstance(raw_rule, dict):
+            raise ValueError(f"{prefix}: правило должно быть объектом")
+        category = raw_rule.get("category")
+        priority = raw_rule.get("priority")
+        roots = raw_rule.get("roots")
+        if not isinstance(category, str) or not category.strip():
+            raise ValueError(f"{prefix}: category должна быть непустой строкой")
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            raise ValueError(f"{prefix}: priority должен быть целым числом")
+        if priority in priorities:
+            raise ValueError(f"{prefix}: priority {priority} уже занят категорией {priorities[priority]!r}")
+        if not isinstance(roots, list) or not roots or not all(isinstance(root, str) and root.strip() for root in roots):
+            raise ValueError(f"{prefix}: roots должен быть непустым массивом непустых строк")
+
+        normalized_roots = tuple(root.strip().lower() for root in roots)
+        for root in normalized_roots:
+            if root in root_owners and root_owners[root] != category:
+                raise ValueError(f"{prefix}: корень {root!r} уже относится к категории {root_owners[root]!r}")
+            root_owners[root] = category
+        priorities[priority] = category
+        rules.append(CategoryRule(category, priority, normalized_roots))
+
+    return sorted(rules, key=lambda rule: rule.priority, reverse=True)
+
+
+class CategoryMatcher:
+    """Скомпилированные правила категорий с памятью результатов по названию."""
+
+    def __init__(self, rules: List[CategoryRule]):
+        self.rules = sorted(rules, key=lambda rule: rule.priority, reverse=True)
+        self.categories: FrozenSet[str] = frozenset(rule.category for rule in self.rules)
+        self.roots: Tuple[str, ...] = tuple(root for rule in self.rules for root in rule.roots)
+
+        self._rank: Dict[str, Tuple[int, str]] = {}
+        for rule in self.rules:
+            for root in rule.roots:
+                self._rank.setdefault(root, (rule.priority, rule.category))
+        # Корни по убыванию приоритета (внутри правила длинные раньше), lookahead — для пересекающихся корней
+        ordered_roots = sorted(self._rank, key=lambda root: (-self._rank[root][0], -len(root)))
+        self._pattern = re.compile("(?=(" + "|".join(map(re.escape, ordered_roots)) + "))")
+        self._top_priority = self.rules[0].priority
+        self.match = lru_cache(maxsize=MATCH_CACHE_SIZE)(self._match)
+
+    def _match(self, name: str) -> Optional[str]:
+        best: Optional[Tuple[int, str]] = None
+        for found in self._pattern.finditer(name.lower()):
+            rank = self._rank[found.group(1)]
+            if best is None or rank[0] > best[0]:
+                best = rank
+                if rank[0] == self._top_priority:
+                    break
+        return best[1] if best else None
+
+
+@lru_cache(maxsize=1)
+def default_matcher() -> CategoryMatcher:
+    """Матчер правил из CATEGORY_RULES_FILE (файл читается один раз за процесс)."""
+    return CategoryMatcher(load_category_rules())
+
+
+def product_categories() -> FrozenSet[str]:
+    """Все категории каталога из CATEGORY_RULES_FILE."""
+    return default_matcher().categories
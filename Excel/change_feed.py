@@ -0,0 +1,215 @@
+"""
+Лента изменений между двумя генерациями data/.
+
+Перед записью новой генерации write_outputs сравнивает её с файлами, которые
+сейчас лежат в data/, и сохраняет data/changes.json: добавленные, удалённые
+и изменённые поставки, позиции и товары с изменениями по полям (price, cost,
+status, sizes, eta и остальные поля записи). По affectedProductIds и
+affectedShipmentIds можно пересобрать только затронутые страницы.
+
+Позиция поставки определяется парой (id поставки, productId) и порядковым номером
+среди позиций этого товара в поставке: название позиции содержит размеры, поэтому
+по нему правка размеров выглядела бы как удаление и добавление.
+"""
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from json_storage import load_json_file
+from shipment_encoding import expand_shipments_payload
+
+CHANGES_FILENAME = "changes.json"
+
+# Поля, которые сравниваются отдельно или меняются без изменения сути записи
+SHIPMENT_IGNORED_FIELDS = frozenset({"rawItems"})
+# excelRows сдвигаются при любой вставке строки выше товара
+PRODUCT_IGNORED_FIELDS = frozenset({"excelRows"})
+
+# Сколько строк подробностей печатать в отчёте
+REPORT_LIMIT = 20
+
+ItemKey = Tuple[str, str, int]
+
+
+def load_previous_generation(data_dir: Path) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+    """
+    Загружает текущую генерацию из data_dir в обычной схеме.
+
+    Returns:
+        (shipments, products_data) или None, если генерации ещё нет
+    """
+    shipments_file = data_dir / "shipments.json"
+    products_file = data_dir / "products.json"
+    if not shipments_file.exists() or not products_file.exists():
+        return None
+    products_data = load_json_file(products_file)
+    shipments = expand_shipments_payload(load_json_file(shipments_file), products_data)
+    return shipments, products_data
+
+
+def diff_fields(before: Dict[str, Any], after: Dict[str, Any], ignored: Iterable[str] = ()) -> Dict[str, Any]:
+    """Изменения по полям: {поле: {"from": старое, "to": новое}}, отсутствующее поле — null."""
+    ignored = set(ignored)
+    changes = {}
+    for field in sorted((before.keys() | after.keys()) - ignored):
+        if before.get(field) != after.get(field):
+            changes[field] = {"from": before.get(field), "to": after.get(field)}
+    return changes
+
+
+def _index_items(shipments: Iterable[Dict[str, Any]]) -> Dict[ItemKey, Dict[str, Any]]:
+    items: Dict[ItemKey, Dict[str, Any]] = {}
+    for shipment in shipments:
+        occurrences: Dict[str, int] = defaultdict(int)
+        for item in shipment.get("rawItems", []):
+            product_id = item.get("productId", "")
+            items[(shipment["id"], product_id, occurrences[product_id])] = item
+            occurrences[product_id] += 1
+    return items
+
+
+def _item_ref(key: ItemKey, item: Dict[str, Any]) -> Dict[str, Any]:
+    shipment_id, product_id, occurrence = key
+    return {
+        "shipmentId": shipment_id,
+        "productId": product_id,
+        "occurrence": occurrence,
+        "overrideName": item.get("overrideName"),
+    }
+
+
+def _diff_records(
+    before: Dict[Any, Dict[str, Any]],
+    after: Dict[Any, Dict[str, Any]],
+    ignored: Iterable[str],
+) -> Tuple[List[Any], List[Any], List[Tuple[Any, Dict[str, Any]]]]:
+    added = [key for key in after if key not in before]
+    removed = [key for key in before if key not in after]
+    modified = []
+    for key, record in after.items():
+        if key in before:
+            changes = diff_fields(before[key], record, ignored)
+            if changes:
+                modified.append((key, changes))
+    return added, removed, modified
+
+
+def build_change_feed(
+    previous: Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]],
+    shipments: List[Dict[str, Any]],
+    products_data: Dict[str, Any],
+    updated_at: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Сравнивает новую генерацию с предыдущей.
+
+    Без предыдущей генерации (первый запуск) всё считается добавленным.
+    """
+    previous_shipments, previous_products_data = previous or ([], {"products": []})
+
+    shipments_before = {shipment["id"]: shipment for shipment in previous_shipments}
+    shipments_after = {shipment["id"]: shipment for shipment in shipments}
+    products_before = {product["id"]: product for product in previous_products_data.get("products", [])}
+    products_after = {product["id"]: product for product in products_data.get("products", [])}
+    items_before = _index_items(previous_shipments)
+    items_after = _index_items(shipments)
+
+    shipments_added, shipments_removed, shipments_modified = _diff_records(
+        shipments_before, shipments_after, SHIPMENT_IGNORED_FIELDS
+    )
+    items_added, items_removed, items_modified = _diff_records(items_before, items_after, ())
+    products_added, products_removed, products_modified = _diff_records(
+        products_before, products_after, PRODUCT_IGNORED_FIELDS
+    )
+
+    affected_shipment_ids = set(shipments_added) | set(shipments_removed)
+    affected_shipment_ids.update(key for key, _ in shipments_modified)
+    affected_product_ids = set(products_added) | set(products_removed)
+    affected_product_ids.update(key for key, _ in products_modified)
+    for key in items_added + items_removed + [key for key, _ in items_modified]:
+        affected_shipment_ids.add(key[0])
+        affected_product_ids.add(key[1])
+
+    return {
+        "updatedAt": updated_at,
+        "hasPreviousGeneration": previous is not None,
+        "summary": {
+            "shipments": _summary(shipments_added, shipments_removed, shipments_modified),
+            "items": _summary(items_added, items_removed, items_modified),
+            "products": _summary(products_added, products_removed, products_modified),
+        },
+        "shipments": {
+            "added": shipments_added,
+            "removed": shipments_removed,
+            "modified": [{"id": key, "changes": changes} for key, changes in shipments_modified],
+        },
+        "items": {
+            "added": [_item_ref(key, items_after[key]) for key in items_added],
+            "removed": [_item_ref(key, items_before[key]) for key in items_removed],
+            "modified": [
+                {**_item_ref(key, items_after[key]), "changes": changes}
+                for key, changes in items_modified
+            ],
+        },
+        "products": {
+            "added": products_added,
+            "removed": products_removed,
+            "modified": [{"id": key, "changes": changes} for key, changes in products_modified],
+        },
+        "affectedShipmentIds": sorted(affected_shipment_ids),
+        "affectedProductIds": sorted(affected_product_ids),
+    }
+
+
+def _summary(added: List[Any], removed: List[Any], modified: List[Any]) -> Dict[str, int]:
+    return {"added": len(added), "removed": len(removed), "modified": len(modified)}
+
+
+def has_changes(feed: Dict[str, Any]) -> bool:
+    return any(sum(counts.values()) for counts in feed["summary"].values())
+
+
+def _format_changes(changes: Dict[str, Any]) -> str:
+    return ", ".join(
+        f"{field}: {change['from']!r} → {change['to']!r}" for field, change in changes.items()
+    )
+
+
+def print_change_report(feed: Dict[str, Any], limit: int = REPORT_LIMIT) -> None:
+    """Печатает сводку изменений и первые limit строк подробностей."""
+    if not has_changes(feed):
+        print("📝 Изменений относительно прошлой генерации нет")
+        return
+
+    labels = {"shipments": "поставки", "items": "позиции", "products": "товары"}
+    summary = ", ".join(
+        f"{labels[section]} +{counts['added']} −{counts['removed']} ~{counts['modified']}"
+        for section, counts in feed["summary"].items()
+    )
+    print(f"📝 Изменения: {summary}")
+    if not feed["hasPreviousGeneration"]:
+        return
+
+    lines = []
+    for section in ("shipments", "products"):
+        lines += [f"+ {record_id}" for record_id in feed[section]["added"]]
+        lines += [f"− {record_id}" for record_id in feed[section]["removed"]]
+        lines += [
+            f"~ {record['id']}: {_format_changes(record['changes'])}"
+            for record in feed[section]["modified"]
+        ]
+    for change, sign in (("added", "+"), ("removed", "−")):
+        lines += [
+            f"{sign} {item['shipmentId']}: {item['overrideName']}"
+            for item in feed["items"][change]
+        ]
+    lines += [
+        f"~ {item['shipmentId']}: {item['overrideName']}: {_format_changes(item['changes'])}"
+        for item in feed["items"]["modified"]
+    ]
+
+    for line in lines[:limit]:
+        print(f"   {line}")
+    if len(lines) > limit:
+        print(f"   … ещё {len(lines) - limit} (полный список в {CHANGES_FILENAME})")
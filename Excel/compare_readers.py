@@ -0,0 +1,103 @@
+"""
+Сравнение бэкендов чтения Excel на текущей таблице.
+
+Для каждого установленного бэкенда (pandas, streaming, calamine) парсит
+"Расчёты с мехметом new.xlsx" несколько раз, печатает лучшее и среднее время
+и проверяет, что поставки и каталог совпадают с результатом первого бэкенда.
+Код выхода 1, если хотя бы один бэкенд дал другой результат.
+"""
+
+import argparse
+import sys
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from typing import Any, Dict, List
+
+from excel_parser import ExcelParser
+from pipeline_api import EXCEL_FILE
+from workbook_readers import READERS, available_readers
+
+if sys.platform == "win32":
+    import io
+
+    try:
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
+        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+    except AttributeError:
+        pass
+
+
+def time_reader(excel_file: Path, reader: str, repeat: int) -> Dict[str, Any]:
+    """
+    Парсит таблицу бэкендом repeat раз.
+
+    Первый запуск включает импорт модулей бэкенда, поэтому он учитывается отдельно.
+    """
+    durations: List[float] = []
+    shipments: List[Dict[str, Any]] = []
+    products: List[Dict[str, Any]] = []
+    for _ in range(repeat):
+        products = []
+        started_at = time.perf_counter()
+        # Сообщения парсера о структуре таблицы одинаковы для всех бэкендов
+        with redirect_stdout(StringIO()):
+            shipments = ExcelParser(str(excel_file), products, reader=reader).parse()
+        durations.append(time.perf_counter() - started_at)
+
+    return {
+        "reader": reader,
+        "firstSeconds": durations[0],
+        "bestSeconds": min(durations),
+        "meanSeconds": sum(durations) / len(durations),
+        "shipments": shipments,
+        "products": products,
+    }
+
+
+def compare_readers(excel_file: Path = EXCEL_FILE, repeat: int = 3) -> bool:
+    """Замеряет все установленные бэкенды и проверяет совпадение результатов."""
+    if not excel_file.exists():
+        print(f"❌ Excel файл не найден: {excel_file}")
+        return False
+
+    readers = available_readers()
+    missing = [reader for reader in READERS if reader not in readers]
+    print(f"📊 Сравнение бэкендов чтения: {excel_file.name} (повторов: {repeat})")
+    if missing:
+        print(f"⚠️  Не установлены: {', '.join(missing)}")
+
+    results = [time_reader(excel_file, reader, repeat) for reader in readers]
+    reference = results[0]
+
+    identical = True
+    print(f"\n   {'бэкенд':<10} {'первый':>9} {'лучший':>9} {'средний':>9}  результат")
+    for result in sorted(results, key=lambda item: item["bestSeconds"]):
+        same = (
+            result["shipments"] == reference["shipments"]
+            and result["products"] == reference["products"]
+        )
+        identical = identical and same
+        verdict = "✅ совпадает" if same else f"❌ отличается от {reference['reader']}"
+        print(
+            f"   {result['reader']:<10} {result['firstSeconds']:>8.3f}s {result['bestSeconds']:>8.3f}s"
+            f" {result['meanSeconds']:>8.3f}s  {verdict}"
+        )
+
+    fastest = min(results, key=lambda item: item["bestSeconds"])
+    total_items = sum(len(shipment["rawItems"]) for shipment in reference["shipments"])
+    print(f"\n📦 Поставок: {len(reference['shipments'])}, позиций: {total_items}")
+    print(f"🏁 Самый быстрый бэкенд: {fastest['reader']}")
+    if not identical:
+        print("❌ Бэкенды дают разные поставки — --reader auto использовать нельзя")
+    return identical
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Замер и сверка бэкендов чтения Excel")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="сколько раз парсить таблицу каждым бэкендом")
+    arg_parser.add_argument("--file", type=Path, default=EXCEL_FILE, help="путь к xlsx (по умолчанию рабочая таблица)")
+    args = arg_parser.parse_args()
+
+    sys.exit(0 if compare_readers(args.file, max(args.repeat, 1)) else 1)
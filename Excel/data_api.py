@@ -0,0 +1,392 @@
+"""
+Локальный read-only HTTP API над validated data (только стандартная библиотека).
+
+    python data_api.py                       # http://127.0.0.1:8765
+    curl http://127.0.0.1:8765/products?category=Экзотика&size=xs
+    curl http://127.0.0.1:8765/shipments/shipment-2025-3
+
+Маршруты:
+- /meta, /facets                  — meta.json и фасетный индекс
+- /products                       — каталог; фильтры category, size, inStock, status, photo
+                                    (значения фасетов, см. catalog_facets; повтор параметра — ИЛИ)
+- /products/{id}                  — карточка товара
+- /shipments                      — поставки; фильтры year, status, productId
+- /shipments/{id}                 — поставка с позициями
+
+Генерация загружается в память один раз и раскладывается по индексам, ответы
+сериализуются при первом запросе и кешируются до следующей генерации. У каждого
+ответа сильный ETag (sha256 тела): клиент с If-None-Match получает 304 без тела,
+клиент с Accept-Encoding: gzip — сжатое тело.
+
+Фоновый поток раз в --reload-interval секунд сверяет указатель текущей генерации
+(см. generation_store) и mtime и размер её файлов.
+Новая генерация загружается и валидируется целиком в стороне и подменяет текущую
+одним присваиванием: запрос видит либо старую, либо новую генерацию. Если файлы
+меняются во время загрузки или не проходят валидацию, остаётся прежняя генерация.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from catalog_facets import FACET_NAMES, build_facet_index, select_product_ids
+from data_validator import validate_generated_outputs
+from generation_store import current_generation_dir
+from json_storage import load_json_file
+from shipment_encoding import expand_shipments_payload
+
+if sys.platform == "win32":
+    import io
+
+    try:
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
+        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+    except AttributeError:
+        pass
+
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+RELOAD_INTERVAL = 1.0
+
+# Файлы генерации, по mtime и размеру которых определяется новая генерация
+WATCHED_FILES = ("shipments.json", "products.json", "meta.json", "facets.json")
+
+# Сколько сериализованных ответов держать на одну генерацию
+RESPONSE_CACHE_SIZE = 512
+# Тела короче этого не сжимаются: заголовки gzip съели бы выигрыш
+GZIP_MIN_BYTES = 512
+
+SHIPMENT_FILTERS = ("year", "status", "productId")
+
+Signature = Tuple[Any, ...]
+
+
+class ApiResponse(NamedTuple):
+    """Сериализованный ответ: статус, тело, его gzip (или None) и сильный ETag."""
+
+    status: int
+    body: bytes
+    gzip_body: Optional[bytes]
+    etag: str
+
+
+class ApiError(Exception):
+    """Ошибка запроса, которая превращается в JSON-ответ с кодом status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def generation_signature(generation_dir: Path) -> Signature:
+    """Папка генерации и (mtime_ns, size) её файлов; отсутствующий файл даёт (0, 0)."""
+    signature: List[Any] = [generation_dir.name]
+    for name in WATCHED_FILES:
+        try:
+            stat = (generation_dir / name).stat()
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((0, 0))
+    return tuple(signature)
+
+
+def file_signature(data_dir: Path) -> Signature:
+    """Подпись текущей генерации data_dir: публикация новой меняет папку, и подмена видна сразу."""
+    return generation_signature(current_generation_dir(data_dir))
+
+
+def build_response(status: int, payload: Any) -> ApiResponse:
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    gzip_body = gzip.compress(body, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    return ApiResponse(status, body, gzip_body, etag)
+
+
+class DataGeneration:
+    """Одна загруженная генерация data/ с индексами и кешем ответов."""
+
+    def __init__(
+        self,
+        shipments: List[Dict[str, Any]],
+        products_data: Dict[str, Any],
+        meta: Dict[str, Any],
+        facet_index: Dict[str, Any],
+        signature: Signature = (),
+    ):
+        self.shipments = shipments
+        self.products = products_data.get("products", [])
+        self.meta = meta
+        self.facet_index = facet_index
+        self.signature = signature
+
+        self.products_by_id = {product["id"]: product for product in self.products}
+        self.shipments_by_id = {shipment["id"]: shipment for shipment in shipments}
+        self.shipment_ids_by_filter: Dict[str, Dict[str, set]] = {
+            name: defaultdict(set) for name in SHIPMENT_FILTERS
+        }
+        for shipment in shipments:
+            shipment_id = shipment["id"]
+            by_filter = self.shipment_ids_by_filter
+            by_filter["year"][str(shipment.get("year"))].add(shipment_id)
+            by_filter["status"][shipment["status"]].add(shipment_id)
+            for item in shipment.get("rawItems", []):
+                by_filter["productId"][item["productId"]].add(shipment_id)
+
+        self._responses: "OrderedDict[str, ApiResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, data_dir: Path) -> "DataGeneration":
+        """
+        Загружает и валидирует генерацию из data_dir.
+
+        Raises:
+            ValueError: файлы изменились во время загрузки или не прошли валидацию
+        """
+        generation_dir = current_generation_dir(data_dir)
+        signature = generation_signature(generation_dir)
+        products_data = load_json_file(generation_dir / "products.json")
+        shipments = expand_shipments_payload(load_json_file(generation_dir / "shipments.json"), products_data)
+        meta = load_json_file(generation_dir / "meta.json")
+        facets_file = generation_dir / "facets.json"
+        if facets_file.exists():
+            facet_index = load_json_file(facets_file)
+        else:
+            facet_index = build_facet_index(products_data, shipments)
+        # Опубликованная папка генерации не меняется; проверка нужна для плоских data/*.json
+        if generation_signature(generation_dir) != signature:
+            raise ValueError("файлы data/ изменились во время загрузки")
+
+        errors = validate_generated_outputs(shipments, products_data, meta)
+        if errors:
+            raise ValueError("; ".join(errors))
+        return cls(shipments, products_data, meta, facet_index, signature)
+
+    def response(self, target: str) -> ApiResponse:
+        """Ответ на GET target (путь с query), из кеша или только что сериализованный."""
+        parts = urlsplit(target)
+        path = unquote(parts.path).rstrip("/") or "/"
+        params = parse_qs(parts.query, keep_blank_values=True)
+        # Порядок параметров и повторов не влияет на ответ, поэтому и на ключ кеша
+        key = json.dumps([path, sorted((name, sorted(values)) for name, values in params.items())])
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None:
+                self._responses.move_to_end(key)
+                return cached
+
+        try:
+            response = build_response(HTTPStatus.OK, self._route(path, params))
+        except ApiError as error:
+            response = build_response(error.status, {"error": error.message})
+
+        with self._lock:
+            self._responses[key] = response
+            if len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return response
+
+    def _route(self, path: str, params: Dict[str, List[str]]) -> Any:
+        segments = path.strip("/").split("/")
+        if segments == ["meta"]:
+            return self.meta
+        if segments == ["facets"]:
+            return self.facet_index
+        if segments == ["products"]:
+            return self._list_products(params)
+        if segments == ["shipments"]:
+            return self._list_shipments(params)
+        if len(segments) == 2 and segments[0] == "products":
+            return self._get(self.products_by_id, segments[1], "products")
+        if len(segments) == 2 and segments[0] == "shipments":
+            return self._get(self.shipments_by_id, segments[1], "shipments")
+        raise ApiError(HTTPStatus.NOT_FOUND, f"Неизвестный маршрут: {path}")
+
+    @staticmethod
+    def _get(records: Dict[str, Dict[str, Any]], record_id: str, collection: str) -> Dict[str, Any]:
+        if record_id not in records:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"В {collection} нет записи {record_id}")
+        return records[record_id]
+
+    @staticmethod
+    def _check_params(params: Dict[str, List[str]], allowed: Tuple[str, ...]) -> None:
+        unknown = sorted(set(params) - set(allowed))
+        if unknown:
+            raise ApiError(
+                HTTPStatus.BAD_REQUEST,
+                f"Неизвестные фильтры: {', '.join(unknown)} (доступны: {', '.join(allowed)})",
+            )
+
+    def _list_products(self, params: Dict[str, List[str]]) -> Dict[str, Any]:
+        self._check_params(params, FACET_NAMES)
+        if not params:
+            return {"count": len(self.products), "products": self.products}
+        selected = set(select_product_ids(self.facet_index, params))
+        products = [product for product in self.products if product["id"] in selected]
+        return {"count": len(products), "products": products}
+
+    def _list_shipments(self, params: Dict[str, List[str]]) -> Dict[str, Any]:
+        self._check_params(params, SHIPMENT_FILTERS)
+        selected: Optional[set] = None
+        for name, values in params.items():
+            matched = set().union(*(self.shipment_ids_by_filter[name].get(value, set()) for value in values))
+            selected = matched if selected is None else selected & matched
+        shipments = [
+            shipment for shipment in self.shipments
+            if selected is None or shipment["id"] in selected
+        ]
+        return {"count": len(shipments), "shipments": shipments}
+
+
+class DataStore:
+    """Текущая генерация и её атомарная подмена при появлении новой."""
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.data_dir = data_dir
+        self.current = DataGeneration.load(data_dir)
+
+    def reload_if_changed(self) -> bool:
+        """
+        Загружает новую генерацию, если файлы data/ изменились.
+
+        Returns:
+            True, если генерация подменена
+        """
+        if file_signature(self.data_dir) == self.current.signature:
+            return False
+        try:
+            generation = DataGeneration.load(self.data_dir)
+        except Exception as error:
+            # Запись ещё идёт или данные сломаны: отвечаем прежней генерацией и пробуем позже
+            print(f"⚠️  Новая генерация не загружена, остаётся прежняя: {error}")
+            return False
+        self.current = generation
+        print(f"🔁 Загружена генерация {generation.meta.get('updatedAt')}")
+        return True
+
+    def watch(self, interval: float, stop_event: threading.Event) -> None:
+        while not stop_event.wait(interval):
+            self.reload_if_changed()
+
+
+def _etag_matches(header: Optional[str], etags: Tuple[str, ...]) -> bool:
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    if "*" in candidates:
+        return True
+    # If-None-Match сравнивается слабо: W/"x" совпадает с "x"
+    return any(candidate.removeprefix("W/") in etags for candidate in candidates)
+
+
+class DataApiHandler(BaseHTTPRequestHandler):
+    server_version = "MehmetDataAPI/1.0"
+    # HTTP/1.1: соединение переиспользуется клиентом между запросами
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self._respond(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._respond(send_body=False)
+
+    def _respond(self, send_body: bool) -> None:
+        response = self.server.store.current.response(self.path)
+        use_gzip = response.gzip_body is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        # Сильный ETag различается у представлений: сжатое тело — другие байты
+        gzip_etag = response.etag[:-1] + '-gzip"'
+        etag = gzip_etag if use_gzip else response.etag
+
+        if response.status == HTTPStatus.OK and _etag_matches(
+            self.headers.get("If-None-Match"), (response.etag, gzip_etag)
+        ):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+
+        body = response.gzip_body if use_gzip else response.body
+        self.send_response(response.status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class DataApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], store: DataStore, verbose: bool = False):
+        super().__init__(address, DataApiHandler)
+        self.store = store
+        self.verbose = verbose
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    data_dir: Path = DATA_DIR,
+    reload_interval: float = RELOAD_INTERVAL,
+    verbose: bool = False,
+) -> None:
+    """Запускает API до Ctrl+C."""
+    store = DataStore(data_dir)
+    server = DataApiServer((host, port), store, verbose=verbose)
+    stop_event = threading.Event()
+    watcher = threading.Thread(target=store.watch, args=(reload_interval, stop_event), daemon=True)
+    watcher.start()
+
+    print(f"🌐 Data API: http://{host}:{server.server_address[1]}")
+    print(f"   Генерация {store.current.meta.get('updatedAt')} из {data_dir}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Data API остановлен")
+    finally:
+        stop_event.set()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Read-only HTTP API над data/*.json")
+    arg_parser.add_argument("--host", default=DEFAULT_HOST, help="адрес (по умолчанию только локальный)")
+    arg_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="порт")
+    arg_parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="папка generated data")
+    arg_parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=RELOAD_INTERVAL,
+        help="как часто проверять появление новой генерации, s",
+    )
+    arg_parser.add_argument("--verbose", action="store_true", help="печатать каждый запрос")
+    args = arg_parser.parse_args()
+
+    try:
+        serve(args.host, args.port, args.data_dir, args.reload_interval, args.verbose)
+    except (OSError, ValueError) as error:
+        print(f"❌ Не удалось запустить Data API: {error}")
+        sys.exit(1)
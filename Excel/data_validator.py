@@ -7,9 +7,11 @@ from datetime import datetime
 from typing import Any, Dict, Iterable, List, Set
 
 from catalog_pricing import collect_latest_product_values
+from category_rules import product_categories
 
 
-ALLOWED_PRODUCT_CATEGORIES: Set[str] = {"Мех", "Замша", "Кожа", "Экзотика"}
+# Категории — из того же category_rules.json, по которому их проставляет infer_category
+ALLOWED_PRODUCT_CATEGORIES: Set[str] = set(product_categories())
 ALLOWED_SIZE_KEYS: Set[str] = {"xs", "s", "m", "l", "xl", "OneSize"}
 
 
@@ -266,6 +268,14 @@ def validate_meta(meta: Any) -> List[str]:
     if meta.get("source") != "excel":
         errors.append("meta.json: source должен быть равен 'excel'")
 
+    # Сводка --profile необязательна, но если есть — это объект со списком этапов
+    profile = meta.get("profile")
+    if profile is not None:
+        if not isinstance(profile, dict):
+            errors.append("meta.json: profile должен быть объектом")
+        elif not isinstance(profile.get("stages"), list):
+            errors.append("meta.json: profile.stages должен быть списком")
+
     return errors
 
 
@@ -6,17 +6,25 @@
 Логика «оплачен / не оплачен» определяется на стороне TypeScript (isPaidStatus).
 """
 
-import pandas as pd
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple, Any
-from openpyxl import load_workbook
+from io import StringIO
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 from utils import (
     parse_sizes_from_name,
     has_sizes_unknown_marker,
+    allocate_product_id,
     find_or_create_product_id,
+    new_catalog_product,
+    normalize_product_name,
     parse_product_materials,
-    apply_product_materials,
+    collect_product_materials,
+    merge_product_materials,
+    MaterialCandidates,
     parse_date,
     is_date_value,
     normalize_status_text,
@@ -25,6 +33,28 @@ from utils import (
     is_empty_value,
     parse_numeric_value,
 )
+from models import RawItem, Shipment
+from profiling import NULL_PROFILER, StageProfiler
+from workbook_readers import READER_CSV, READER_PANDAS, read_sheet, resolve_reader
+
+# Строка листа: pandas Series или кортеж значений
+Row = Sequence[Any]
+
+# Пул процессов окупается, только если на процесс приходится достаточно поставок
+PARALLEL_MIN_BLOCKS_PER_WORKER = 8
+# Чанков на процесс: мельче — ровнее загрузка, крупнее — меньше дублей в локальных каталогах
+PARALLEL_CHUNKS_PER_WORKER = 4
+
+# Обращение позиции к каталогу: (локальный productId, строка Excel, материалы)
+CatalogLink = Tuple[str, int, Dict[str, str]]
+
+
+class ShipmentBlock(NamedTuple):
+    """Строки одной поставки: год, номер и строки-позиции с номерами строк Excel."""
+
+    year: Optional[int]
+    shipment_num: int
+    rows: List[Tuple[int, Row]]
 
 
 class ExcelParser:
@@ -44,57 +74,123 @@ class ExcelParser:
     COL_COST_WITH_CARGO = 13  # N: Себестоимость с учётом карго (в рублях) - используется для cost
     COL_DATE = 15         # P: Дата поступления продукции
     
-    def __init__(self, excel_file: str, products: List[Dict]):
+    def __init__(
+        self,
+        excel_file: str,
+        products: List[Dict],
+        reader: str = READER_PANDAS,
+        workers: int = 1,
+        registry: Optional[Dict[str, str]] = None,
+    ):
         """
         Инициализация парсера.
         
         Args:
             excel_file: Путь к Excel файлу
             products: Список товаров из products.json
+            reader: Бэкенд чтения листа (pandas, streaming, calamine или auto)
+            workers: Число процессов для разбора блоков поставок (1 — последовательно, 0 — по числу ядер)
+            registry: Реестр название → productId (см. product_registry), дополняется новыми товарами
         """
         self.excel_file = excel_file
         self.products = products
+        self.reader = resolve_reader(reader)
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.registry = registry
+        # Материалы копятся по строкам и пишутся в каталог один раз после разбора
+        self.material_candidates: MaterialCandidates = {}
+        # В CSV нет объединённых ячеек: курс списания переносится вниз в пределах блока поставки
+        self.block_fill_columns: Tuple[int, ...] = (
+            (self.COL_EXCHANGE_RATE,) if self.reader == READER_CSV else ()
+        )
         self.current_year: Optional[int] = None
+        # Строк листа просмотрено за последний parse() (без заголовка), для журнала запусков
+        self.rows_scanned = 0
     
-    def parse(self) -> List[Dict]:
+    def parse(self, profiler: StageProfiler = NULL_PROFILER) -> List[Dict]:
         """
         Главный метод парсинга Excel файла.
         
+        Args:
+            profiler: Замер этапов read_sheet / parse_rows (см. profiling)
+        
         Returns:
             Список поставок в формате JSON
         """
         # Читаем Excel лист "Поставки"
-        df = self._read_shipments_sheet()
+        with profiler.stage("read_sheet"):
+            column_count, rows = self._read_shipments_sheet()
+            if profiler.enabled:
+                # Под профайлером лист вычитывается целиком, чтобы чтение и разбор замерялись раздельно
+                rows = iter(list(rows))
+        
+        with profiler.stage("parse_rows"):
+            return self._parse_rows(column_count, rows)
+
+    def _parse_rows(self, column_count: int, rows: Iterator[Row]) -> List[Dict]:
+        """Прогоняет строки листа через разбор поставок и позиций."""
+        # Проверяем структуру файла по первым строкам, не теряя их для разбора
+        head_rows = list(islice(rows, 6))
+        self._validate_excel_structure(column_count, head_rows)
+
+        blocks: Iterable[ShipmentBlock] = self._iter_blocks(chain(head_rows, rows))
+        shipments: Optional[List[Shipment]] = None
+        if self.workers > 1:
+            # Пулу процессов нужен список блоков целиком; последовательный разбор
+            # идёт по мере чтения листа и не держит все строки в памяти
+            blocks = list(blocks)
+            if len(blocks) >= self.workers * PARALLEL_MIN_BLOCKS_PER_WORKER:
+                shipments = self._parse_blocks_parallel(blocks)
+        if shipments is None:
+            shipments = [self._parse_block(block) for block in blocks]
+        merge_product_materials(self.products, self.material_candidates)
+        self.material_candidates.clear()
         
-        # Проверяем структуру файла
-        self._validate_excel_structure(df)
+        # Сортируем поставки: сначала по году (по убыванию), затем по номеру поставки (по убыванию)
+        shipments.sort(key=self._get_shipment_sort_key)
         
-        shipments = []
-        current_shipment: Optional[Dict] = None
-        current_shipment_rows: List[pd.Series] = []
+        # Наружу поставки отдаются в JSON-форме shipments.json. Замена идёт на месте:
+        # объект поставки освобождается, как только построен её словарь, и обе формы
+        # всех поставок в памяти одновременно не живут
+        serialized: List[Any] = shipments
+        for index, shipment in enumerate(shipments):
+            serialized[index] = shipment.to_dict()
+        return serialized
+
+    def _iter_blocks(self, rows: Iterable[Row]) -> Iterator[ShipmentBlock]:
+        """
+        Делит лист на блоки поставок по разделителям года, пустым строкам и новым номерам.
+
+        В блок попадают только строки, которые разбираются как позиции поставки:
+        первая строка с номером и наименованием и следующие строки с наименованием.
+        Блок отдаётся, как только он закончился, поэтому в памяти одновременно
+        живут строки только одной поставки.
+        """
+        current_block: Optional[ShipmentBlock] = None
+        # Год ведётся локально: _parse_block между блоками переставляет self.current_year
+        current_year = self.current_year
+        self.rows_scanned = 0
         
         # Итерация по строкам (начиная с индекса 1, пропуская заголовок)
-        for idx in range(1, len(df)):
-            row = df.iloc[idx]
+        for idx, row in enumerate(rows):
+            if idx == 0:
+                continue
+            self.rows_scanned += 1
             
-            # Проверка разделителя года
+            # Проверка разделителя года: завершает текущую поставку
             year = self._check_year_separator(row)
             if year is not None:
-                self.current_year = year
-                # Завершаем текущую поставку, если есть
-                if current_shipment:
-                    self._finish_shipment(current_shipment, current_shipment_rows, shipments)
-                    current_shipment = None
-                    current_shipment_rows = []
+                current_year = year
+                if current_block:
+                    yield current_block
+                current_block = None
                 continue
             
-            # Проверка пустой строки
+            # Пустая строка завершает текущую поставку
             if self._is_empty_row(row):
-                # Завершаем текущую поставку
-                if current_shipment:
-                    self._finish_shipment(current_shipment, current_shipment_rows, shipments)
-                    current_shipment = None
-                    current_shipment_rows = []
+                if current_block:
+                    yield current_block
+                current_block = None
                 continue
             
             # Проверка начала новой поставки
@@ -102,106 +198,143 @@ class ExcelParser:
             name = self._get_name(row)
             
             if shipment_num is not None and name:
-                # Сохраняем предыдущую поставку
-                if current_shipment:
-                    self._finish_shipment(current_shipment, current_shipment_rows, shipments)
-                
-                # Начинаем новую поставку
-                current_shipment = self._create_shipment(row, shipment_num)
-                current_shipment_rows = [row]
-                
-                # Первая строка также является позицией
-                item = self._parse_item(row, idx + 1)
-                if item:
-                    current_shipment['rawItems'].append(item)
+                # Первая строка поставки также является позицией
+                if current_block:
+                    yield current_block
+                current_block = ShipmentBlock(current_year, shipment_num, [(idx + 1, row)])
             
             # Добавляем позицию к текущей поставке
-            elif name and current_shipment:
-                current_shipment_rows.append(row)
-                item = self._parse_item(row, idx + 1)
-                if item:
-                    current_shipment['rawItems'].append(item)
+            elif name and current_block:
+                current_block.rows.append((idx + 1, row))
         
-        # Сохраняем последнюю поставку
-        if current_shipment:
-            self._finish_shipment(current_shipment, current_shipment_rows, shipments)
+        if current_block:
+            yield current_block
+
+    def _parse_block(self, block: ShipmentBlock) -> Shipment:
+        """Разбирает блок одной поставки: шапку, позиции и даты."""
+        self.current_year = block.year
+        block_values: Dict[int, Any] = {}
+        shipment: Optional[Shipment] = None
+        shipment_rows: List[Row] = []
+        
+        for excel_row, row in block.rows:
+            row = self._carry_block_values(row, block_values)
+            if shipment is None:
+                shipment = self._create_shipment(row, block.shipment_num)
+            shipment_rows.append(row)
+            item = self._parse_item(row, excel_row)
+            if item:
+                shipment.raw_items.append(item)
+        
+        return self._finalize_shipment(shipment, shipment_rows)
+
+    def _parse_blocks_parallel(self, blocks: List[ShipmentBlock]) -> List[Shipment]:
+        """
+        Разбирает блоки поставок в пуле процессов.
+
+        Каждый процесс ведёт свой локальный каталог, а слияние в порядке листа
+        повторяет создание товаров последовательного разбора: auto-id выдаются
+        по первому появлению названия, excelRows и материалы копятся в порядке строк.
+        """
+        chunk_size = -(-len(blocks) // (self.workers * PARALLEL_CHUNKS_PER_WORKER))
+        chunks = [blocks[start:start + chunk_size] for start in range(0, len(blocks), chunk_size)]
         
-        # Сортируем поставки: сначала по году (по убыванию), затем по номеру поставки (по убыванию)
-        shipments.sort(key=self._get_shipment_sort_key)
+        name_index = {
+            normalize_product_name(product.get('name', '')): product
+            for product in reversed(self.products)
+        }
+        shipments: List[Shipment] = []
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            chunk_results = executor.map(
+                _parse_block_chunk,
+                [self.reader] * len(chunks),
+                chunks,
+            )
+            # map отдаёт результаты в порядке чанков: слияние детерминировано
+            for chunk_shipments, local_products, catalog_links in chunk_results:
+                id_map = self._merge_chunk_catalog(local_products, catalog_links, name_index)
+                for shipment in chunk_shipments:
+                    for item in shipment.raw_items:
+                        item.product_id = id_map[item.product_id]
+                shipments.extend(chunk_shipments)
         
         return shipments
 
-    def _read_shipments_sheet(self) -> pd.DataFrame:
+    def _merge_chunk_catalog(
+        self,
+        local_products: List[Dict],
+        catalog_links: List[CatalogLink],
+        name_index: Dict[str, Dict],
+    ) -> Dict[str, str]:
         """
-        Читает лист поставок и разворачивает объединённые ячейки курса списания.
+        Переносит товары локального каталога чанка в общий каталог.
+
+        Returns:
+            Отображение локальных productId чанка в productId общего каталога
+        """
+        local_by_id = {product['id']: product for product in local_products}
+        linked: Dict[str, Dict] = {}
+        
+        for local_id, excel_row, materials in catalog_links:
+            product = linked.get(local_id)
+            if product is None:
+                name = local_by_id[local_id]['name']
+                product = name_index.get(normalize_product_name(name))
+                if product is None:
+                    product_id = allocate_product_id(name, self.products, self.registry)
+                    product = new_catalog_product(product_id, name, excel_row)
+                    self.products.append(product)
+                    name_index[normalize_product_name(name)] = product
+                    print(f"  + Добавлен в каталог: {name}")
+                linked[local_id] = product
+            
+            rows = product.setdefault("excelRows", [])
+            if excel_row not in rows:
+                rows.append(excel_row)
+            collect_product_materials(self.material_candidates, product.get('id', ''), materials)
+        
+        return {local_id: product.get('id', '') for local_id, product in linked.items()}
+
+    def _read_shipments_sheet(self) -> Tuple[int, Iterator[Row]]:
+        """
+        Читает лист поставок выбранным бэкендом (см. workbook_readers).
 
-        Pandas оставляет значение объединённой ячейки только в первой строке.
         В таблице курс J часто объединён на несколько позиций одной поставки,
-        поэтому значение нужно явно перенести на все строки этого диапазона.
+        поэтому бэкенд разворачивает значение объединённой ячейки на все строки диапазона.
+
+        Returns:
+            (число колонок листа, итератор строк начиная с первой строки листа)
         """
-        df = pd.read_excel(
+        return read_sheet(
+            self.reader,
             self.excel_file,
-            sheet_name=self.SHEET_NAME,
-            header=None,
+            self.SHEET_NAME,
+            fill_down_columns=(self.COL_EXCHANGE_RATE,),
         )
-
-        if df.shape[1] <= self.COL_EXCHANGE_RATE:
-            return df
-
-        workbook = load_workbook(self.excel_file, data_only=True, read_only=False)
-        try:
-            worksheet = workbook[self.SHEET_NAME]
-            exchange_rate_column = self.COL_EXCHANGE_RATE + 1
-
-            for merged_range in worksheet.merged_cells.ranges:
-                if (
-                    merged_range.min_col != exchange_rate_column
-                    or merged_range.max_col != exchange_rate_column
-                ):
-                    continue
-
-                exchange_rate = worksheet.cell(
-                    row=merged_range.min_row,
-                    column=exchange_rate_column,
-                ).value
-                if is_empty_value(exchange_rate):
-                    continue
-
-                start_index = max(merged_range.min_row - 1, 0)
-                stop_index = min(merged_range.max_row, len(df))
-                if start_index < stop_index:
-                    df.iloc[
-                        start_index:stop_index,
-                        self.COL_EXCHANGE_RATE,
-                    ] = exchange_rate
-        finally:
-            workbook.close()
-
-        return df
     
-    def _finish_shipment(
-        self,
-        shipment: Dict,
-        rows: List[pd.Series],
-        shipments_list: List[Dict]
-    ) -> None:
+    def _carry_block_values(self, row: Row, block_values: Dict[int, Any]) -> Row:
         """
-        Завершает поставку и добавляет её в список.
-        
-        Args:
-            shipment: Словарь поставки
-            rows: Все строки этой поставки
-            shipments_list: Список для добавления завершённой поставки
-        """
-        finalized = self._finalize_shipment(shipment, rows)
-        shipments_list.append(finalized)
-    
-    def _check_year_separator(self, row: pd.Series) -> Optional[int]:
+        Подставляет в пустые ячейки block_fill_columns последнее значение из текущей поставки.
+
+        Так для CSV восстанавливается смысл объединённой ячейки курса J.
+        """
+        if not self.block_fill_columns:
+            return row
+        values = list(row)
+        for column in self.block_fill_columns:
+            value = safe_get_cell(values, column)
+            if not is_empty_value(value):
+                block_values[column] = value
+            elif column in block_values and column < len(values):
+                values[column] = block_values[column]
+        return tuple(values)
+
+    def _check_year_separator(self, row: Row) -> Optional[int]:
         """
         Проверяет, является ли строка разделителем года.
         
         Args:
-            row: Строка DataFrame
+            row: Строка листа
             
         Returns:
             Год как int или None
@@ -226,12 +359,12 @@ class ExcelParser:
         
         return None
     
-    def _get_shipment_number(self, row: pd.Series) -> Optional[int]:
+    def _get_shipment_number(self, row: Row) -> Optional[int]:
         """
         Получает номер поставки из колонки A.
         
         Args:
-            row: Строка DataFrame
+            row: Строка листа
             
         Returns:
             Номер поставки как int или None
@@ -246,12 +379,12 @@ class ExcelParser:
         except (ValueError, TypeError):
             return None
     
-    def _get_name(self, row: pd.Series) -> Optional[str]:
+    def _get_name(self, row: Row) -> Optional[str]:
         """
         Получает наименование из колонки C.
         
         Args:
-            row: Строка DataFrame
+            row: Строка листа
             
         Returns:
             Наименование как str или None
@@ -263,12 +396,12 @@ class ExcelParser:
         
         return str(value).strip()
     
-    def _is_empty_row(self, row: pd.Series) -> bool:
+    def _is_empty_row(self, row: Row) -> bool:
         """
         Проверяет, является ли строка полностью пустой.
         
         Args:
-            row: Строка DataFrame
+            row: Строка листа
             
         Returns:
             True если строка пустая
@@ -279,7 +412,7 @@ class ExcelParser:
         
         return is_empty_value(shipment_num) and is_empty_value(name)
     
-    def _create_shipment(self, row: pd.Series, shipment_num: int) -> Dict:
+    def _create_shipment(self, row: Row, shipment_num: int) -> Shipment:
         """
         Создаёт новую поставку из строки.
         
@@ -288,25 +421,20 @@ class ExcelParser:
             shipment_num: Номер поставки
             
         Returns:
-            Словарь с данными поставки
+            Поставка без позиций
         """
         # Получаем статус поставки как текст из Excel (без маппинга)
         status_raw = safe_get_cell(row, self.COL_SHIPMENT_STATUS, "")
         status = normalize_status_text(status_raw) or "В работе 🧵"
         
-        shipment = {
-            "id": self._build_shipment_id(shipment_num),
-            "number": shipment_num,
-            "title": f"Поставка №{shipment_num}",
-            "status": status,
-            "rawItems": [],
-        }
-        
-        # Устанавливаем год, если есть
-        if self.current_year is not None:
-            shipment["year"] = self.current_year
-        
-        return shipment
+        # Год устанавливается, если строка находится после разделителя года
+        return Shipment(
+            id=self._build_shipment_id(shipment_num),
+            number=shipment_num,
+            title=f"Поставка №{shipment_num}",
+            status=status,
+            year=self.current_year,
+        )
 
     def _build_shipment_id(self, shipment_num: int) -> str:
         """
@@ -318,42 +446,31 @@ class ExcelParser:
             return f"shipment-{self.current_year}-{shipment_num}"
         return f"shipment-{shipment_num}"
     
-    def _parse_item(self, row: pd.Series, excel_row: int) -> Optional[Dict]:
+    def _parse_item(self, row: Row, excel_row: int) -> Optional[RawItem]:
         """
         Парсит позицию поставки из строки.
         
         Args:
-            row: Строка DataFrame
+            row: Строка листа
             
         Returns:
-            Словарь с данными позиции или None
+            Позиция поставки или None
         """
         # Получаем наименование
         name = self._get_name(row)
         if not name:
             return None
         
-        item: Dict[str, Any] = {
-            "overrideName": name,
-        }
+        item = RawItem(override_name=name)
         
-        # productId: найти в каталоге или создать новый товар
-        item["productId"] = find_or_create_product_id(
-            name,
-            self.products,
-            excel_row=excel_row,
-        )
-
-        # materials: забираем из колонки D ("Состав") и сохраняем в каталог товара
+        # productId и materials из колонки D ("Состав") — в каталог товара
         composition = safe_get_cell(row, self.COL_COMPOSITION)
-        materials = parse_product_materials(composition)
-        if materials:
-            apply_product_materials(item["productId"], materials, self.products)
+        item.product_id = self._link_product(name, excel_row, parse_product_materials(composition))
         
         # price: берём из колонки H (Стоймость 1 ед $) - цена в долларах
         price_value = self._parse_numeric_field(row, self.COL_PRICE_USD)
         if price_value is not None and price_value > 0:
-            item["price"] = int(price_value) if price_value.is_integer() else price_value
+            item.price = int(price_value) if price_value.is_integer() else price_value
         
         # cost: берём из колонки N только когда курс списания уже известен и положителен.
         # При пустом или нулевом J формула N может содержать только карго,
@@ -362,15 +479,15 @@ class ExcelParser:
         if exchange_rate_value is not None and exchange_rate_value > 0:
             cost_value = self._parse_numeric_field(row, self.COL_COST_WITH_CARGO)
             if cost_value is not None and cost_value > 0:
-                item["cost"] = int(cost_value) if cost_value.is_integer() else cost_value
+                item.cost = int(cost_value) if cost_value.is_integer() else cost_value
         
         # sizes из названия
         sizes_unknown = has_sizes_unknown_marker(name)
         sizes = parse_sizes_from_name(name, excel_row=excel_row)
         if sizes_unknown:
-            item["sizesUnknown"] = True
+            item.sizes_unknown = True
         elif sizes:
-            item["sizes"] = sizes
+            item.sizes = sizes
 
         # quantityOverride
         quantity = safe_get_cell(row, self.COL_QUANTITY)
@@ -380,7 +497,7 @@ class ExcelParser:
                 # Проверяем соответствие с размерами
                 sizes_sum = sum(sizes.values()) if sizes else 0
                 if sizes_sum == 0 or sizes_sum != qty:
-                    item["quantityOverride"] = qty
+                    item.quantity_override = qty
             except (ValueError, TypeError):
                 pass
         elif sizes_unknown:
@@ -393,27 +510,39 @@ class ExcelParser:
         status_raw = safe_get_cell(row, self.COL_POSITION_STATUS, "")
         status = normalize_status_text(status_raw)
         if status:
-            item["status"] = status
+            item.status = status
         
         # inTransit (если статус содержит "В пути")
         if status and "в пути" in status.lower():
-            item["inTransit"] = True
+            item.in_transit = True
         
         # sample (если в названии есть "(образец)" или "(образец ...)")
         # Проверяем наличие слова "образец" в скобках (может быть с размерами или без)
         if re.search(r'\([^)]*образец[^)]*\)', name, re.IGNORECASE):
-            item["sample"] = True
-            if "quantityOverride" not in item and not sizes:
-                item["quantityOverride"] = 1
+            item.sample = True
+            if item.quantity_override is None and not sizes:
+                item.quantity_override = 1
+                item.sample_quantity = True
         
         return item
     
-    def _parse_numeric_field(self, row: pd.Series, column_index: int) -> Optional[float]:
+    def _link_product(self, name: str, excel_row: int, materials: Dict[str, str]) -> str:
+        """Находит или создаёт товар каталога для позиции и запоминает её материалы."""
+        product_id = find_or_create_product_id(
+            name,
+            self.products,
+            excel_row=excel_row,
+            registry=self.registry,
+        )
+        collect_product_materials(self.material_candidates, product_id, materials)
+        return product_id
+
+    def _parse_numeric_field(self, row: Row, column_index: int) -> Optional[float]:
         """
         Парсит числовое значение из указанной колонки.
         
         Args:
-            row: Строка DataFrame
+            row: Строка листа
             column_index: Индекс колонки
             
         Returns:
@@ -425,29 +554,29 @@ class ExcelParser:
         value = safe_get_cell(row, column_index)
         return parse_numeric_value(value)
     
-    def _validate_excel_structure(self, df: pd.DataFrame) -> None:
+    def _validate_excel_structure(self, num_cols: int, head_rows: List[Row]) -> None:
         """
         Проверяет структуру Excel файла и выводит предупреждения при проблемах.
         
         Args:
-            df: DataFrame с данными Excel
+            num_cols: Число колонок листа
+            head_rows: Первые строки листа (заголовок и несколько строк данных)
         """
-        num_cols = df.shape[1]
         if num_cols <= self.COL_COST_WITH_CARGO:
             print(f"⚠️  ВНИМАНИЕ: В Excel файле только {num_cols} колонок, а нужна колонка N (индекс {self.COL_COST_WITH_CARGO})")
             print(f"   Возможно, структура файла изменилась или данные в других колонках")
             return
         
         # Проверяем наличие данных в ключевых колонках
-        sample_rows = min(5, len(df) - 1)
+        sample_rows = min(5, len(head_rows) - 1)
         if sample_rows == 0:
             return
         
         found_prices = 0
         found_costs = 0
         for i in range(1, sample_rows + 1):
-            price_val = safe_get_cell(df.iloc[i], self.COL_PRICE_USD)
-            cost_val = safe_get_cell(df.iloc[i], self.COL_COST_WITH_CARGO)
+            price_val = safe_get_cell(head_rows[i], self.COL_PRICE_USD)
+            cost_val = safe_get_cell(head_rows[i], self.COL_COST_WITH_CARGO)
             if not is_empty_value(price_val):
                 found_prices += 1
             if not is_empty_value(cost_val):
@@ -461,21 +590,21 @@ class ExcelParser:
             print(f"⚠️  ВНИМАНИЕ: В первых {sample_rows} строках данных колонка N (индекс {self.COL_COST_WITH_CARGO}) пустая")
             print(f"   Проверьте, что в Excel файле колонка 'Себестоимость с учётом карго' заполнена")
     
-    def _get_shipment_sort_key(self, shipment: Dict) -> Tuple[int, int]:
+    def _get_shipment_sort_key(self, shipment: Shipment) -> Tuple[int, int]:
         """
         Возвращает ключ для сортировки поставок.
         
         Args:
-            shipment: Словарь поставки
+            shipment: Поставка
             
         Returns:
             Кортеж (год, номер_поставки) для сортировки по убыванию
         """
-        year = shipment.get('year', 0)
+        year = shipment.year or 0
         # Используем поле number, если доступно, иначе извлекаем из id
-        shipment_num = shipment.get('number', 0)
+        shipment_num = shipment.number
         if shipment_num == 0:
-            shipment_id = shipment.get('id', '')
+            shipment_id = shipment.id
             try:
                 shipment_num = int(shipment_id.split('-')[-1])
             except (ValueError, IndexError):
@@ -483,40 +612,30 @@ class ExcelParser:
         return (-year, -shipment_num)  # Отрицательные для сортировки по убыванию
     
     def _finalize_shipment(
-        self, shipment: Dict, rows: List[pd.Series]
-    ) -> Dict:
+        self, shipment: Shipment, rows: List[Row]
+    ) -> Shipment:
         """
         Финализирует поставку: обрабатывает даты и определяет groupByPayment.
         
         Args:
-            shipment: Словарь поставки
+            shipment: Поставка
             rows: Все строки этой поставки
             
         Returns:
             Финализированная поставка
         """
-        # Обработка колонки P (даты/ETA)
-        received_date, eta = self._process_date_column(rows)
-        
-        if eta:
-            shipment["eta"] = eta
-        elif received_date:
-            shipment["receivedDate"] = received_date
+        # Обработка колонки P (даты/ETA), приоритет у ETA
+        shipment.received_date, shipment.eta = self._process_date_column(rows)
         
         # Определение groupByPayment: true если ВСЕ позиции без цены
-        raw_items = shipment.get("rawItems", [])
+        raw_items = shipment.raw_items
         if raw_items:
-            all_items_no_price = all(
-                "price" not in item or item.get("price") is None
-                for item in raw_items
-            )
-            if all_items_no_price:
-                shipment["groupByPayment"] = True
+            shipment.group_by_payment = all(item.price is None for item in raw_items)
         
         return shipment
     
     def _process_date_column(
-        self, rows: List[pd.Series]
+        self, rows: List[Row]
     ) -> Tuple[Optional[str], Optional[str]]:
         """
         Обрабатывает колонку P (даты/ETA) по всем строкам поставки.
@@ -570,3 +689,28 @@ class ExcelParser:
                 return parsed_dates[0][1], None
         
         return None, None
+
+
+class _ChunkParser(ExcelParser):
+    """Парсер чанка блоков в процессе пула: ведёт локальный каталог и журнал обращений к нему."""
+
+    def __init__(self, reader: str):
+        super().__init__("", [], reader=reader)
+        self.catalog_links: List[CatalogLink] = []
+
+    def _link_product(self, name: str, excel_row: int, materials: Dict[str, str]) -> str:
+        product_id = super()._link_product(name, excel_row, materials)
+        self.catalog_links.append((product_id, excel_row, materials))
+        return product_id
+
+
+def _parse_block_chunk(
+    reader: str,
+    blocks: List[ShipmentBlock],
+) -> Tuple[List[Shipment], List[Dict], List[CatalogLink]]:
+    """Задача пула: разбирает чанк блоков с локальным каталогом (см. _merge_chunk_catalog)."""
+    parser = _ChunkParser(reader)
+    # Сообщения о новых товарах печатает слияние в основном процессе
+    with redirect_stdout(StringIO()):
+        shipments = [parser._parse_block(block) for block in blocks]
+    return shipments, parser.products, parser.catalog_links
@@ -4,74 +4,129 @@
 Загружает таблицу напрямую из Google Docs в формате xlsx,
 избавляя от необходимости скачивать файл вручную.
 
+С --format csv загружается только вкладка "Поставки" (по её gid) в CSV:
+это в разы меньше, чем xlsx со всеми вкладками, и парсится без распаковки XML.
+
 Требования:
 - Таблица должна быть доступна по ссылке (настройка "Все, у кого есть ссылка")
 """
 
+import argparse
 import sys
 from pathlib import Path
+from typing import Optional, Tuple
 from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
 
 # ID таблицы из URL: https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/edit
 SPREADSHEET_ID = "1Z8RE-Gt7itH15PuCb2tW7GffffgwzASPtMolbWSM0O0"
 
-# Имя файла для сохранения
+# gid вкладки "Поставки" из URL: .../edit#gid={SHIPMENTS_SHEET_GID}
+SHIPMENTS_SHEET_GID = "0"
+
+EXPORT_BASE_URL = "https://docs.google.com/spreadsheets/d"
+
+FORMAT_XLSX = "xlsx"
+FORMAT_CSV = "csv"
+
+# Имена файлов для сохранения
 OUTPUT_FILENAME = "Расчёты с мехметом new.xlsx"
+CSV_OUTPUT_FILENAME = "Поставки.csv"
 
+REQUEST_TIMEOUT_SECONDS = 30
 
-def fetch_google_sheet():
-    """Загружает таблицу из Google Sheets и сохраняет как xlsx"""
-    
-    script_dir = Path(__file__).parent
-    output_path = script_dir / OUTPUT_FILENAME
-    
-    # URL для экспорта Google Sheets в формате xlsx
-    export_url = f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/export?format=xlsx"
-    
-    print(f"📥 Загрузка таблицы из Google Docs...")
-    print(f"   ID: {SPREADSHEET_ID}")
-    
+
+def build_export_url(export_format: str = FORMAT_XLSX, base_url: str = EXPORT_BASE_URL) -> str:
+    """URL экспорта: вся книга в xlsx или одна вкладка в CSV."""
+    url = f"{base_url}/{SPREADSHEET_ID}/export?format={export_format}"
+    if export_format == FORMAT_CSV:
+        url += f"&gid={SHIPMENTS_SHEET_GID}"
+    return url
+
+
+def is_expected_content(content: bytes, export_format: str) -> bool:
+    """Проверяет, что Google вернул файл, а не HTML-страницу входа или ошибки."""
+    if export_format == FORMAT_XLSX:
+        return content.startswith(b"PK")
+    head = content[:512].lstrip().lower()
+    return not (head.startswith(b"<!doctype html") or head.startswith(b"<html"))
+
+
+def read_export(url: str) -> Tuple[bytes, str]:
+    """
+    Скачивает выгрузку таблицы, сетевые ошибки пробрасываются вызывающему.
+
+    Returns:
+        (содержимое, content-type)
+    """
+    request = Request(
+        url,
+        headers={
+            "User-Agent": "Mozilla/5.0",
+        },
+    )
+    with urlopen(request, timeout=REQUEST_TIMEOUT_SECONDS) as response:
+        return response.read(), response.headers.get("content-type", "")
+
+
+def download_export(url: str) -> Tuple[Optional[bytes], str]:
+    """
+    Скачивает выгрузку таблицы и печатает понятную ошибку при сбое сети.
+
+    Returns:
+        (содержимое или None при сетевой ошибке, content-type)
+    """
     try:
-        request = Request(
-            export_url,
-            headers={
-                "User-Agent": "Mozilla/5.0",
-            },
-        )
-        with urlopen(request, timeout=30) as response:
-            content = response.read()
-            content_type = response.headers.get("content-type", "")
-        
-        # Проверяем, что получили xlsx, а не HTML-страницу с ошибкой
-        is_xlsx = content.startswith(b"PK")
-        if not is_xlsx:
-            if "text/html" in content_type:
-                print(f"❌ Ошибка: таблица недоступна по ссылке.")
-                print(f"   Убедитесь, что в настройках доступа выбрано")
-                print(f"   'Все, у кого есть ссылка' → 'Читатель'")
-                return False
-            print(f"❌ Ошибка: Google вернул не XLSX-файл (content-type: {content_type or 'unknown'})")
-            return False
-        
-        # Сохраняем файл
-        with open(output_path, "wb") as f:
-            f.write(content)
-        
-        file_size_kb = len(content) / 1024
-        print(f"✅ Таблица успешно загружена: {OUTPUT_FILENAME} ({file_size_kb:.1f} KB)")
-        return True
-        
+        return read_export(url)
     except TimeoutError:
-        print(f"❌ Ошибка: превышено время ожидания (30 сек)")
-        return False
+        print(f"❌ Ошибка: превышено время ожидания ({REQUEST_TIMEOUT_SECONDS} сек)")
     except HTTPError as e:
         print(f"❌ Ошибка при загрузке: HTTP {e.code} {e.reason}")
-        return False
     except URLError as e:
         print(f"❌ Ошибка при загрузке: {e}")
+    return None, ""
+
+
+def fetch_google_sheet(export_format: str = FORMAT_XLSX, url: Optional[str] = None) -> bool:
+    """Загружает таблицу из Google Sheets и сохраняет как xlsx (или вкладку поставок как CSV)"""
+
+    script_dir = Path(__file__).parent
+    filename = CSV_OUTPUT_FILENAME if export_format == FORMAT_CSV else OUTPUT_FILENAME
+    output_path = script_dir / filename
+
+    # URL для экспорта Google Sheets
+    export_url = url or build_export_url(export_format)
+
+    print(f"📥 Загрузка таблицы из Google Docs ({export_format})...")
+    print(f"   ID: {SPREADSHEET_ID}")
+    if export_format == FORMAT_CSV:
+        print(f"   Вкладка gid: {SHIPMENTS_SHEET_GID}")
+
+    content, content_type = download_export(export_url)
+    if content is None:
         return False
 
+    # Проверяем, что получили файл, а не HTML-страницу с ошибкой
+    if not is_expected_content(content, export_format):
+        if "text/html" in content_type:
+            print(f"❌ Ошибка: таблица недоступна по ссылке.")
+            print(f"   Убедитесь, что в настройках доступа выбрано")
+            print(f"   'Все, у кого есть ссылка' → 'Читатель'")
+            return False
+        print(
+            f"❌ Ошибка: Google вернул не {export_format.upper()}-файл "
+            f"(content-type: {content_type or 'unknown'})"
+        )
+        return False
+
+    # Сохраняем файл
+    with open(output_path, "wb") as f:
+        f.write(content)
+
+    file_size_kb = len(content) / 1024
+    print(f"✅ Таблица успешно загружена: {filename} ({file_size_kb:.1f} KB)")
+    return True
+
 
 if __name__ == "__main__":
     # Настраиваем кодировку вывода для Windows
@@ -82,6 +137,15 @@ if __name__ == "__main__":
             sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
         except AttributeError:
             pass
-    
-    success = fetch_google_sheet()
+
+    arg_parser = argparse.ArgumentParser(description="Загрузка таблицы из Google Sheets")
+    arg_parser.add_argument(
+        "--format",
+        choices=(FORMAT_XLSX, FORMAT_CSV),
+        default=FORMAT_XLSX,
+        help="xlsx — вся книга, csv — только вкладка 'Поставки'",
+    )
+    args = arg_parser.parse_args()
+
+    success = fetch_google_sheet(args.format)
     sys.exit(0 if success else 1)
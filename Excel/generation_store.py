@@ -0,0 +1,161 @@
+"""
+Атомарная публикация генераций data/ и блокировка записи.
+
+Раньше shipments.json, products.json и meta.json заменялись по очереди, и читатель,
+начавший между заменами, видел смесь двух генераций. Теперь каждая генерация
+целиком пишется в свою папку data/generations/<id>/, а затем публикуется одной
+атомарной заменой файла-указателя data/CURRENT (в нём id генерации). Опубликованная
+папка больше не меняется: читатель, который определил папку через
+current_generation_dir, читает согласованный набор файлов, даже если в это время
+публикуется следующая генерация.
+
+Плоские data/*.json (они лежат в git) после публикации обновляются копией из новой
+генерации. Python-читатели (data_api, load_generation, выгрузки, snapshots) идут через
+указатель, а next build — через снимок генерации по указателю (next.config.js,
+scripts/published_generation.cjs).
+
+Вся запись генерации идёт под эксклюзивной блокировкой data/.write.lock
+(flock, на Windows — msvcrt.locking): watch_excel.py, sync_daemon.py и ручной запуск
+не перемешивают файлы друг друга, а второй писатель ждёт первого.
+
+Последние KEEP_GENERATIONS папок хранятся, более старые удаляются при публикации,
+чтобы читатель, взявший указатель чуть раньше, успел дочитать свою генерацию.
+"""
+
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+from json_storage import write_text_atomic
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _try_lock(handle) -> bool:
+        handle.seek(0)
+        try:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(handle) -> None:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _try_lock(handle) -> bool:
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    def _unlock(handle) -> None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+GENERATIONS_DIRNAME = "generations"
+POINTER_FILENAME = "CURRENT"
+LOCK_FILENAME = ".write.lock"
+
+# Сколько опубликованных генераций хранить (текущая всегда среди них)
+KEEP_GENERATIONS = 3
+LOCK_POLL_SECONDS = 0.1
+
+
+@contextmanager
+def writer_lock(
+    data_dir: Path,
+    timeout: Optional[float] = None,
+    log: Callable[[str], None] = print,
+) -> Iterator[None]:
+    """
+    Эксклюзивная блокировка записи в data_dir на время блока with.
+
+    Блокировка снимается ОС и при падении процесса, поэтому «зависшей» не бывает.
+
+    Raises:
+        TimeoutError: блокировку не удалось взять за timeout секунд
+    """
+    data_dir.mkdir(parents=True, exist_ok=True)
+    with open(data_dir / LOCK_FILENAME, "a+b") as handle:
+        if not _try_lock(handle):
+            log(f"⏳ В {data_dir} пишет другой запуск, жду освобождения блокировки...")
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not _try_lock(handle):
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(f"Блокировка {data_dir / LOCK_FILENAME} занята дольше {timeout} с")
+                time.sleep(LOCK_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            _unlock(handle)
+
+
+def current_generation_id(data_dir: Path) -> Optional[str]:
+    """id опубликованной генерации или None, если указателя нет или папка пропала."""
+    try:
+        generation_id = (data_dir / POINTER_FILENAME).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    if not generation_id or not (data_dir / GENERATIONS_DIRNAME / generation_id).is_dir():
+        return None
+    return generation_id
+
+
+def current_generation_dir(data_dir: Path) -> Path:
+    """
+    Папка, из которой читать текущую генерацию.
+
+    Без указателя (свежий checkout, данные из git) — сам data_dir с плоскими файлами.
+    """
+    generation_id = current_generation_id(data_dir)
+    if generation_id is None:
+        return data_dir
+    return data_dir / GENERATIONS_DIRNAME / generation_id
+
+
+def list_generation_ids(data_dir: Path) -> List[str]:
+    """id папок генераций от старых к новым (id — UTC-время, сортируется как строка)."""
+    generations_dir = data_dir / GENERATIONS_DIRNAME
+    if not generations_dir.exists():
+        return []
+    return sorted(path.name for path in generations_dir.iterdir() if path.is_dir())
+
+
+def new_generation_dir(data_dir: Path) -> Path:
+    """Создаёт пустую папку для новой генерации; до publish_generation её никто не читает."""
+    base_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    generation_id = base_id
+    suffix = 2
+    while (data_dir / GENERATIONS_DIRNAME / generation_id).exists():
+        generation_id = f"{base_id}-{suffix}"
+        suffix += 1
+    generation_dir = data_dir / GENERATIONS_DIRNAME / generation_id
+    generation_dir.mkdir(parents=True)
+    return generation_dir
+
+
+def publish_generation(data_dir: Path, generation_dir: Path) -> None:
+    """
+    Делает полностью записанную generation_dir текущей и удаляет старые генерации.
+
+    Вызывается под writer_lock: переключение указателя — одна атомарная замена файла.
+    """
+    write_text_atomic(data_dir / POINTER_FILENAME, f"{generation_dir.name}\n")
+    stale_ids = list_generation_ids(data_dir)[:-KEEP_GENERATIONS]
+    for generation_id in stale_ids:
+        if generation_id != generation_dir.name:
+            shutil.rmtree(data_dir / GENERATIONS_DIRNAME / generation_id, ignore_errors=True)
+
+
+def discard_generation(generation_dir: Path) -> None:
+    """Удаляет недописанную генерацию после ошибки записи."""
+    shutil.rmtree(generation_dir, ignore_errors=True)
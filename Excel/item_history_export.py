@@ -0,0 +1,264 @@
+"""
+Колоночная выгрузка истории позиций для анализа маржи и объёмов.
+
+Каждая позиция поставки разворачивается в одну строку типизированной таблицы:
+год, номер и статус поставки, категория товара, количество по каждому размеру,
+price, cost и признак известного курса списания. Курс в shipments.json не хранится:
+парсер берёт cost только при положительном курсе (колонка J), поэтому
+has_exchange_rate — это «у позиции есть cost».
+
+Таблица копится по генерациям в data/exports/: каждая новая генерация дописывается
+к истории, колонка generation_at (meta.updatedAt) отличает генерации друг от друга.
+Генерация, позиции которой не изменились с прошлой дописанной, пропускается.
+
+- Parquet (если установлен pyarrow или fastparquet): папка item-history.parquet/,
+  по файлу на генерацию; pandas.read_parquet читает её целиком одним вызовом.
+- Иначе CSV: item-history.csv.gz, каждая генерация дописывается отдельным
+  gzip-блоком, так что файл читается одним pandas.read_csv. Типы колонок
+  восстанавливает load_item_history.
+
+Формат выбирается при первой выгрузке и записывается в item-history.json;
+дальше история дописывается в том же формате.
+"""
+
+import argparse
+import gzip
+import hashlib
+import importlib.util
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from generation_store import current_generation_dir
+from json_storage import load_json_file, write_json_atomic
+from shipment_encoding import expand_shipments_payload
+from utils import SIZE_ORDER
+
+if sys.platform == "win32":
+    import io
+
+    try:
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
+        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+    except AttributeError:
+        pass
+
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+EXPORTS_DIR = DATA_DIR / "exports"
+INDEX_FILENAME = "item-history.json"
+PARQUET_DIRNAME = "item-history.parquet"
+CSV_FILENAME = "item-history.csv.gz"
+
+FORMAT_AUTO = "auto"
+FORMAT_PARQUET = "parquet"
+FORMAT_CSV = "csv"
+FORMAT_CHOICES = (FORMAT_AUTO, FORMAT_PARQUET, FORMAT_CSV)
+
+# Движки pandas для Parquet в порядке предпочтения
+PARQUET_ENGINES = ("pyarrow", "fastparquet")
+
+# Колонки в порядке таблицы и их типы pandas (nullable, чтобы пустое значение не превращало int в float)
+COLUMNS: Dict[str, str] = {
+    "generation_at": "datetime64[ns, UTC]",
+    "shipment_id": "string",
+    "shipment_year": "Int64",
+    "shipment_number": "Int64",
+    "shipment_status": "string",
+    "item_position": "Int64",
+    "product_id": "string",
+    "product_category": "string",
+    "override_name": "string",
+    "item_status": "string",
+    "effective_status": "string",
+    "price": "Float64",
+    "cost": "Float64",
+    "has_exchange_rate": "boolean",
+    "quantity": "Int64",
+    "sizes_unknown": "boolean",
+    "sample": "boolean",
+    "in_transit": "boolean",
+    **{f"size_{size}": "Int64" for size in SIZE_ORDER},
+}
+
+
+def parquet_engine() -> Optional[str]:
+    """Установленный движок Parquet или None (без импорта модулей)."""
+    for engine in PARQUET_ENGINES:
+        if importlib.util.find_spec(engine) is not None:
+            return engine
+    return None
+
+
+def flatten_items(
+    shipments: List[Dict[str, Any]],
+    products_data: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """Строки истории для одной генерации, без generation_at, в порядке shipments.json."""
+    categories = {product["id"]: product.get("category") for product in products_data.get("products", [])}
+    rows = []
+    for shipment in shipments:
+        for position, item in enumerate(shipment.get("rawItems", [])):
+            # Ключи размеров канонические (xs … OneSize), колонки — в нижнем регистре
+            sizes = {size.lower(): count for size, count in (item.get("sizes") or {}).items()}
+            quantity = item.get("quantityOverride")
+            if quantity is None:
+                quantity = sum(sizes.values())
+            rows.append(
+                {
+                    "shipment_id": shipment["id"],
+                    "shipment_year": shipment.get("year"),
+                    "shipment_number": shipment["number"],
+                    "shipment_status": shipment["status"],
+                    "item_position": position,
+                    "product_id": item["productId"],
+                    "product_category": categories.get(item["productId"]),
+                    "override_name": item["overrideName"],
+                    "item_status": item.get("status"),
+                    "effective_status": item.get("status") or shipment["status"],
+                    "price": item.get("price"),
+                    "cost": item.get("cost"),
+                    "has_exchange_rate": item.get("cost") is not None,
+                    "quantity": quantity,
+                    "sizes_unknown": bool(item.get("sizesUnknown")),
+                    "sample": bool(item.get("sample")),
+                    "in_transit": bool(item.get("inTransit")),
+                    **{f"size_{size}": sizes.get(size, 0) for size in SIZE_ORDER},
+                }
+            )
+    return rows
+
+
+def _rows_hash(rows: List[Dict[str, Any]]) -> str:
+    payload = json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _build_frame(rows: List[Dict[str, Any]], generation_at: str):
+    import pandas as pd
+
+    frame = pd.DataFrame([{"generation_at": generation_at, **row} for row in rows], columns=list(COLUMNS))
+    frame["generation_at"] = pd.to_datetime(frame["generation_at"], utc=True)
+    return frame.astype(COLUMNS)
+
+
+def append_item_history(
+    shipments: List[Dict[str, Any]],
+    products_data: Dict[str, Any],
+    meta: Dict[str, Any],
+    exports_dir: Path = EXPORTS_DIR,
+    export_format: str = FORMAT_AUTO,
+) -> Optional[Dict[str, Any]]:
+    """
+    Дописывает генерацию к истории позиций.
+
+    Returns:
+        Запись о дописанной генерации или None, если позиции не изменились
+
+    Raises:
+        ValueError: Parquet запрошен или уже выбран для истории, но движок не установлен
+    """
+    index_file = exports_dir / INDEX_FILENAME
+    index = load_json_file(index_file) if index_file.exists() else {"format": None, "generations": []}
+
+    export_format = index["format"] or export_format
+    if export_format == FORMAT_AUTO:
+        export_format = FORMAT_PARQUET if parquet_engine() else FORMAT_CSV
+    engine = parquet_engine()
+    if export_format == FORMAT_PARQUET and engine is None:
+        raise ValueError(f"Для Parquet нужен один из модулей: {', '.join(PARQUET_ENGINES)}")
+
+    rows = flatten_items(shipments, products_data)
+    content_hash = _rows_hash(rows)
+    if index["generations"] and index["generations"][-1]["contentHash"] == content_hash:
+        return None
+
+    generation_at = meta["updatedAt"]
+    frame = _build_frame(rows, generation_at)
+    exports_dir.mkdir(parents=True, exist_ok=True)
+    if export_format == FORMAT_PARQUET:
+        stamp = datetime.fromisoformat(generation_at).strftime("%Y%m%dT%H%M%S%fZ")
+        part = Path(PARQUET_DIRNAME) / f"generation-{stamp}.parquet"
+        (exports_dir / part).parent.mkdir(parents=True, exist_ok=True)
+        frame.to_parquet(exports_dir / part, engine=engine, index=False)
+    else:
+        part = Path(CSV_FILENAME)
+        is_new_file = not (exports_dir / part).exists()
+        text = frame.to_csv(header=is_new_file, index=False)
+        # Новый gzip-блок дописывается одним write в конец файла:
+        # gzip и pandas читают склейку блоков как один поток
+        with open(exports_dir / part, "ab") as handle:
+            handle.write(gzip.compress(text.encode("utf-8"), mtime=0))
+
+    generation = {
+        "generationAt": generation_at,
+        "file": part.as_posix(),
+        "rowsCount": len(frame),
+        "contentHash": content_hash,
+    }
+    index["format"] = export_format
+    index["generations"].append(generation)
+    write_json_atomic(index_file, index)
+    return generation
+
+
+def load_item_history(exports_dir: Path = EXPORTS_DIR):
+    """Читает всю историю позиций одним чтением в типизированный DataFrame."""
+    import pandas as pd
+
+    index = load_json_file(exports_dir / INDEX_FILENAME)
+    if index["format"] == FORMAT_PARQUET:
+        return pd.read_parquet(exports_dir / PARQUET_DIRNAME, engine=parquet_engine())
+
+    dtypes = {column: dtype for column, dtype in COLUMNS.items() if column != "generation_at"}
+    frame = pd.read_csv(exports_dir / CSV_FILENAME, dtype=dtypes)
+    frame["generation_at"] = pd.to_datetime(frame["generation_at"], utc=True)
+    return frame
+
+
+def write_item_history(
+    shipments: List[Dict[str, Any]],
+    products_data: Dict[str, Any],
+    meta: Dict[str, Any],
+    exports_dir: Path = EXPORTS_DIR,
+    export_format: str = FORMAT_AUTO,
+) -> bool:
+    """Этап item-history: дописывает генерацию и печатает, куда она попала."""
+    try:
+        generation = append_item_history(shipments, products_data, meta, exports_dir, export_format)
+    except (OSError, ValueError, ImportError) as error:
+        print(f"❌ Не удалось дописать историю позиций: {error}")
+        return False
+    if generation is None:
+        print("📊 История позиций: позиции не изменились с прошлой генерации")
+    else:
+        print(
+            f"📊 История позиций: +{generation['rowsCount']} строк → "
+            f"{exports_dir / generation['file']}"
+        )
+    return True
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Дописать data/*.json в колоночную историю позиций")
+    arg_parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="папка generated data")
+    arg_parser.add_argument(
+        "--format",
+        choices=FORMAT_CHOICES,
+        default=FORMAT_AUTO,
+        help="формат первой выгрузки (auto — Parquet, если установлен pyarrow или fastparquet)",
+    )
+    args = arg_parser.parse_args()
+
+    generation_dir = current_generation_dir(args.data_dir)
+    try:
+        products_data = load_json_file(generation_dir / "products.json")
+        shipments = expand_shipments_payload(load_json_file(generation_dir / "shipments.json"), products_data)
+        meta = load_json_file(generation_dir / "meta.json")
+    except (OSError, ValueError) as error:
+        print(f"❌ Не удалось загрузить generated data: {error}")
+        sys.exit(1)
+    success = write_item_history(shipments, products_data, meta, args.data_dir / "exports", args.format)
+    sys.exit(0 if success else 1)
@@ -13,21 +13,47 @@ def load_json_file(path: Path) -> Any:
         return json.load(file)
 
 
-def write_json_atomic(path: Path, payload: Any) -> None:
+def dump_json_text(payload: Any) -> str:
+    """Сериализует JSON в том же формате, в котором пайплайн пишет файлы."""
+    return json.dumps(payload, ensure_ascii=False, indent=2)
+
+
+def write_text_atomic(path: Path, text: str) -> None:
     """
-    Атомарно записывает JSON в файл.
+    Атомарно записывает текст в файл.
 
     Сначала пишет во временный `.tmp`, затем заменяет целевой файл.
-    Так мы не оставляем частично записанный JSON при сбое.
+    Так мы не оставляем частично записанный файл при сбое.
     """
     path.parent.mkdir(parents=True, exist_ok=True)
     temp_path = path.with_name(f"{path.name}.tmp")
 
     try:
         with open(temp_path, "w", encoding="utf-8") as file:
-            json.dump(payload, file, ensure_ascii=False, indent=2)
+            file.write(text)
         temp_path.replace(path)
     except Exception:
         if temp_path.exists():
             temp_path.unlink()
         raise
+
+
+def write_json_atomic(path: Path, payload: Any) -> None:
+    """Атомарно записывает JSON в файл (см. write_text_atomic)."""
+    write_text_atomic(path, dump_json_text(payload))
+
+
+def write_json_if_changed(path: Path, payload: Any) -> bool:
+    """
+    Атомарно записывает JSON, только если содержимое файла отличается.
+
+    Неизменившиеся файлы не трогаются, чтобы dev-сервер и кеши не перестраивались зря.
+
+    Returns:
+        True, если файл был перезаписан
+    """
+    text = dump_json_text(payload)
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    write_text_atomic(path, text)
+    return True
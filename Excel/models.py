@@ -0,0 +1,91 @@
+"""
+Внутренняя модель поставок Excel-парсера.
+
+Пока лист разбирается, позиции и поставки живут в слотовых dataclass: у объекта нет
+собственного __dict__, а поля читаются атрибутами, а не строковыми ключами. В JSON-форму
+shipments.json они превращаются только в to_dict() на выходе ExcelParser.parse(),
+на месте в списке поставок: объект освобождается сразу после своего словаря.
+Порядок и набор ключей to_dict() совпадают с тем, как парсер раньше заполнял словари,
+поэтому файлы data/ не меняются.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+Number = Union[int, float]
+
+
+@dataclass(slots=True)
+class RawItem:
+    """Позиция поставки (элемент rawItems)."""
+
+    override_name: str
+    product_id: str = ""
+    price: Optional[Number] = None
+    cost: Optional[Number] = None
+    sizes_unknown: bool = False
+    sizes: Optional[Dict[str, int]] = None
+    quantity_override: Optional[int] = None
+    status: Optional[str] = None
+    in_transit: bool = False
+    sample: bool = False
+    # quantityOverride = 1 подставлен по признаку образца: в JSON он идёт после sample
+    sample_quantity: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        item: Dict[str, Any] = {
+            "overrideName": self.override_name,
+            "productId": self.product_id,
+        }
+        if self.price is not None:
+            item["price"] = self.price
+        if self.cost is not None:
+            item["cost"] = self.cost
+        if self.sizes_unknown:
+            item["sizesUnknown"] = True
+        elif self.sizes:
+            item["sizes"] = self.sizes
+        if self.quantity_override is not None and not self.sample_quantity:
+            item["quantityOverride"] = self.quantity_override
+        if self.status:
+            item["status"] = self.status
+        if self.in_transit:
+            item["inTransit"] = True
+        if self.sample:
+            item["sample"] = True
+        if self.sample_quantity:
+            item["quantityOverride"] = self.quantity_override
+        return item
+
+
+@dataclass(slots=True)
+class Shipment:
+    """Поставка (элемент shipments.json) с позициями в raw_items."""
+
+    id: str
+    number: int
+    title: str
+    status: str
+    raw_items: List[RawItem] = field(default_factory=list)
+    year: Optional[int] = None
+    eta: Optional[str] = None
+    received_date: Optional[str] = None
+    group_by_payment: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        shipment: Dict[str, Any] = {
+            "id": self.id,
+            "number": self.number,
+            "title": self.title,
+            "status": self.status,
+            "rawItems": [item.to_dict() for item in self.raw_items],
+        }
+        if self.year is not None:
+            shipment["year"] = self.year
+        if self.eta:
+            shipment["eta"] = self.eta
+        elif self.received_date:
+            shipment["receivedDate"] = self.received_date
+        if self.group_by_payment:
+            shipment["groupByPayment"] = True
+        return shipment
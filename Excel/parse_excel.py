@@ -1,16 +1,30 @@
 """
 Главный скрипт парсинга Excel файла для преобразования в JSON формат поставок.
 После парсинга обновляет каталог в памяти, валидирует generated data и только потом пишет JSON на диск.
+
+Сами этапы — в pipeline_api.py; этот скрипт — CLI-обёртка над ними с журналом запусков
+и необязательными выгрузками (SQLite, история позиций).
 """
 
+import argparse
 import sys
+import time
 from pathlib import Path
-from datetime import datetime, timezone
-from catalog_pricing import apply_latest_prices
-from data_validator import validate_generated_outputs
-from excel_parser import ExcelParser
-from json_storage import write_json_atomic
-from utils import infer_category, aggregate_product_sizes, assign_product_photos
+from typing import Any, Dict, Optional
+from item_history_export import write_item_history
+from pipeline_api import (
+    commit_generation,
+    parse_generation,
+    price_generation,
+    source_file_for_reader,
+    validate_generation,
+)
+from profiling import NULL_PROFILER, StageProfiler, add_profile_arguments, profiler_from_args
+from run_metrics import RUN_HISTORY_FILE, build_run_record, log_run, timed_stage
+from shipment_encoding import COMPACT_SCHEMA_VERSION
+from snapshot_store import SNAPSHOT_DIR
+from sqlite_export import write_sqlite_export
+from workbook_readers import READER_CHOICES, READER_PANDAS
 
 # Настраиваем кодировку вывода для Windows (чтобы эмодзи работали)
 if sys.platform == 'win32':
@@ -23,99 +37,171 @@ if sys.platform == 'win32':
         pass
 
 
-def build_meta() -> dict:
-    """Формирует метаданные об обновлении данных."""
-    return {
-        "updatedAt": datetime.now(timezone.utc).isoformat(),
-        "source": "excel",
-    }
-
-
-def parse_excel() -> bool:
-    """Парсит Excel файл, собирает generated data и сохраняет её только после валидации."""
-    script_dir = Path(__file__).parent
-    excel_file = script_dir / "Расчёты с мехметом new.xlsx"
-    products_file = script_dir.parent / "data" / "products.json"
-    shipments_file = script_dir.parent / "data" / "shipments.json"
-    meta_file = script_dir.parent / "data" / "meta.json"
-
-    if not excel_file.exists():
-        print(f"❌ Excel файл не найден: {excel_file}")
-        print(f"   Убедитесь, что файл 'Расчёты с мехметом new.xlsx' находится в папке Excel/")
+def _run_parse_stages(
+    shipments_schema: int,
+    reader: str,
+    profiler: StageProfiler,
+    run: Dict[str, Any],
+    workers: int,
+    snapshot_dir: Optional[Path],
+    sqlite: bool,
+    item_history: bool,
+) -> bool:
+    """Этапы parse → pricing → validation → write (→ выгрузки); сводки этапов собираются в run."""
+    stage_seconds = run["stageSeconds"]
+    with timed_stage(stage_seconds, "parse"):
+        generation = parse_generation(source_file_for_reader(reader), reader=reader, workers=workers, profiler=profiler)
+    if generation is None:
         return False
+    run["parse"] = generation.parse_stats
+    shipments, products_data, meta = generation.shipments, generation.products_data, generation.meta
 
-    print(f"📂 Собираю каталог заново из Excel...")
-    products_data = {"products": []}
-    products = products_data["products"]
+    with timed_stage(stage_seconds, "pricing"):
+        pricing_stats = price_generation(generation, profiler=profiler)
+    run["pricing"] = pricing_stats
 
-    print(f"\n📊 Парсинг Excel файла: {excel_file}...")
-    # Создаём парсер и парсим
-    try:
-        parser = ExcelParser(str(excel_file), products)
-        shipments = parser.parse()
-        print(f"✅ Успешно обработано {len(shipments)} поставок")
-        
-        # Подсчитываем общее количество позиций
-        total_items = sum(len(shipment.get('rawItems', [])) for shipment in shipments)
-        print(f"📦 Всего позиций: {total_items}")
-        
-    except Exception as e:
-        print(f"❌ Ошибка при парсинге Excel файла: {e}")
-        import traceback
-        traceback.print_exc()
+    with timed_stage(stage_seconds, "validation"):
+        is_valid = validate_generation(generation, profiler=profiler)
+    if not is_valid:
         return False
 
-    # Собираем размеры каталога из всех позиций поставок (один проход)
-    aggregate_product_sizes(shipments, products)
-    assign_product_photos(
-        products,
-        script_dir.parent / "public" / "images" / "products" / "jpg",
-    )
-
-    # Обновляем категорию у всех товаров по названию (при каждом парсинге — полное обновление)
-    for product in products:
-        name = product.get("name", "")
-        if name:
-            product["category"] = infer_category(name)
-
-    print(f"\n" + "="*50)
-    print(f"🔄 Обновляю цены и себестоимость каталога в памяти...")
-    pricing_stats = apply_latest_prices(products_data, shipments, log=print)
-    meta = build_meta()
-
-    errors = validate_generated_outputs(shipments, products_data, meta)
-    if errors:
-        print("\n❌ Generated data не прошли валидацию:")
-        for error in errors:
-            print(f"   - {error}")
+    with timed_stage(stage_seconds, "write"):
+        is_written = commit_generation(
+            generation,
+            shipments_schema=shipments_schema,
+            profiler=profiler,
+            snapshot_dir=snapshot_dir,
+        )
+    run["write"] = generation.write_stats
+    if not is_written:
         return False
 
-    print(f"\n💾 Сохраняю validated data...")
-    try:
-        write_json_atomic(shipments_file, shipments)
-        print(f"✅ Поставки сохранены: {shipments_file}")
-        write_json_atomic(products_file, products_data)
-        print(f"✅ Каталог сохранён: {products_file}")
-        write_json_atomic(meta_file, meta)
-        print(f"✅ Метаданные сохранены: {meta_file}")
-        print(f"\n✅ Парсинг, обновление цен и валидация завершены успешно!")
-        if pricing_stats["missingProductIds"]:
-            print(
-                "⚠️  Обнаружены productId без карточки каталога: "
-                + ", ".join(pricing_stats["missingProductIds"])
-            )
-        return True
-    except Exception as e:
-        print(f"❌ Ошибка при сохранении generated data: {e}")
-        return False
+    if sqlite:
+        with timed_stage(stage_seconds, "sqlite"), profiler.stage("export:sqlite"):
+            is_exported = write_sqlite_export(shipments, products_data, meta)
+        if not is_exported:
+            return False
+
+    if item_history:
+        with timed_stage(stage_seconds, "item-history"), profiler.stage("export:item-history"):
+            is_appended = write_item_history(shipments, products_data, meta)
+        if not is_appended:
+            return False
+
+    print(f"\n✅ Парсинг, обновление цен и валидация завершены успешно!")
+    if pricing_stats["missingProductIds"]:
+        print(
+            "⚠️  Обнаружены productId без карточки каталога: "
+            + ", ".join(pricing_stats["missingProductIds"])
+        )
+    return True
+
+
+def parse_excel(
+    shipments_schema: int = 1,
+    reader: str = READER_PANDAS,
+    profiler: StageProfiler = NULL_PROFILER,
+    history_file: Optional[Path] = RUN_HISTORY_FILE,
+    workers: int = 1,
+    snapshot_dir: Optional[Path] = SNAPSHOT_DIR,
+    sqlite: bool = False,
+    item_history: bool = False,
+) -> bool:
+    """
+    Парсит Excel файл, собирает generated data и сохраняет её только после валидации.
+
+    Args:
+        shipments_schema: 1 — обычный shipments.json, 2 — компактная схема (см. shipment_encoding)
+        reader: бэкенд чтения листа (см. workbook_readers)
+        profiler: замер этапов (--profile), сводка попадает в meta.json
+        history_file: журнал запусков (см. run_metrics), None — не писать
+        workers: число процессов для разбора блоков поставок (0 — по числу ядер)
+        snapshot_dir: архив генераций (см. snapshot_store), None — не сохранять снимок
+        sqlite: после записи пересобрать data/exports/mehmet.sqlite3 (см. sqlite_export)
+        item_history: дописать генерацию в колоночную историю позиций (см. item_history_export)
+    """
+    run: Dict[str, Any] = {"stageSeconds": {}, "parse": {}, "pricing": {}, "write": {}}
+    started_at = time.perf_counter()
+    success = _run_parse_stages(shipments_schema, reader, profiler, run, workers, snapshot_dir, sqlite, item_history)
+
+    if history_file is not None:
+        record = build_run_record(
+            "parse_excel",
+            success,
+            time.perf_counter() - started_at,
+            run["stageSeconds"],
+            parse_stats=run["parse"],
+            pricing_stats=run["pricing"],
+            write_stats=run["write"],
+        )
+        log_run(record, history_file)
+    return success
 
 
 if __name__ == "__main__":
-    success = parse_excel()
+    arg_parser = argparse.ArgumentParser(description="Парсинг Excel → data/*.json")
+    arg_parser.add_argument("--auto", action="store_true", help="неинтерактивный запуск без паузы в конце")
+    arg_parser.add_argument(
+        "--shipments-schema",
+        type=int,
+        choices=(1, COMPACT_SCHEMA_VERSION),
+        default=1,
+        help="версия схемы shipments.json (2 — компактная, со словарём статусов)",
+    )
+    arg_parser.add_argument(
+        "--reader",
+        choices=READER_CHOICES,
+        default=READER_PANDAS,
+        help="бэкенд чтения листа (auto — самый быстрый установленный, см. compare_readers.py)",
+    )
+    add_profile_arguments(arg_parser)
+    arg_parser.add_argument(
+        "--run-history",
+        type=Path,
+        default=RUN_HISTORY_FILE,
+        help="журнал запусков JSON lines (см. run_metrics.py)",
+    )
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="процессов для разбора блоков поставок (0 — по числу ядер)",
+    )
+    arg_parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="не сохранять генерацию в архив снимков (см. snapshots.py)",
+    )
+    arg_parser.add_argument(
+        "--sqlite",
+        action="store_true",
+        help="после записи пересобрать SQLite-выгрузку data/exports/ (см. sqlite_export.py)",
+    )
+    arg_parser.add_argument(
+        "--item-history",
+        action="store_true",
+        help="дописать генерацию в колоночную историю позиций data/exports/ (см. item_history_export.py)",
+    )
+    args = arg_parser.parse_args()
+
+    profiler = profiler_from_args("parse_excel", args)
+    profiler.start()
+    try:
+        success = parse_excel(
+            shipments_schema=args.shipments_schema,
+            reader=args.reader,
+            profiler=profiler,
+            history_file=args.run_history,
+            workers=args.workers,
+            snapshot_dir=None if args.no_snapshot else SNAPSHOT_DIR,
+            sqlite=args.sqlite,
+            item_history=args.item_history,
+        )
+    finally:
+        profiler.stop()
+    profiler.print_report()
     # Показываем сообщение только при интерактивном запуске (не при автоматическом вызове)
-    import sys
-    # Проверяем, запущен ли скрипт автоматически (через параметр --auto)
-    if "--auto" not in sys.argv:
+    if not args.auto:
         try:
             print("\n" + "="*50)
             input("Нажмите Enter для выхода...")
@@ -0,0 +1,343 @@
+"""
+Единый запуск обновления данных в одном процессе.
+
+Этапы fetch → parse → pricing → validation → write и конвертация изображений
+описаны как граф зависимостей. Независимые этапы (конвертация WebP не зависит
+от парсинга) выполняются параллельно в пуле потоков, поэтому полное обновление
+занимает время критического пути, а не сумму всех этапов.
+
+Коды этапов: 0 — успешно, 1 — ошибка, 2 — пропущен из-за упавшей зависимости.
+"""
+
+import argparse
+import importlib.util
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from fetch_google_sheet import FORMAT_CSV, FORMAT_XLSX, fetch_google_sheet
+from item_history_export import write_item_history
+from pipeline_api import (
+    commit_generation,
+    parse_generation,
+    price_generation,
+    source_file_for_reader,
+    validate_generation,
+)
+from run_metrics import RUN_HISTORY_FILE, build_run_record, log_run
+from shipment_encoding import COMPACT_SCHEMA_VERSION
+from snapshot_store import SNAPSHOT_DIR
+from sqlite_export import write_sqlite_export
+from workbook_readers import READER_CHOICES, READER_CSV, READER_PANDAS
+
+if sys.platform == "win32":
+    import io
+
+    try:
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
+        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+    except AttributeError:
+        pass
+
+
+STAGE_OK = 0
+STAGE_FAILED = 1
+STAGE_SKIPPED = 2
+
+WEBP_SCRIPT = Path(__file__).parent.parent / "scripts" / "convert_to_webp.py"
+
+StageFn = Callable[[Dict[str, Any]], bool]
+
+
+class Stage(NamedTuple):
+    """Этап пайплайна: имя, зависимости и функция, работающая с общим контекстом."""
+
+    name: str
+    dependencies: Tuple[str, ...]
+    run: StageFn
+    # Необязательный этап не влияет на итоговый код выхода (как WebP в bat-файле)
+    required: bool = True
+
+
+def _stage_fetch(context: Dict[str, Any]) -> bool:
+    # Для CSV-бэкенда скачивается только вкладка поставок
+    is_csv = context.get("reader") == READER_CSV
+    return fetch_google_sheet(FORMAT_CSV if is_csv else FORMAT_XLSX)
+
+
+def _stage_parse(context: Dict[str, Any]) -> bool:
+    reader = context.get("reader", READER_PANDAS)
+    generation = parse_generation(
+        source_file_for_reader(reader),
+        reader=reader,
+        workers=context.get("workers", 1),
+    )
+    if generation is None:
+        return False
+    # Этапы дальше работают с одной генерацией в памяти, сводки читаются из неё для журнала
+    context["generation"] = generation
+    context["parse_stats"] = generation.parse_stats
+    context["write_stats"] = generation.write_stats
+    return True
+
+
+def _stage_pricing(context: Dict[str, Any]) -> bool:
+    context["pricing_stats"] = price_generation(context["generation"])
+    return True
+
+
+def _stage_validation(context: Dict[str, Any]) -> bool:
+    return validate_generation(context["generation"])
+
+
+def _stage_write(context: Dict[str, Any]) -> bool:
+    return commit_generation(
+        context["generation"],
+        shipments_schema=context.get("shipments_schema", 1),
+        snapshot_dir=context.get("snapshot_dir"),
+    )
+
+
+def _stage_sqlite(context: Dict[str, Any]) -> bool:
+    generation = context["generation"]
+    return write_sqlite_export(generation.shipments, generation.products_data, generation.meta)
+
+
+def _stage_item_history(context: Dict[str, Any]) -> bool:
+    generation = context["generation"]
+    return write_item_history(generation.shipments, generation.products_data, generation.meta)
+
+
+def _stage_images(context: Dict[str, Any]) -> bool:
+    # convert_to_webp.py живёт в scripts/ и не является пакетом — загружаем модуль по пути
+    spec = importlib.util.spec_from_file_location("convert_to_webp", WEBP_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    stats = module.main()
+    context["image_stats"] = stats
+    return stats["failedCount"] == 0
+
+
+def build_stages(offline: bool = False, sqlite: bool = False, item_history: bool = False) -> List[Stage]:
+    """
+    Возвращает граф этапов полного обновления данных.
+
+    sqlite и item_history добавляют необязательные этапы выгрузок после записи.
+    """
+    parse_dependencies: Tuple[str, ...] = () if offline else ("fetch",)
+    stages = [
+        Stage("parse", parse_dependencies, _stage_parse),
+        Stage("pricing", ("parse",), _stage_pricing),
+        Stage("validation", ("pricing",), _stage_validation),
+        Stage("write", ("validation",), _stage_write),
+        Stage("images", (), _stage_images, required=False),
+    ]
+    if sqlite:
+        stages.append(Stage("sqlite", ("write",), _stage_sqlite, required=False))
+    if item_history:
+        stages.append(Stage("item-history", ("write",), _stage_item_history, required=False))
+    if not offline:
+        stages.insert(0, Stage("fetch", (), _stage_fetch))
+    return stages
+
+
+def _run_stage(stage: Stage, context: Dict[str, Any]) -> Tuple[int, float]:
+    started_at = time.perf_counter()
+    try:
+        exit_code = STAGE_OK if stage.run(context) else STAGE_FAILED
+    except Exception as error:
+        print(f"❌ Этап {stage.name} упал: {error}")
+        traceback.print_exc()
+        exit_code = STAGE_FAILED
+    return exit_code, time.perf_counter() - started_at
+
+
+def run_stages(
+    stages: List[Stage],
+    context: Dict[str, Any],
+    max_workers: int = 4,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Выполняет этапы по графу зависимостей.
+
+    Этап запускается, как только все его зависимости завершились успешно;
+    если хотя бы одна зависимость упала или пропущена, этап помечается пропущенным.
+    """
+    stages_by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        unknown = [name for name in stage.dependencies if name not in stages_by_name]
+        if unknown:
+            raise ValueError(f"Этап {stage.name} зависит от неизвестных этапов: {', '.join(unknown)}")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    pending = list(stages)
+    running: Dict[Future, Stage] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            progressed = True
+            while progressed:
+                progressed = False
+                for stage in list(pending):
+                    dependency_codes = [
+                        results[name]["exitCode"]
+                        for name in stage.dependencies
+                        if name in results
+                    ]
+                    if any(code != STAGE_OK for code in dependency_codes):
+                        results[stage.name] = {"exitCode": STAGE_SKIPPED, "durationSeconds": 0.0}
+                        pending.remove(stage)
+                        progressed = True
+                    elif len(dependency_codes) == len(stage.dependencies):
+                        running[executor.submit(_run_stage, stage, context)] = stage
+                        pending.remove(stage)
+
+            if not running:
+                if pending:
+                    cycle = ", ".join(stage.name for stage in pending)
+                    raise ValueError(f"Циклическая зависимость этапов: {cycle}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                exit_code, duration = future.result()
+                results[stage.name] = {"exitCode": exit_code, "durationSeconds": round(duration, 3)}
+
+    return {stage.name: results[stage.name] for stage in stages}
+
+
+def print_summary(stages: List[Stage], results: Dict[str, Dict[str, Any]]) -> None:
+    labels = {STAGE_OK: "OK", STAGE_FAILED: "ERROR", STAGE_SKIPPED: "SKIPPED"}
+    print("\n" + "=" * 50)
+    print("📋 Этапы пайплайна:")
+    for stage in stages:
+        result = results[stage.name]
+        optional = "" if stage.required else " (необязательный)"
+        print(
+            f"   {stage.name:<13} {result['exitCode']} {labels[result['exitCode']]:<8}"
+            f" {result['durationSeconds']:.2f} s{optional}"
+        )
+
+
+def run_pipeline(
+    offline: bool = False,
+    shipments_schema: int = 1,
+    reader: str = READER_PANDAS,
+    history_file: Optional[Path] = RUN_HISTORY_FILE,
+    workers: int = 1,
+    snapshot_dir: Optional[Path] = SNAPSHOT_DIR,
+    sqlite: bool = False,
+    item_history: bool = False,
+) -> bool:
+    """
+    Запускает полное обновление данных и возвращает True, если все обязательные этапы успешны.
+
+    Метрики запуска дописываются в журнал history_file (см. run_metrics), None — не писать.
+    Записанная генерация сохраняется в архив snapshot_dir (см. snapshot_store), None — не сохранять.
+    """
+    stages = build_stages(offline=offline, sqlite=sqlite, item_history=item_history)
+    context: Dict[str, Any] = {
+        "shipments_schema": shipments_schema,
+        "reader": reader,
+        "workers": workers,
+        "snapshot_dir": snapshot_dir,
+    }
+    started_at = time.perf_counter()
+    results = run_stages(stages, context)
+    print_summary(stages, results)
+
+    success = all(
+        results[stage.name]["exitCode"] == STAGE_OK
+        for stage in stages
+        if stage.required
+    )
+    if history_file is not None:
+        record = build_run_record(
+            "pipeline",
+            success,
+            time.perf_counter() - started_at,
+            {
+                name: result["durationSeconds"]
+                for name, result in results.items()
+                if result["exitCode"] != STAGE_SKIPPED
+            },
+            parse_stats=context.get("parse_stats"),
+            pricing_stats=context.get("pricing_stats"),
+            write_stats=context.get("write_stats"),
+            image_stats=context.get("image_stats"),
+        )
+        log_run(record, history_file)
+    return success
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Полное обновление данных в одном процессе")
+    arg_parser.add_argument("--auto", action="store_true", help="неинтерактивный запуск без паузы в конце")
+    arg_parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="не скачивать таблицу из Google Sheets, парсить локальный xlsx",
+    )
+    arg_parser.add_argument(
+        "--shipments-schema",
+        type=int,
+        choices=(1, COMPACT_SCHEMA_VERSION),
+        default=1,
+        help="версия схемы shipments.json",
+    )
+    arg_parser.add_argument(
+        "--reader",
+        choices=READER_CHOICES,
+        default=READER_PANDAS,
+        help="бэкенд чтения листа (auto — самый быстрый установленный, см. compare_readers.py)",
+    )
+    arg_parser.add_argument(
+        "--run-history",
+        type=Path,
+        default=RUN_HISTORY_FILE,
+        help="журнал запусков JSON lines (см. run_metrics.py)",
+    )
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="процессов для разбора блоков поставок (0 — по числу ядер)",
+    )
+    arg_parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="не сохранять генерацию в архив снимков (см. snapshots.py)",
+    )
+    arg_parser.add_argument(
+        "--sqlite",
+        action="store_true",
+        help="после записи пересобрать SQLite-выгрузку data/exports/ (см. sqlite_export.py)",
+    )
+    arg_parser.add_argument(
+        "--item-history",
+        action="store_true",
+        help="дописать генерацию в колоночную историю позиций data/exports/ (см. item_history_export.py)",
+    )
+    args = arg_parser.parse_args()
+
+    success = run_pipeline(
+        offline=args.offline,
+        shipments_schema=args.shipments_schema,
+        reader=args.reader,
+        history_file=args.run_history,
+        workers=args.workers,
+        snapshot_dir=None if args.no_snapshot else SNAPSHOT_DIR,
+        sqlite=args.sqlite,
+        item_history=args.item_history,
+    )
+    if not args.auto:
+        try:
+            print("\n" + "=" * 50)
+            input("Нажмите Enter для выхода...")
+        except (EOFError, KeyboardInterrupt):
+            pass
+    sys.exit(0 if success else 1)
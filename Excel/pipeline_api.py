@@ -0,0 +1,500 @@
+"""
+Python API пайплайна данных: этапы в одном процессе без JSON на диске между ними.
+
+    from pipeline_api import parse_generation, price_generation, validate_generation, commit_generation
+
+    generation = parse_generation(reader="csv")        # таблица → поставки и каталог в памяти
+    price_generation(generation)                       # актуальные price/cost каталога
+    if validate_generation(generation):                # та же проверка, что перед записью
+        commit_generation(generation)                  # запись data/ (фасеты, бандлы, changes.json)
+
+Этапы передают друг другу объект Generation: поставки, каталог, meta, реестр productId
+и сводки этапов. Диск трогают только parse_generation (чтение таблицы),
+load_generation (чтение уже записанной генерации) и commit_generation.
+parse_excel.py, update_prices.py, validate_generated_data.py и pipeline.py — тонкие
+обёртки над этими функциями; тесты и оркестратор могут сцеплять этапы напрямую.
+
+Ниже — функции отдельных шагов (parse_workbook, apply_catalog_pricing,
+validate_outputs, write_outputs), на которых построены этапы API.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from catalog_builder import build_catalog
+from catalog_facets import build_facet_index
+from catalog_pricing import apply_latest_prices
+from change_feed import CHANGES_FILENAME, build_change_feed, load_previous_generation, print_change_report
+from data_validator import validate_generated_outputs
+from excel_parser import ExcelParser
+from generation_store import (
+    current_generation_dir,
+    discard_generation,
+    new_generation_dir,
+    publish_generation,
+    writer_lock,
+)
+from json_storage import load_json_file, write_json_atomic, write_json_if_changed
+from product_bundles import build_product_bundles, write_product_bundles
+from product_registry import (
+    REGISTRY_FILENAME,
+    load_product_registry,
+    merge_product_registry,
+    remap_product_ids,
+    save_product_registry,
+)
+from profiling import NULL_PROFILER, StageProfiler
+from shipment_encoding import (
+    COMPACT_SCHEMA_VERSION,
+    decode_shipments,
+    encode_shipments,
+    expand_shipments_payload,
+    is_compact_shipments,
+)
+from snapshot_store import archive_generation
+from workbook_readers import READER_CSV, READER_PANDAS
+
+
+SCRIPT_DIR = Path(__file__).parent
+EXCEL_FILE = SCRIPT_DIR / "Расчёты с мехметом new.xlsx"
+# Выгрузка одной вкладки "Поставки" (fetch_google_sheet.py --format csv)
+CSV_FILE = SCRIPT_DIR / "Поставки.csv"
+DATA_DIR = SCRIPT_DIR.parent / "data"
+JPG_DIR = SCRIPT_DIR.parent / "public" / "images" / "products" / "jpg"
+
+
+def build_meta() -> dict:
+    """Формирует метаданные об обновлении данных."""
+    return {
+        "updatedAt": datetime.now(timezone.utc).isoformat(),
+        "source": "excel",
+    }
+
+
+def source_file_for_reader(reader: str) -> Path:
+    """Файл-источник для бэкенда: CSV-выгрузка вкладки или xlsx всей книги."""
+    return CSV_FILE if reader == READER_CSV else EXCEL_FILE
+
+
+def parse_workbook(
+    excel_file: Path = EXCEL_FILE,
+    jpg_dir: Path = JPG_DIR,
+    reader: str = READER_PANDAS,
+    profiler: StageProfiler = NULL_PROFILER,
+    stats: Optional[Dict[str, Any]] = None,
+    workers: int = 1,
+    registry: Optional[Dict[str, str]] = None,
+    pricing_stats: Optional[Dict[str, Any]] = None,
+) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+    """
+    Этап parse: читает Excel, собирает поставки и каталог (размеры, фото, категории, цены).
+
+    reader выбирает бэкенд чтения листа (см. workbook_readers),
+    workers — число процессов для разбора блоков поставок (0 — по числу ядер).
+    registry — реестр название → productId (см. product_registry): новые товары
+    получают id из него и дописываются в него же.
+    В stats (если передан) записываются объёмы для журнала запусков:
+    rowsScanned, shipmentsCount, itemsCount, productsCreatedCount.
+    Актуальные price/cost проставляются той же сборкой каталога (см. catalog_builder);
+    её сводка в формате apply_latest_prices пишется в pricing_stats (если передан).
+
+    Returns:
+        (shipments, products_data) или None, если парсинг не удался
+    """
+    if not excel_file.exists():
+        print(f"❌ Excel файл не найден: {excel_file}")
+        print(f"   Убедитесь, что файл '{excel_file.name}' находится в папке Excel/")
+        return None
+
+    print(f"📂 Собираю каталог заново из Excel...")
+    products_data = {"products": []}
+    products = products_data["products"]
+
+    print(f"\n📊 Парсинг Excel файла ({reader}): {excel_file}...")
+    # Создаём парсер и парсим
+    try:
+        parser = ExcelParser(
+            str(excel_file),
+            products,
+            reader=reader,
+            workers=workers,
+            registry=registry,
+        )
+        shipments = parser.parse(profiler=profiler)
+        print(f"✅ Успешно обработано {len(shipments)} поставок")
+
+        # Подсчитываем общее количество позиций
+        total_items = sum(len(shipment.get('rawItems', [])) for shipment in shipments)
+        print(f"📦 Всего позиций: {total_items}")
+        if stats is not None:
+            stats.update(
+                {
+                    "rowsScanned": parser.rows_scanned,
+                    "shipmentsCount": len(shipments),
+                    "itemsCount": total_items,
+                    # Каталог собирается заново: все товары созданы find_or_create_product_id
+                    "productsCreatedCount": len(products),
+                }
+            )
+
+    except Exception as e:
+        print(f"❌ Ошибка при парсинге Excel файла: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+    print(f"\n" + "="*50)
+    print(f"🔄 Собираю каталог: размеры, фото, цены и себестоимость...")
+    with profiler.stage("catalog"):
+        # Один проход по поставкам и один по каталогу (см. catalog_builder)
+        catalog_stats = build_catalog(products_data, shipments, jpg_dir, log=print)
+    if pricing_stats is not None:
+        pricing_stats.update(catalog_stats)
+
+    return shipments, products_data
+
+
+def apply_catalog_pricing(
+    products_data: Dict[str, Any],
+    shipments: List[Dict[str, Any]],
+    profiler: StageProfiler = NULL_PROFILER,
+) -> Dict[str, Any]:
+    """Этап pricing: проставляет актуальные price/cost в каталог в памяти."""
+    print(f"\n" + "="*50)
+    print(f"🔄 Обновляю цены и себестоимость каталога в памяти...")
+    with profiler.stage("pricing"):
+        return apply_latest_prices(products_data, shipments, log=print)
+
+
+def validate_outputs(
+    shipments: List[Dict[str, Any]],
+    products_data: Dict[str, Any],
+    meta: Dict[str, Any],
+    profiler: StageProfiler = NULL_PROFILER,
+    money: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """Этап validation: проверяет generated data до записи на диск (money.json — если передан)."""
+    with profiler.stage("validation"):
+        errors = validate_generated_outputs(shipments, products_data, meta, money)
+    if errors:
+        print("\n❌ Generated data не прошли валидацию:")
+        for error in errors:
+            print(f"   - {error}")
+        return False
+    return True
+
+
+def write_outputs(
+    shipments: List[Dict[str, Any]],
+    products_data: Dict[str, Any],
+    meta: Dict[str, Any],
+    data_dir: Path = DATA_DIR,
+    shipments_schema: int = 1,
+    profiler: StageProfiler = NULL_PROFILER,
+    stats: Optional[Dict[str, Any]] = None,
+    registry: Optional[Dict[str, str]] = None,
+    snapshot_dir: Optional[Path] = None,
+) -> bool:
+    """
+    Этап write: атомарно сохраняет уже валидные данные и производные индексы.
+
+    meta.json пишется последним: при --profile в него попадает сводка по всем этапам до него.
+    В stats (если передан) записываются outputBytes (размер каждого файла),
+    unchangedOutputs (файлы, оставленные без перезаписи) и bundles (сводка бандлов).
+    registry (если передан) сохраняется в product-ids.json вместе с каталогом: под
+    блокировкой он сначала сводится с реестром на диске, и id товаров, которые другой
+    запуск успел занять, переназначаются в каталоге и поставках (см. merge_product_registry).
+    Перед записью новая генерация сравнивается с текущей в data_dir: лента изменений
+    пишется в changes.json (см. change_feed) и кратко печатается.
+    snapshot_dir (если передан) — архив генераций (см. snapshot_store), в который
+    записанная генерация сохраняется последней.
+    Запись идёт под блокировкой data_dir: генерация пишется в свою папку
+    data_dir/generations/ и публикуется одной заменой указателя CURRENT, и только после
+    этого обновляются плоские data_dir/*.json, product-ids.json и product-bundles/
+    (см. generation_store). Ошибка до публикации не трогает ни текущую генерацию,
+    ни плоские файлы.
+
+    Returns:
+        True, если генерация опубликована (ошибка после переключения указателя —
+        только предупреждение: новая генерация уже текущая)
+    """
+    products_file = data_dir / "products.json"
+    shipments_file = data_dir / "shipments.json"
+    meta_file = data_dir / "meta.json"
+    registry_file = data_dir / REGISTRY_FILENAME
+    changes_file = data_dir / CHANGES_FILENAME
+    facets_file = data_dir / "facets.json"
+    bundles_dir = data_dir / "product-bundles"
+
+    # Сверка реестра, сравнение с текущей генерацией и вся запись — под одной блокировкой:
+    # параллельный запуск не вклинится между чтением прошлой генерации и публикацией новой
+    with writer_lock(data_dir):
+        if registry is not None:
+            # Реестр читался до парсинга: id, выданные с тех пор другим запуском, главнее
+            with profiler.stage("build:registry"):
+                id_map = merge_product_registry(registry, data_dir, products_data.get("products", []))
+                remap_product_ids(products_data, shipments, id_map)
+            if id_map:
+                print(f"⚠️  Реестр productId обновил другой запуск: переназначено id — {len(id_map)}")
+
+        # Фасетный индекс строится только по уже валидному каталогу
+        with profiler.stage("build:facets"):
+            facet_index = build_facet_index(products_data, shipments)
+
+        shipments_payload = shipments
+        if shipments_schema == COMPACT_SCHEMA_VERSION:
+            with profiler.stage("build:compact-shipments"):
+                shipments_payload = encode_shipments(shipments, products_data)
+                is_lossless = decode_shipments(shipments_payload, products_data) == shipments
+            if not is_lossless:
+                print("❌ Компактная схема shipments.json не восстанавливается без потерь")
+                return False
+
+        with profiler.stage("build:changes"):
+            try:
+                previous = load_previous_generation(current_generation_dir(data_dir))
+            except Exception as e:
+                # Без прошлой генерации лента покажет всё как добавленное, запись это не останавливает
+                print(f"⚠️  Не удалось прочитать прошлую генерацию для ленты изменений: {e}")
+                previous = None
+            change_feed = build_change_feed(previous, shipments, products_data, meta.get("updatedAt"))
+
+        print(f"\n💾 Сохраняю validated data...")
+        generation_dir = None
+        try:
+            # До публикации пишется только папка генерации: через указатель её увидят
+            # только готовой, а при ошибке текущая генерация и плоские файлы не тронуты
+            previous_bundles_dir = current_generation_dir(data_dir) / bundles_dir.name
+            if not previous_bundles_dir.exists():
+                previous_bundles_dir = bundles_dir
+            generation_dir = new_generation_dir(data_dir)
+            for name, payload in (
+                (shipments_file.name, shipments_payload),
+                (products_file.name, products_data),
+                (facets_file.name, facet_index),
+                (changes_file.name, change_feed),
+            ):
+                with profiler.stage(f"write:{name}"):
+                    write_json_atomic(generation_dir / name, payload)
+            with profiler.stage("write:product-bundles"):
+                bundles = build_product_bundles(shipments, products_data)
+                # Неизменившиеся бандлы — жёсткие ссылки на файлы текущей генерации
+                bundle_stats = write_product_bundles(
+                    generation_dir / bundles_dir.name,
+                    bundles,
+                    previous_dir=previous_bundles_dir,
+                )
+            print(
+                f"✅ Бандлы товаров: записано {bundle_stats['writtenCount']}, "
+                f"без изменений {bundle_stats['unchangedCount']}, "
+                f"удалено {bundle_stats['removedCount']}"
+            )
+            print_change_report(change_feed)
+            if profiler.enabled:
+                meta["profile"] = profiler.summary()
+            write_json_atomic(generation_dir / meta_file.name, meta)
+            publish_generation(data_dir, generation_dir)
+            print(f"✅ Генерация опубликована: {generation_dir}")
+
+            # Плоские копии (их хранит git) и общие папки — только после публикации:
+            # ошибка здесь уже не отменяет опубликованную генерацию
+            shipments_written = write_json_if_changed(shipments_file, shipments_payload)
+            if shipments_written:
+                print(f"✅ Поставки сохранены (schema {shipments_schema}): {shipments_file}")
+            else:
+                print(f"✅ Поставки без изменений: {shipments_file}")
+            products_written = write_json_if_changed(products_file, products_data)
+            if products_written:
+                print(f"✅ Каталог сохранён: {products_file}")
+            else:
+                print(f"✅ Каталог без изменений: {products_file}")
+            if registry is not None:
+                registry_written = save_product_registry(registry, data_dir)
+                if registry_written:
+                    print(f"✅ Реестр productId сохранён: {registry_file}")
+            facets_written = write_json_if_changed(facets_file, facet_index)
+            if facets_written:
+                print(f"✅ Фасетный индекс сохранён: {facets_file}")
+            else:
+                print(f"✅ Фасетный индекс без изменений: {facets_file}")
+            write_product_bundles(bundles_dir, bundles)
+            write_json_atomic(changes_file, change_feed)
+            write_json_atomic(meta_file, meta)
+            print(f"✅ Метаданные сохранены: {meta_file}")
+            if snapshot_dir is not None:
+                archive_generation(shipments, products_data, meta, snapshot_dir)
+            if stats is not None:
+                output_written = {
+                    shipments_file: shipments_written,
+                    products_file: products_written,
+                    facets_file: facets_written,
+                    meta_file: True,
+                    changes_file: True,
+                }
+                if registry is not None:
+                    output_written[registry_file] = registry_written
+                stats["outputBytes"] = {path.name: path.stat().st_size for path in output_written}
+                stats["outputBytes"][bundles_dir.name] = sum(
+                    path.stat().st_size for path in (generation_dir / bundles_dir.name).glob("*.json")
+                )
+                stats["unchangedOutputs"] = [path.name for path, written in output_written.items() if not written]
+                stats["bundles"] = bundle_stats
+            return True
+        except Exception as e:
+            if generation_dir is not None and current_generation_dir(data_dir) == generation_dir:
+                # Указатель уже переключён: генерация опубликована, не досталось только
+                # плоским копиям, архиву или сводке — их догонит следующий запуск
+                print(f"⚠️  Генерация опубликована, но запись после публикации не удалась: {e}")
+                return True
+            if generation_dir is not None:
+                discard_generation(generation_dir)
+            print(f"❌ Ошибка при сохранении generated data: {e}")
+            return False
+
+
+@dataclass(slots=True)
+class Generation:
+    """Генерация data/ в памяти: то, что этапы API передают друг другу."""
+
+    shipments: List[Dict[str, Any]]
+    products_data: Dict[str, Any]
+    meta: Dict[str, Any]
+    # Реестр название → productId; None — генерация не создавала товаров (загружена с диска)
+    registry: Optional[Dict[str, str]] = None
+    # money.json, если генерация загружена с with_money=True
+    money: Optional[Dict[str, Any]] = None
+    # Схема shipments.json, в которой генерация прочитана и по умолчанию будет записана
+    shipments_schema: int = 1
+    parse_stats: Dict[str, Any] = field(default_factory=dict)
+    pricing_stats: Dict[str, Any] = field(default_factory=dict)
+    write_stats: Dict[str, Any] = field(default_factory=dict)
+
+
+def parse_generation(
+    source_file: Optional[Path] = None,
+    reader: str = READER_PANDAS,
+    jpg_dir: Path = JPG_DIR,
+    data_dir: Path = DATA_DIR,
+    workers: int = 1,
+    registry: Optional[Dict[str, str]] = None,
+    profiler: StageProfiler = NULL_PROFILER,
+) -> Optional[Generation]:
+    """
+    Этап parse: таблица → Generation со свежим meta.
+
+    Цены проставляет уже сборка каталога, поэтому generation.pricing_stats заполнен
+    и price_generation поставки повторно не обходит.
+
+    source_file по умолчанию — файл бэкенда reader (см. source_file_for_reader),
+    registry по умолчанию загружается из data_dir.
+
+    Returns:
+        Generation или None, если парсинг не удался
+    """
+    if registry is None:
+        registry = load_product_registry(data_dir)
+    parse_stats: Dict[str, Any] = {}
+    pricing_stats: Dict[str, Any] = {}
+    parsed = parse_workbook(
+        source_file or source_file_for_reader(reader),
+        jpg_dir,
+        reader=reader,
+        profiler=profiler,
+        stats=parse_stats,
+        workers=workers,
+        registry=registry,
+        pricing_stats=pricing_stats,
+    )
+    if parsed is None:
+        return None
+    shipments, products_data = parsed
+    return Generation(
+        shipments,
+        products_data,
+        build_meta(),
+        registry=registry,
+        parse_stats=parse_stats,
+        pricing_stats=pricing_stats,
+    )
+
+
+def load_generation(
+    data_dir: Path = DATA_DIR,
+    with_money: bool = False,
+    profiler: StageProfiler = NULL_PROFILER,
+) -> Generation:
+    """
+    Загружает опубликованную генерацию data_dir (shipments.json в любой схеме).
+
+    Файлы читаются из папки текущей генерации (см. generation_store), поэтому
+    параллельная запись не подсунет смесь двух генераций.
+
+    Raises:
+        OSError: файла нет или он не читается
+        ValueError: файл не является JSON
+    """
+    generation_dir = current_generation_dir(data_dir)
+    with profiler.stage("load"):
+        products_data = load_json_file(generation_dir / "products.json")
+        payload = load_json_file(generation_dir / "shipments.json")
+        meta = load_json_file(generation_dir / "meta.json")
+        # money.json ведётся вручную и в генерацию не входит
+        money = load_json_file(data_dir / "money.json") if with_money else None
+        shipments = expand_shipments_payload(payload, products_data)
+    return Generation(
+        shipments,
+        products_data,
+        meta,
+        money=money,
+        shipments_schema=COMPACT_SCHEMA_VERSION if is_compact_shipments(payload) else 1,
+    )
+
+
+def price_generation(generation: Generation, profiler: StageProfiler = NULL_PROFILER) -> Dict[str, Any]:
+    """
+    Этап pricing: актуальные price/cost каталога; сводка сохраняется в generation.pricing_stats.
+
+    Генерация из parse_generation уже оценена сборкой каталога — тогда возвращается её сводка.
+    """
+    if not generation.pricing_stats:
+        generation.pricing_stats = apply_catalog_pricing(generation.products_data, generation.shipments, profiler)
+    return generation.pricing_stats
+
+
+def validate_generation(generation: Generation, profiler: StageProfiler = NULL_PROFILER) -> bool:
+    """Этап validation: печатает ошибки и возвращает False, если генерацию нельзя записывать."""
+    return validate_outputs(
+        generation.shipments,
+        generation.products_data,
+        generation.meta,
+        profiler=profiler,
+        money=generation.money,
+    )
+
+
+def commit_generation(
+    generation: Generation,
+    data_dir: Path = DATA_DIR,
+    shipments_schema: Optional[int] = None,
+    profiler: StageProfiler = NULL_PROFILER,
+    snapshot_dir: Optional[Path] = None,
+) -> bool:
+    """
+    Этап write: записывает валидную генерацию в data_dir (см. write_outputs).
+
+    shipments_schema по умолчанию — схема, в которой генерация была прочитана.
+    Сводка записи сохраняется в generation.write_stats.
+    """
+    return write_outputs(
+        generation.shipments,
+        generation.products_data,
+        generation.meta,
+        data_dir=data_dir,
+        shipments_schema=shipments_schema or generation.shipments_schema,
+        profiler=profiler,
+        stats=generation.write_stats,
+        registry=generation.registry,
+        snapshot_dir=snapshot_dir,
+    )
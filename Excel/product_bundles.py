@@ -0,0 +1,151 @@
+"""
+Денормализованные бандлы для страницы товара.
+
+Странице `app/product/[id]` нужен один товар и несколько строк поставок с ним,
+поэтому для каждого productId пишется отдельный маленький JSON.
+Имя файла содержит хеш содержимого: неизменившиеся бандлы не перезаписываются,
+а ссылки на них остаются валидными для кеша.
+
+Бандлы входят в генерацию data/generations/<id>/product-bundles/ (см. generation_store):
+папка новой генерации собирается из жёстких ссылок на неизменившиеся файлы текущей
+и заново записанных изменившихся, поэтому страница товара видит бандлы одной генерации.
+"""
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from json_storage import dump_json_text, load_json_file, write_json_atomic, write_text_atomic
+
+
+MANIFEST_FILENAME = "index.json"
+HASH_LENGTH = 12
+
+# excelRows сдвигаются при любой вставке строки выше товара (см. change_feed), а странице
+# товара не нужны: с ними одна вставка строки меняла бы хеш почти каждого бандла
+PRODUCT_EXCLUDED_FIELDS = frozenset({"excelRows"})
+
+SHIPMENT_LINE_FIELDS = ("sizes", "price", "cost")
+
+
+def _build_shipment_line(shipment: Dict[str, Any], item: Dict[str, Any]) -> Dict[str, Any]:
+    line: Dict[str, Any] = {"shipmentId": shipment.get("id")}
+
+    if shipment.get("year") is not None:
+        line["year"] = shipment["year"]
+
+    # Позиция без собственного статуса наследует статус поставки
+    status = item.get("status") or shipment.get("status")
+    if status:
+        line["status"] = status
+
+    for field in SHIPMENT_LINE_FIELDS:
+        if item.get(field) is not None:
+            line[field] = item[field]
+
+    return line
+
+
+def build_product_bundles(
+    shipments: Iterable[Dict[str, Any]],
+    products_data: Dict[str, Any],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Собирает бандл для каждого товара каталога: карточка товара (без excelRows) и строки поставок.
+
+    Строки поставок идут в порядке shipments (от новых к старым после парсинга).
+    """
+    lines_by_product: Dict[str, List[Dict[str, Any]]] = {}
+    for shipment in shipments:
+        for item in shipment.get("rawItems", []):
+            product_id = item.get("productId")
+            if product_id:
+                lines_by_product.setdefault(product_id, []).append(
+                    _build_shipment_line(shipment, item)
+                )
+
+    bundles: Dict[str, Dict[str, Any]] = {}
+    for product in products_data.get("products", []):
+        product_id = product.get("id")
+        if not product_id:
+            continue
+        bundles[product_id] = {
+            "product": {key: value for key, value in product.items() if key not in PRODUCT_EXCLUDED_FIELDS},
+            "shipmentLines": lines_by_product.get(product_id, []),
+        }
+
+    return bundles
+
+
+def _bundle_filename(product_id: str, text: str) -> str:
+    if "/" in product_id or "\\" in product_id or product_id.startswith("."):
+        raise ValueError(f"productId {product_id!r} нельзя использовать как имя файла бандла")
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:HASH_LENGTH]
+    return f"{product_id}.{digest}.json"
+
+
+def _reuse_bundle_file(source: Path, target: Path) -> None:
+    """Переносит неизменившийся бандл в новую папку жёсткой ссылкой (копией, если ссылки недоступны)."""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def write_product_bundles(
+    bundles_dir: Path,
+    bundles: Dict[str, Dict[str, Any]],
+    previous_dir: Optional[Path] = None,
+) -> Dict[str, int]:
+    """
+    Записывает бандлы в bundles_dir и обновляет манифест index.json.
+
+    Пишутся только бандлы с изменившимся содержимым; файлы товаров,
+    которых больше нет в манифесте, удаляются после записи нового манифеста.
+    previous_dir — папка прошлой генерации бандлов (по умолчанию сама bundles_dir):
+    её манифест задаёт, что изменилось, а неизменившиеся файлы берутся из неё без
+    повторной сериализации на диск.
+    """
+    previous_dir = previous_dir or bundles_dir
+    bundles_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = bundles_dir / MANIFEST_FILENAME
+    previous_manifest_path = previous_dir / MANIFEST_FILENAME
+    previous_files: Dict[str, str] = {}
+    if previous_manifest_path.exists():
+        previous_files = load_json_file(previous_manifest_path).get("products", {})
+
+    files: Dict[str, str] = {}
+    written_count = 0
+    unchanged_count = 0
+
+    for product_id, bundle in bundles.items():
+        text = dump_json_text(bundle)
+        filename = _bundle_filename(product_id, text)
+        files[product_id] = filename
+
+        if previous_files.get(product_id) == filename:
+            if (bundles_dir / filename).exists():
+                unchanged_count += 1
+                continue
+            if (previous_dir / filename).exists():
+                _reuse_bundle_file(previous_dir / filename, bundles_dir / filename)
+                unchanged_count += 1
+                continue
+
+        write_text_atomic(bundles_dir / filename, text)
+        written_count += 1
+
+    write_json_atomic(manifest_path, {"products": files})
+
+    current_filenames = set(files.values())
+    for path in bundles_dir.glob("*.json"):
+        if path.name != MANIFEST_FILENAME and path.name not in current_filenames:
+            path.unlink()
+
+    return {
+        "writtenCount": written_count,
+        "unchangedCount": unchanged_count,
+        "removedCount": len(set(previous_files.values()) - current_filenames),
+    }
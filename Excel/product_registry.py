@@ -0,0 +1,132 @@
+"""
+Постоянный реестр название товара → productId.
+
+Каталог собирается из таблицы заново при каждом парсинге, и без реестра auto-NNN
+выдавались бы по порядку первого появления в таблице: вставка строки выше сдвигала
+бы id всех следующих товаров, а вместе с ними имена бандлов, страницы товаров и URL.
+Реестр хранится в data/product-ids.json и коммитится вместе с data/.
+find_or_create_product_id сначала ищет в нём нормализованное название, поэтому
+новый auto-NNN получает только действительно новый товар. Записи товаров, пропавших
+из таблицы, остаются: вернувшийся товар получит прежний id, а его номер не будет
+выдан другому товару.
+
+Чтобы сохранить id при переименовании модели, замените в реестре старое название
+на новое до следующего парсинга.
+
+Реестр читается до парсинга, а пишется под блокировкой записи (см. generation_store).
+Два запуска (watch_excel.py и ручной parse_excel.py) могут прочитать один и тот же
+реестр и выдать один auto-NNN разным новым товарам. Поэтому перед записью
+merge_product_registry сводит реестр запуска с тем, что уже лежит на диске:
+записи с диска выигрывают, а конфликтующие новые id переназначаются.
+"""
+
+import re
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from json_storage import load_json_file, write_json_if_changed
+from utils import get_next_auto_id, normalize_product_name
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+REGISTRY_FILENAME = "product-ids.json"
+
+
+def _id_sort_key(item: Tuple[str, str]) -> Tuple[int, str, str]:
+    """auto-NNN по номеру (auto-1000 после auto-999), остальные id — после них."""
+    name, product_id = item
+    match = re.match(r"^auto-(\d+)$", product_id, re.IGNORECASE)
+    number = int(match.group(1)) if match else 10 ** 9
+    return (number, product_id, name)
+
+
+def load_product_registry(data_dir: Path = DATA_DIR) -> Dict[str, str]:
+    """
+    Загружает реестр из data_dir/product-ids.json.
+
+    Если реестра ещё нет, он заполняется из текущего products.json,
+    чтобы при переходе на реестр id уже опубликованных товаров не поменялись.
+    """
+    registry_file = data_dir / REGISTRY_FILENAME
+    if registry_file.exists():
+        return dict(load_json_file(registry_file).get("products", {}))
+
+    products_file = data_dir / "products.json"
+    if not products_file.exists():
+        return {}
+    registry: Dict[str, str] = {}
+    for product in load_json_file(products_file).get("products", []):
+        name = product.get("name")
+        product_id = product.get("id")
+        if name and product_id:
+            registry.setdefault(normalize_product_name(name), product_id)
+    return registry
+
+
+def save_product_registry(registry: Dict[str, str], data_dir: Path = DATA_DIR) -> bool:
+    """
+    Записывает реестр, отсортированный по id, чтобы диффы были читаемыми.
+
+    Returns:
+        True, если файл был перезаписан
+    """
+    return write_json_if_changed(
+        data_dir / REGISTRY_FILENAME,
+        {"products": dict(sorted(registry.items(), key=_id_sort_key))},
+    )
+
+
+def merge_product_registry(
+    registry: Dict[str, str],
+    data_dir: Path = DATA_DIR,
+    products: Iterable[Dict[str, Any]] = (),
+) -> Dict[str, str]:
+    """
+    Сводит реестр запуска с реестром на диске; вызывается под writer_lock перед записью.
+
+    Название, которое уже есть на диске, получает id с диска. Новое название сохраняет
+    свой id, если на диске его не занял другой товар, иначе получает следующий
+    свободный auto-NNN (с учётом реестра на диске, реестра запуска и products).
+    registry дополняется на месте записями с диска.
+
+    Returns:
+        Переназначенные id: старый id → новый (пусто, если конфликтов не было)
+    """
+    on_disk = load_product_registry(data_dir)
+    merged = dict(on_disk)
+    taken_ids = set(on_disk.values())
+    id_map: Dict[str, str] = {}
+    catalog = list(products)
+    for name, product_id in sorted(registry.items(), key=_id_sort_key):
+        disk_id = on_disk.get(name)
+        if disk_id is not None:
+            if disk_id != product_id:
+                id_map[product_id] = disk_id
+            continue
+        if product_id in taken_ids:
+            new_id = get_next_auto_id(catalog, chain(merged.values(), registry.values(), id_map.values()))
+            id_map[product_id] = new_id
+            product_id = new_id
+        merged[name] = product_id
+        taken_ids.add(product_id)
+
+    registry.clear()
+    registry.update(merged)
+    return id_map
+
+
+def remap_product_ids(
+    products_data: Dict[str, Any],
+    shipments: List[Dict[str, Any]],
+    id_map: Dict[str, str],
+) -> None:
+    """Переписывает id товаров каталога и productId позиций по id_map (все замены разом)."""
+    for product in products_data.get("products", []):
+        product_id = product.get("id")
+        if product_id in id_map:
+            product["id"] = id_map[product_id]
+    for shipment in shipments:
+        for item in shipment.get("rawItems", []):
+            product_id = item.get("productId")
+            if product_id in id_map:
+                item["productId"] = id_map[product_id]
@@ -0,0 +1,136 @@
+"""
+Профилирование этапов CLI-скриптов (--profile).
+
+StageProfiler замеряет для каждого этапа wall time, CPU time процесса и пик памяти
+tracemalloc сверх памяти, занятой до начала этапа, печатает сводку и отдаёт её в meta.json. Опционально весь запуск
+пишется в файл cProfile (--profile-dump), который открывается snakeviz или pstats.
+
+Без --profile используется выключенный профайлер: этапы выполняются как обычно,
+tracemalloc и cProfile не включаются и не замедляют запуск.
+"""
+
+import argparse
+import cProfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class StageProfiler:
+    """Собирает wall/CPU/пик памяти по последовательным этапам одного запуска."""
+
+    def __init__(self, command: str, enabled: bool = True, dump_file: Optional[Path] = None):
+        self.command = command
+        self.enabled = enabled
+        self.dump_file = dump_file
+        self.stages: List[Dict[str, Any]] = []
+        self._started_wall = 0.0
+        self._started_cpu = 0.0
+        self._cprofile: Optional[cProfile.Profile] = None
+        # Абсолютный пик памяти за запуск (у этапов — прирост сверх памяти до этапа)
+        self._peak_bytes = 0
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        self._started_wall = time.perf_counter()
+        self._started_cpu = time.process_time()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.dump_file is not None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        if not self.enabled:
+            return
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self.dump_file.parent.mkdir(parents=True, exist_ok=True)
+            self._cprofile.dump_stats(str(self.dump_file))
+            self._cprofile = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Замеряет блок кода как этап name. Этапы не вкладываются друг в друга."""
+        if not self.enabled:
+            yield
+            return
+
+        tracemalloc.reset_peak()
+        started_bytes, _ = tracemalloc.get_traced_memory()
+        started_wall = time.perf_counter()
+        started_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            self._peak_bytes = max(self._peak_bytes, peak_bytes)
+            self.stages.append(
+                {
+                    "name": name,
+                    "wallSeconds": round(time.perf_counter() - started_wall, 4),
+                    "cpuSeconds": round(time.process_time() - started_cpu, 4),
+                    "peakBytes": peak_bytes - started_bytes,
+                }
+            )
+
+    def summary(self) -> Dict[str, Any]:
+        """Сводка для meta.json: итог запуска и список этапов в порядке выполнения."""
+        return {
+            "command": self.command,
+            "profiledAt": datetime.now(timezone.utc).isoformat(),
+            "totalWallSeconds": round(time.perf_counter() - self._started_wall, 4),
+            "totalCpuSeconds": round(time.process_time() - self._started_cpu, 4),
+            "peakBytes": self._peak_bytes,
+            "stages": list(self.stages),
+        }
+
+    def print_report(self) -> None:
+        if not self.enabled:
+            return
+        summary = self.summary()
+        print("\n" + "=" * 50)
+        print(f"⏱️  Профиль {self.command}:")
+        print(f"   {'этап':<28} {'wall':>9} {'cpu':>9} {'пик памяти':>11}")
+        for stage in summary["stages"]:
+            print(
+                f"   {stage['name']:<28} {stage['wallSeconds']:>8.3f}s {stage['cpuSeconds']:>8.3f}s"
+                f" {stage['peakBytes'] / 1024 / 1024:>8.2f} MB"
+            )
+        print(
+            f"   {'итого':<28} {summary['totalWallSeconds']:>8.3f}s {summary['totalCpuSeconds']:>8.3f}s"
+            f" {summary['peakBytes'] / 1024 / 1024:>8.2f} MB"
+        )
+        if self.dump_file is not None:
+            print(f"💾 cProfile: {self.dump_file}")
+
+
+# Профайлер по умолчанию для функций этапов: ничего не замеряет
+NULL_PROFILER = StageProfiler("", enabled=False)
+
+
+def add_profile_arguments(arg_parser: argparse.ArgumentParser) -> None:
+    """Добавляет в CLI флаги --profile и --profile-dump."""
+    arg_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="замерить wall/CPU/пик памяти по этапам",
+    )
+    arg_parser.add_argument(
+        "--profile-dump",
+        type=Path,
+        default=None,
+        help="дополнительно записать cProfile всего запуска в файл (.prof)",
+    )
+
+
+def profiler_from_args(command: str, args: argparse.Namespace) -> StageProfiler:
+    """Создаёт профайлер по флагам CLI (--profile-dump включает и --profile)."""
+    enabled = args.profile or args.profile_dump is not None
+    return StageProfiler(command, enabled=enabled, dump_file=args.profile_dump)
@@ -0,0 +1,185 @@
+"""
+Журнал запусков пайплайна в формате JSON lines.
+
+Каждый запуск parse_excel.py и pipeline.py дописывает одну запись в
+Excel/.cache/run-history.jsonl: объёмы (строки листа, поставки, позиции, созданные
+товары), обновлённые цены и себестоимости, сконвертированные и пропущенные
+изображения, размер каждого выходного файла, попадания в кеш (файлы и бандлы,
+оставленные без перезаписи) и длительность этапов. История хранит последние
+HISTORY_LIMIT запусков.
+
+Новая запись сравнивается с медианой предыдущих успешных запусков той же команды:
+заметное замедление этапа или падение объёма сразу печатается предупреждением.
+"""
+
+import json
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from json_storage import write_text_atomic
+
+RUN_HISTORY_FILE = Path(__file__).parent / ".cache" / "run-history.jsonl"
+
+# Сколько запусков хранить и с каким числом последних сравнивать новый
+HISTORY_LIMIT = 500
+COMPARE_WINDOW = 10
+
+# Этап считается замедлившимся, если он дольше медианы на долю и на абсолютный запас
+SLOWDOWN_TOLERANCE = 0.5
+MIN_SLOWDOWN_SECONDS = 0.05
+# Объём считается упавшим, если он меньше медианы больше чем на эту долю
+VOLUME_DROP_TOLERANCE = 0.1
+
+VOLUME_KEYS = ("rowsScanned", "shipmentsCount", "itemsCount", "productsCreatedCount")
+
+
+@contextmanager
+def timed_stage(stage_seconds: Dict[str, float], name: str) -> Iterator[None]:
+    """Записывает длительность блока в stage_seconds[name]."""
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_seconds[name] = round(time.perf_counter() - started_at, 3)
+
+
+def build_run_record(
+    command: str,
+    success: bool,
+    total_seconds: float,
+    stage_seconds: Dict[str, float],
+    parse_stats: Optional[Dict[str, Any]] = None,
+    pricing_stats: Optional[Dict[str, Any]] = None,
+    write_stats: Optional[Dict[str, Any]] = None,
+    image_stats: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Собирает запись журнала из сводок этапов.
+
+    Значения этапов, которые не запускались или упали раньше, остаются null.
+    """
+    parse_stats = parse_stats or {}
+    pricing_stats = pricing_stats or {}
+    write_stats = write_stats or {}
+    image_stats = image_stats or {}
+    bundle_stats = write_stats.get("bundles", {})
+
+    return {
+        "runAt": datetime.now(timezone.utc).isoformat(),
+        "command": command,
+        "success": success,
+        "totalSeconds": round(total_seconds, 3),
+        "rowsScanned": parse_stats.get("rowsScanned"),
+        "shipmentsCount": parse_stats.get("shipmentsCount"),
+        "itemsCount": parse_stats.get("itemsCount"),
+        "productsCreatedCount": parse_stats.get("productsCreatedCount"),
+        "updatedPricesCount": pricing_stats.get("updatedPricesCount"),
+        "updatedCostsCount": pricing_stats.get("updatedCostsCount"),
+        "imagesConvertedCount": image_stats.get("convertedCount"),
+        "imagesSkippedCount": image_stats.get("alreadyExistsCount"),
+        "imagesFailedCount": image_stats.get("failedCount"),
+        "outputBytes": write_stats.get("outputBytes", {}),
+        "cacheHits": {
+            "unchangedOutputs": len(write_stats["unchangedOutputs"]) if "unchangedOutputs" in write_stats else None,
+            "unchangedBundles": bundle_stats.get("unchangedCount"),
+        },
+        "stageSeconds": dict(stage_seconds),
+    }
+
+
+def load_history(history_file: Path = RUN_HISTORY_FILE) -> List[Dict[str, Any]]:
+    """Читает журнал; повреждённые строки (например, оборванная запись) пропускаются."""
+    if not history_file.exists():
+        return []
+    records = []
+    for line in history_file.read_text(encoding="utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict):
+            records.append(record)
+    return records
+
+
+def append_run_record(
+    record: Dict[str, Any],
+    history_file: Path = RUN_HISTORY_FILE,
+    limit: int = HISTORY_LIMIT,
+) -> List[Dict[str, Any]]:
+    """
+    Дописывает запись в журнал, оставляя не больше limit последних запусков.
+
+    Returns:
+        Записи, бывшие в журнале до этого запуска
+    """
+    history = load_history(history_file)
+    line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    if len(history) < limit:
+        history_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(history_file, "a", encoding="utf-8", newline="\n") as f:
+            f.write(line)
+    else:
+        kept = history[len(history) - limit + 1:]
+        text = "".join(json.dumps(item, ensure_ascii=False, separators=(",", ":")) + "\n" for item in kept)
+        write_text_atomic(history_file, text + line)
+    return history
+
+
+def find_regressions(
+    record: Dict[str, Any],
+    history: List[Dict[str, Any]],
+    window: int = COMPARE_WINDOW,
+) -> List[str]:
+    """Сравнивает запись с медианой последних window успешных запусков той же команды."""
+    previous = [
+        item for item in history
+        if item.get("command") == record["command"] and item.get("success")
+    ][-window:]
+    if not previous or not record["success"]:
+        return []
+
+    regressions = []
+    for stage, seconds in record["stageSeconds"].items():
+        reference = [item["stageSeconds"][stage] for item in previous if stage in item.get("stageSeconds", {})]
+        if not reference:
+            continue
+        median = statistics.median(reference)
+        if seconds - median > MIN_SLOWDOWN_SECONDS and seconds > median * (1 + SLOWDOWN_TOLERANCE):
+            regressions.append(f"этап {stage}: {seconds:.2f} s при медиане {median:.2f} s")
+
+    for key in VOLUME_KEYS:
+        value = record.get(key)
+        reference = [item[key] for item in previous if item.get(key) is not None]
+        if value is None or not reference:
+            continue
+        median = statistics.median(reference)
+        if value < median * (1 - VOLUME_DROP_TOLERANCE):
+            regressions.append(f"{key}: {value} при медиане {median:g}")
+    return regressions
+
+
+def log_run(record: Dict[str, Any], history_file: Path = RUN_HISTORY_FILE) -> List[str]:
+    """
+    Записывает запуск в журнал и печатает найденные отклонения.
+
+    Журнал — диагностика: ошибка записи печатается, но не роняет запуск.
+    """
+    try:
+        history = append_run_record(record, history_file)
+    except OSError as error:
+        print(f"⚠️  Не удалось записать журнал запусков: {error}")
+        return []
+
+    regressions = find_regressions(record, history)
+    if regressions:
+        print("⚠️  Отклонения от предыдущих запусков:")
+        for regression in regressions:
+            print(f"   - {regression}")
+    print(f"📈 Метрики запуска записаны: {history_file}")
+    return regressions
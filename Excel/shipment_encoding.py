@@ -0,0 +1,184 @@
+"""
+Компактная схема shipments.json (schemaVersion 2).
+
+В обычной схеме каждая позиция повторяет полное overrideName, хотя чистое название
+уже лежит в products.json, а скобка с размерами разобрана в sizes.
+Компактная схема хранит только productId и, если нужно, хвост названия,
+а статусы поставок и позиций заменяет индексами в общей таблице строк.
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+COMPACT_SCHEMA_VERSION = 2
+
+NAME_SUFFIX_KEY = "nameSuffix"
+
+
+def is_compact_shipments(payload: Any) -> bool:
+    """Проверяет, что payload записан в компактной схеме."""
+    return isinstance(payload, dict) and payload.get("schemaVersion") == COMPACT_SCHEMA_VERSION
+
+
+def build_canonical_name_suffix(item: Dict[str, Any]) -> str:
+    """
+    Восстанавливает хвост названия из sizes и sample в том виде, в каком его пишут в Excel:
+    " (XS-7, S-4)", " (one size-5)", " (образец XS-1)", " (образец)".
+    """
+    sizes = item.get("sizes") or {}
+    sizes_part = ", ".join(
+        f"{'one size' if size == 'OneSize' else size.upper()}-{count}"
+        for size, count in sizes.items()
+    )
+
+    if item.get("sample"):
+        inner = f"образец {sizes_part}" if sizes_part else "образец"
+    else:
+        inner = sizes_part
+
+    return f" ({inner})" if inner else ""
+
+
+def _product_names(products_data: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        product["id"]: product.get("name", "")
+        for product in products_data.get("products", [])
+        if isinstance(product, dict) and product.get("id")
+    }
+
+
+def _intern(value: str, strings: List[str], indexes: Dict[str, int]) -> int:
+    index = indexes.get(value)
+    if index is None:
+        index = len(strings)
+        strings.append(value)
+        indexes[value] = index
+    return index
+
+
+def _encode_item(
+    item: Dict[str, Any],
+    catalog_name: Optional[str],
+    strings: List[str],
+    indexes: Dict[str, int],
+) -> Dict[str, Any]:
+    encoded: Dict[str, Any] = {}
+
+    if "overrideName" not in item:
+        # Позиция без overrideName (ручная правка) должна и после раскодирования остаться без него
+        encoded["overrideName"] = None
+    else:
+        override_name = item["overrideName"]
+        if catalog_name and override_name.startswith(catalog_name):
+            suffix = override_name[len(catalog_name):]
+            if suffix != build_canonical_name_suffix(item):
+                encoded[NAME_SUFFIX_KEY] = suffix
+        else:
+            encoded["overrideName"] = override_name
+
+    for key, value in item.items():
+        if key == "overrideName":
+            continue
+        if key == "status" and isinstance(value, str):
+            encoded[key] = _intern(value, strings, indexes)
+        else:
+            encoded[key] = value
+
+    return encoded
+
+
+def encode_shipments(
+    shipments: List[Dict[str, Any]],
+    products_data: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Переводит поставки из обычной схемы в компактную."""
+    names = _product_names(products_data)
+    strings: List[str] = []
+    indexes: Dict[str, int] = {}
+    encoded_shipments = []
+
+    for shipment in shipments:
+        encoded_shipment: Dict[str, Any] = {}
+        for key, value in shipment.items():
+            if key == "status" and isinstance(value, str):
+                encoded_shipment[key] = _intern(value, strings, indexes)
+            elif key == "rawItems":
+                encoded_shipment[key] = [
+                    _encode_item(item, names.get(item.get("productId")), strings, indexes)
+                    for item in value
+                ]
+            else:
+                encoded_shipment[key] = value
+        encoded_shipments.append(encoded_shipment)
+
+    return {
+        "schemaVersion": COMPACT_SCHEMA_VERSION,
+        "strings": strings,
+        "shipments": encoded_shipments,
+    }
+
+
+def _decode_item(
+    item: Dict[str, Any],
+    catalog_name: Optional[str],
+    strings: List[str],
+) -> Dict[str, Any]:
+    decoded: Dict[str, Any] = {}
+
+    if "overrideName" in item:
+        if item["overrideName"] is not None:
+            decoded["overrideName"] = item["overrideName"]
+    else:
+        if catalog_name is None:
+            raise ValueError(
+                f"productId {item.get('productId')!r} отсутствует в каталоге: "
+                "нельзя восстановить overrideName"
+            )
+        suffix = item.get(NAME_SUFFIX_KEY)
+        if suffix is None:
+            suffix = build_canonical_name_suffix(item)
+        decoded["overrideName"] = f"{catalog_name}{suffix}"
+
+    for key, value in item.items():
+        if key in ("overrideName", NAME_SUFFIX_KEY):
+            continue
+        decoded[key] = strings[value] if key == "status" and isinstance(value, int) else value
+
+    return decoded
+
+
+def decode_shipments(
+    payload: Dict[str, Any],
+    products_data: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """Разворачивает компактную схему обратно в список поставок обычной схемы."""
+    names = _product_names(products_data)
+    strings = payload.get("strings", [])
+    shipments = []
+
+    for shipment in payload.get("shipments", []):
+        decoded_shipment: Dict[str, Any] = {}
+        for key, value in shipment.items():
+            if key == "status" and isinstance(value, int):
+                decoded_shipment[key] = strings[value]
+            elif key == "rawItems":
+                decoded_shipment[key] = [
+                    _decode_item(item, names.get(item.get("productId")), strings)
+                    for item in value
+                ]
+            else:
+                decoded_shipment[key] = value
+        shipments.append(decoded_shipment)
+
+    return shipments
+
+
+def expand_shipments_payload(payload: Any, products_data: Dict[str, Any]) -> Any:
+    """
+    Возвращает поставки в обычной схеме независимо от версии файла.
+
+    Обычный массив возвращается как есть, чтобы валидатор сам сообщил о неверной структуре.
+    """
+    if is_compact_shipments(payload):
+        return decode_shipments(payload, products_data)
+    return payload
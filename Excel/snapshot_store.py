@@ -0,0 +1,206 @@
+"""
+Архив генераций data/ с дедупликацией по содержимому.
+
+Каждая записанная генерация раскладывается на куски: каждая поставка, каждый товар,
+шапка products.json без списка товаров и meta.json. Кусок хранится один раз в
+objects/<2 символа>/<sha256>.json.gz, где sha256 считается по каноническому JSON
+записи, поэтому неизменившаяся поставка или товар из следующей генерации не занимает
+места. Генерация — это небольшой манифест manifests/<id>.json со списками хешей в
+порядке файлов; по нему генерация собирается обратно без потерь (порядок ключей
+сохраняется).
+
+Если поставки и каталог совпадают с последней генерацией архива, новый манифест
+не создаётся: meta.json меняется при каждом запуске, но сайт показывает то же самое.
+
+Команды list / restore / diff — в snapshots.py.
+"""
+
+import gzip
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from json_storage import load_json_file, write_json_atomic
+
+SNAPSHOT_DIR = Path(__file__).parent / ".cache" / "snapshots"
+OBJECTS_DIRNAME = "objects"
+MANIFESTS_DIRNAME = "manifests"
+
+LATEST_REF = "latest"
+
+Generation = Tuple[List[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]
+
+
+def canonical_json(record: Any) -> bytes:
+    """Компактный JSON записи: одинаковые записи дают одинаковые байты и хеш."""
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _object_path(snapshot_dir: Path, digest: str) -> Path:
+    return snapshot_dir / OBJECTS_DIRNAME / digest[:2] / f"{digest}.json.gz"
+
+
+def _store_object(snapshot_dir: Path, record: Any, stats: Dict[str, int]) -> str:
+    """Сохраняет кусок, если его ещё нет в архиве, и возвращает его хеш."""
+    payload = canonical_json(record)
+    digest = hashlib.sha256(payload).hexdigest()
+    path = _object_path(snapshot_dir, digest)
+    stats["chunkCount"] += 1
+    if path.exists():
+        return digest
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.name}.tmp")
+    # mtime=0: одинаковый кусок всегда даёт одинаковый файл
+    compressed = gzip.compress(payload, mtime=0)
+    try:
+        temp_path.write_bytes(compressed)
+        temp_path.replace(path)
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
+    stats["newChunkCount"] += 1
+    stats["newBytes"] += len(compressed)
+    return digest
+
+
+def _load_object(snapshot_dir: Path, digest: str) -> Any:
+    return json.loads(gzip.decompress(_object_path(snapshot_dir, digest).read_bytes()))
+
+
+def _new_snapshot_id(snapshot_dir: Path) -> str:
+    base_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    snapshot_id = base_id
+    suffix = 2
+    while (snapshot_dir / MANIFESTS_DIRNAME / f"{snapshot_id}.json").exists():
+        snapshot_id = f"{base_id}-{suffix}"
+        suffix += 1
+    return snapshot_id
+
+
+def list_snapshots(snapshot_dir: Path = SNAPSHOT_DIR) -> List[Dict[str, Any]]:
+    """Манифесты архива от старых к новым."""
+    manifests_dir = snapshot_dir / MANIFESTS_DIRNAME
+    if not manifests_dir.exists():
+        return []
+    manifests = [load_json_file(path) for path in manifests_dir.glob("*.json")]
+    return sorted(manifests, key=lambda manifest: manifest["createdAt"])
+
+
+def save_snapshot(
+    shipments: List[Dict[str, Any]],
+    products_data: Dict[str, Any],
+    meta: Dict[str, Any],
+    snapshot_dir: Path = SNAPSHOT_DIR,
+) -> Optional[Dict[str, Any]]:
+    """
+    Сохраняет генерацию в архив.
+
+    Returns:
+        Манифест новой генерации или None, если поставки и каталог
+        совпадают с последней генерацией архива
+    """
+    stats = {"chunkCount": 0, "newChunkCount": 0, "newBytes": 0}
+    # Шапка products.json: список товаров хранится по кускам, ключ остаётся на своём месте
+    catalog_header = {key: None if key == "products" else value for key, value in products_data.items()}
+    shipment_hashes = [_store_object(snapshot_dir, shipment, stats) for shipment in shipments]
+    product_hashes = [
+        _store_object(snapshot_dir, product, stats) for product in products_data.get("products", [])
+    ]
+    catalog_hash = _store_object(snapshot_dir, catalog_header, stats)
+
+    snapshots = list_snapshots(snapshot_dir)
+    if snapshots:
+        latest = snapshots[-1]
+        if (
+            latest["shipments"] == shipment_hashes
+            and latest["products"] == product_hashes
+            and latest["catalog"] == catalog_hash
+        ):
+            return None
+
+    manifest = {
+        "id": _new_snapshot_id(snapshot_dir),
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "updatedAt": meta.get("updatedAt"),
+        "meta": _store_object(snapshot_dir, meta, stats),
+        "catalog": catalog_hash,
+        "shipments": shipment_hashes,
+        "products": product_hashes,
+        "stats": stats,
+    }
+    write_json_atomic(snapshot_dir / MANIFESTS_DIRNAME / f"{manifest['id']}.json", manifest)
+    return manifest
+
+
+def resolve_snapshot_id(ref: str, snapshot_dir: Path = SNAPSHOT_DIR) -> str:
+    """
+    Находит генерацию по id, началу id (например, дате 20250301) или latest.
+
+    Raises:
+        KeyError: генерация не найдена или начало id подходит к нескольким
+    """
+    ids = [manifest["id"] for manifest in list_snapshots(snapshot_dir)]
+    if ref == LATEST_REF and ids:
+        return ids[-1]
+    if ref in ids:
+        return ref
+    matches = [snapshot_id for snapshot_id in ids if snapshot_id.startswith(re.sub(r"[-:]", "", ref))]
+    if len(matches) == 1:
+        return matches[0]
+    if matches:
+        raise KeyError(f"'{ref}' подходит к нескольким генерациям: {', '.join(matches)}")
+    raise KeyError(f"Генерация '{ref}' не найдена в {snapshot_dir}")
+
+
+def load_snapshot(snapshot_id: str, snapshot_dir: Path = SNAPSHOT_DIR) -> Generation:
+    """
+    Собирает генерацию из манифеста.
+
+    Returns:
+        (shipments, products_data, meta) в обычной схеме
+    """
+    manifest = load_json_file(snapshot_dir / MANIFESTS_DIRNAME / f"{snapshot_id}.json")
+    shipments = [_load_object(snapshot_dir, digest) for digest in manifest["shipments"]]
+    products_data = _load_object(snapshot_dir, manifest["catalog"])
+    products_data["products"] = [_load_object(snapshot_dir, digest) for digest in manifest["products"]]
+    meta = _load_object(snapshot_dir, manifest["meta"])
+    return shipments, products_data, meta
+
+
+def archive_size(snapshot_dir: Path = SNAPSHOT_DIR) -> int:
+    """Размер архива на диске в байтах (куски и манифесты)."""
+    if not snapshot_dir.exists():
+        return 0
+    return sum(path.stat().st_size for path in snapshot_dir.rglob("*.json*") if path.is_file())
+
+
+def archive_generation(
+    shipments: List[Dict[str, Any]],
+    products_data: Dict[str, Any],
+    meta: Dict[str, Any],
+    snapshot_dir: Path = SNAPSHOT_DIR,
+) -> Optional[Dict[str, Any]]:
+    """
+    Сохраняет записанную генерацию в архив и печатает, сколько места она заняла.
+
+    Архив — история, а не часть генерации: ошибка записи печатается, но не роняет запуск.
+    """
+    try:
+        manifest = save_snapshot(shipments, products_data, meta, snapshot_dir)
+    except OSError as error:
+        print(f"⚠️  Не удалось сохранить снимок генерации: {error}")
+        return None
+
+    if manifest is None:
+        print("💾 Поставки и каталог совпадают с последним снимком, новый не нужен")
+        return None
+    stats = manifest["stats"]
+    print(
+        f"💾 Снимок генерации {manifest['id']}: новых кусков {stats['newChunkCount']} "
+        f"из {stats['chunkCount']} (+{stats['newBytes'] / 1024:.1f} KB)"
+    )
+    return manifest
@@ -0,0 +1,162 @@
+"""
+Архив генераций data/: просмотр, откат и сравнение снимков (см. snapshot_store).
+
+    python snapshots.py list                       # все генерации архива
+    python snapshots.py save                       # сохранить текущие data/ в архив
+    python snapshots.py restore 20250301T0915      # откатить data/ к генерации
+    python snapshots.py diff latest                # что изменилось с последнего снимка
+    python snapshots.py diff 20250301 20250315     # разница между двумя генерациями
+
+Генерацию можно указать полным id, его началом (дата, дата и время) или latest;
+current в diff — текущие файлы data/.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from change_feed import build_change_feed, load_previous_generation, print_change_report
+from generation_store import current_generation_dir
+from json_storage import load_json_file
+from pipeline_api import DATA_DIR, validate_outputs, write_outputs
+from shipment_encoding import COMPACT_SCHEMA_VERSION
+from snapshot_store import (
+    LATEST_REF,
+    SNAPSHOT_DIR,
+    archive_generation,
+    archive_size,
+    list_snapshots,
+    load_snapshot,
+    resolve_snapshot_id,
+)
+
+if sys.platform == "win32":
+    import io
+
+    try:
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
+        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+    except AttributeError:
+        pass
+
+
+CURRENT_REF = "current"
+
+Catalog = Tuple[List[Dict[str, Any]], Dict[str, Any]]
+
+
+def _load_current(data_dir: Path) -> Tuple[List[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]:
+    generation_dir = current_generation_dir(data_dir)
+    current = load_previous_generation(generation_dir)
+    if current is None:
+        raise FileNotFoundError(f"В {generation_dir} нет shipments.json и products.json")
+    shipments, products_data = current
+    meta_file = generation_dir / "meta.json"
+    meta = load_json_file(meta_file) if meta_file.exists() else {}
+    return shipments, products_data, meta
+
+
+def _load_ref(ref: str, data_dir: Path, snapshot_dir: Path) -> Catalog:
+    if ref == CURRENT_REF:
+        shipments, products_data, _ = _load_current(data_dir)
+    else:
+        shipments, products_data, _ = load_snapshot(resolve_snapshot_id(ref, snapshot_dir), snapshot_dir)
+    return shipments, products_data
+
+
+def list_command(snapshot_dir: Path) -> bool:
+    snapshots = list_snapshots(snapshot_dir)
+    if not snapshots:
+        print(f"📂 Архив пуст: {snapshot_dir}")
+        return True
+
+    print(f"📂 Генераций в архиве: {len(snapshots)}")
+    print(f"   {'id':<20} {'updatedAt':<32} {'поставки':>8} {'товары':>7} {'новые куски':>12}")
+    for manifest in snapshots:
+        stats = manifest["stats"]
+        print(
+            f"   {manifest['id']:<20} {manifest['updatedAt'] or '—':<32}"
+            f" {len(manifest['shipments']):>8} {len(manifest['products']):>7}"
+            f" {stats['newChunkCount']:>4}/{stats['chunkCount']:<4}"
+            f" +{stats['newBytes'] / 1024:.1f} KB"
+        )
+    print(f"💾 Размер архива: {archive_size(snapshot_dir) / 1024:.1f} KB")
+    return True
+
+
+def save_command(data_dir: Path, snapshot_dir: Path) -> bool:
+    shipments, products_data, meta = _load_current(data_dir)
+    archive_generation(shipments, products_data, meta, snapshot_dir)
+    return True
+
+
+def restore_command(ref: str, data_dir: Path, snapshot_dir: Path, shipments_schema: int) -> bool:
+    """
+    Откатывает data/ к генерации из архива.
+
+    Генерация проходит ту же валидацию и запись, что и после парсинга: фасеты, бандлы
+    и лента изменений пересобираются, а сам откат попадает в архив новой генерацией.
+    """
+    snapshot_id = resolve_snapshot_id(ref, snapshot_dir)
+    shipments, products_data, meta = load_snapshot(snapshot_id, snapshot_dir)
+    print(f"⏪ Откат data/ к генерации {snapshot_id} (updatedAt {meta.get('updatedAt')})")
+    # Сводка профиля относится к исходному запуску, а не к откату
+    meta.pop("profile", None)
+
+    if not validate_outputs(shipments, products_data, meta):
+        return False
+    return write_outputs(
+        shipments,
+        products_data,
+        meta,
+        data_dir=data_dir,
+        shipments_schema=shipments_schema,
+        snapshot_dir=snapshot_dir,
+    )
+
+
+def diff_command(before_ref: str, after_ref: str, data_dir: Path, snapshot_dir: Path) -> bool:
+    previous = _load_ref(before_ref, data_dir, snapshot_dir)
+    shipments, products_data = _load_ref(after_ref, data_dir, snapshot_dir)
+    print(f"🔍 {before_ref} → {after_ref}")
+    print_change_report(build_change_feed(previous, shipments, products_data))
+    return True
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Архив генераций data/: list, save, restore, diff")
+    arg_parser.add_argument("--snapshot-dir", type=Path, default=SNAPSHOT_DIR, help="папка архива")
+    arg_parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="папка generated data")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="показать генерации архива")
+    commands.add_parser("save", help="сохранить текущие data/ в архив")
+    restore_parser = commands.add_parser("restore", help="откатить data/ к генерации")
+    restore_parser.add_argument("snapshot", help=f"id генерации, его начало или {LATEST_REF}")
+    restore_parser.add_argument(
+        "--shipments-schema",
+        type=int,
+        choices=(1, COMPACT_SCHEMA_VERSION),
+        default=1,
+        help="версия схемы shipments.json",
+    )
+    diff_parser = commands.add_parser("diff", help="сравнить две генерации")
+    diff_parser.add_argument("before", help=f"id генерации, его начало, {LATEST_REF} или {CURRENT_REF}")
+    diff_parser.add_argument("after", nargs="?", default=CURRENT_REF, help=f"по умолчанию {CURRENT_REF}")
+    args = arg_parser.parse_args()
+
+    try:
+        if args.command == "list":
+            success = list_command(args.snapshot_dir)
+        elif args.command == "save":
+            success = save_command(args.data_dir, args.snapshot_dir)
+        elif args.command == "restore":
+            success = restore_command(args.snapshot, args.data_dir, args.snapshot_dir, args.shipments_schema)
+        else:
+            success = diff_command(args.before, args.after, args.data_dir, args.snapshot_dir)
+    except (KeyError, FileNotFoundError) as error:
+        # KeyError хранит сообщение в args[0], str() добавил бы кавычки
+        print(f"❌ {error.args[0] if isinstance(error, KeyError) else error}")
+        success = False
+    sys.exit(0 if success else 1)
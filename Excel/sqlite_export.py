@@ -0,0 +1,318 @@
+"""
+Выгрузка validated data в SQLite для аналитических запросов.
+
+База data/exports/mehmet.sqlite3 собирается из тех же shipments/products, что
+записаны в data/, и раскладывает их по нормализованным таблицам:
+
+- shipments      — поставки (год, номер, статус, ETA / дата получения)
+- raw_items      — позиции поставок; effective_status — статус позиции или, если
+                   его нет, статус поставки (как в фасете status)
+- item_sizes     — размеры позиции: размер → количество
+- products       — каталог, материалы разложены по колонкам
+- product_sizes  — размеры товара из каталога
+- price_history  — price/cost товара в каждой поставке, от старых поставок к новым
+                   (из первой позиции поставки, где они есть, как в apply_latest_prices)
+- meta           — meta.json ключ → значение
+
+Индексы по productId, статусу, году и категории превращают вопросы вроде «все позиции
+из кожи питона, ещё в производстве, за все годы» в поиск по индексу:
+
+    SELECT s.year, s.number, i.override_name
+    FROM raw_items i
+    JOIN shipments s ON s.id = i.shipment_id
+    JOIN products p ON p.id = i.product_id
+    WHERE i.effective_status LIKE 'В производстве%' AND p.name LIKE '%питона%';
+
+База собирается целиком во временном файле в одной транзакции и заменяет старую
+одним os.replace: читатель видит либо прошлую, либо новую базу.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from catalog_pricing import get_shipment_sort_key
+from generation_store import current_generation_dir
+from json_storage import load_json_file
+from shipment_encoding import expand_shipments_payload
+
+if sys.platform == "win32":
+    import io
+
+    try:
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
+        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+    except AttributeError:
+        pass
+
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+EXPORTS_DIR = DATA_DIR / "exports"
+SQLITE_FILENAME = "mehmet.sqlite3"
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE shipments (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    year INTEGER,
+    number INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    status TEXT NOT NULL,
+    eta TEXT,
+    received_date TEXT,
+    group_by_payment INTEGER NOT NULL
+);
+
+CREATE TABLE products (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    category TEXT,
+    in_stock INTEGER NOT NULL,
+    photo TEXT,
+    price REAL,
+    cost REAL,
+    material_outer TEXT,
+    material_lining TEXT,
+    material_comments TEXT,
+    tags TEXT NOT NULL
+);
+
+CREATE TABLE product_sizes (
+    product_id TEXT NOT NULL REFERENCES products(id),
+    position INTEGER NOT NULL,
+    size TEXT NOT NULL,
+    PRIMARY KEY (product_id, size)
+);
+
+CREATE TABLE raw_items (
+    id INTEGER PRIMARY KEY,
+    shipment_id TEXT NOT NULL REFERENCES shipments(id),
+    position INTEGER NOT NULL,
+    product_id TEXT NOT NULL REFERENCES products(id),
+    override_name TEXT NOT NULL,
+    price REAL,
+    cost REAL,
+    status TEXT,
+    effective_status TEXT NOT NULL,
+    sizes_unknown INTEGER NOT NULL,
+    quantity_override INTEGER,
+    in_transit INTEGER NOT NULL,
+    sample INTEGER NOT NULL
+);
+
+CREATE TABLE item_sizes (
+    item_id INTEGER NOT NULL REFERENCES raw_items(id),
+    size TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (item_id, size)
+);
+
+CREATE TABLE price_history (
+    product_id TEXT NOT NULL REFERENCES products(id),
+    shipment_id TEXT NOT NULL REFERENCES shipments(id),
+    year INTEGER,
+    number INTEGER NOT NULL,
+    price REAL,
+    cost REAL,
+    PRIMARY KEY (product_id, shipment_id)
+);
+
+CREATE INDEX shipments_year ON shipments (year, number);
+CREATE INDEX shipments_status ON shipments (status);
+CREATE INDEX products_category ON products (category);
+CREATE INDEX raw_items_shipment ON raw_items (shipment_id, position);
+CREATE INDEX raw_items_product ON raw_items (product_id);
+CREATE INDEX raw_items_status ON raw_items (effective_status);
+CREATE INDEX product_sizes_size ON product_sizes (size);
+CREATE INDEX price_history_product ON price_history (product_id, year, number);
+"""
+
+Row = Tuple[Any, ...]
+
+
+def _flag(value: Any) -> int:
+    return 1 if value else 0
+
+
+def _shipment_rows(shipments: List[Dict[str, Any]]) -> List[Row]:
+    return [
+        (
+            shipment["id"],
+            position,
+            shipment.get("year"),
+            shipment["number"],
+            shipment["title"],
+            shipment["status"],
+            shipment.get("eta"),
+            shipment.get("receivedDate"),
+            _flag(shipment.get("groupByPayment")),
+        )
+        for position, shipment in enumerate(shipments)
+    ]
+
+
+def _product_rows(products: List[Dict[str, Any]]) -> Tuple[List[Row], List[Row]]:
+    product_rows = []
+    size_rows = []
+    for position, product in enumerate(products):
+        materials = product.get("materials") or {}
+        product_rows.append(
+            (
+                product["id"],
+                position,
+                product["name"],
+                product.get("category"),
+                _flag(product.get("inStock")),
+                product.get("photo"),
+                product.get("price"),
+                product.get("cost"),
+                materials.get("outer"),
+                materials.get("lining"),
+                materials.get("comments"),
+                json.dumps(product.get("tags", []), ensure_ascii=False),
+            )
+        )
+        size_rows += [
+            (product["id"], size_position, size)
+            for size_position, size in enumerate(product.get("sizes", []))
+        ]
+    return product_rows, size_rows
+
+
+def _item_rows(shipments: List[Dict[str, Any]]) -> Tuple[List[Row], List[Row]]:
+    item_rows = []
+    size_rows = []
+    for shipment in shipments:
+        for position, item in enumerate(shipment.get("rawItems", [])):
+            item_id = len(item_rows) + 1
+            item_rows.append(
+                (
+                    item_id,
+                    shipment["id"],
+                    position,
+                    item["productId"],
+                    item["overrideName"],
+                    item.get("price"),
+                    item.get("cost"),
+                    item.get("status"),
+                    item.get("status") or shipment["status"],
+                    _flag(item.get("sizesUnknown")),
+                    item.get("quantityOverride"),
+                    _flag(item.get("inTransit")),
+                    _flag(item.get("sample")),
+                )
+            )
+            size_rows += [(item_id, size, quantity) for size, quantity in (item.get("sizes") or {}).items()]
+    return item_rows, size_rows
+
+
+def _price_history_rows(shipments: Iterable[Dict[str, Any]]) -> List[Row]:
+    rows = []
+    for shipment in sorted(shipments, key=get_shipment_sort_key):
+        # Как в collect_latest_product_values: price и cost берутся из первой позиции, где они есть
+        values: Dict[str, List[Any]] = {}
+        for item in shipment.get("rawItems", []):
+            product_values = values.setdefault(item["productId"], [None, None])
+            for index, field in enumerate(("price", "cost")):
+                if product_values[index] is None and isinstance(item.get(field), (int, float)):
+                    product_values[index] = item[field]
+        rows += [
+            (product_id, shipment["id"], shipment.get("year"), shipment["number"], price, cost)
+            for product_id, (price, cost) in values.items()
+            if price is not None or cost is not None
+        ]
+    return rows
+
+
+def export_sqlite(
+    shipments: List[Dict[str, Any]],
+    products_data: Dict[str, Any],
+    meta: Dict[str, Any],
+    exports_dir: Path = EXPORTS_DIR,
+) -> Dict[str, int]:
+    """
+    Пересобирает SQLite-базу во временном файле и атомарно подменяет ею старую.
+
+    Returns:
+        Число строк в каждой таблице
+    """
+    target = exports_dir / SQLITE_FILENAME
+    temp_path = target.with_name(f"{target.name}.tmp")
+    exports_dir.mkdir(parents=True, exist_ok=True)
+    temp_path.unlink(missing_ok=True)
+
+    product_rows, product_size_rows = _product_rows(products_data.get("products", []))
+    item_rows, item_size_rows = _item_rows(shipments)
+    tables = {
+        "meta": [(key, json.dumps(value, ensure_ascii=False)) for key, value in meta.items()],
+        "shipments": _shipment_rows(shipments),
+        "products": product_rows,
+        "product_sizes": product_size_rows,
+        "raw_items": item_rows,
+        "item_sizes": item_size_rows,
+        "price_history": _price_history_rows(shipments),
+    }
+
+    connection = sqlite3.connect(temp_path)
+    try:
+        # Временный файл никто не читает: журнал и fsync на каждую страницу не нужны
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.executescript(SCHEMA)
+        with connection:
+            for table, rows in tables.items():
+                if rows:
+                    placeholders = ", ".join("?" * len(rows[0]))
+                    connection.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)
+        connection.execute("ANALYZE")
+        connection.close()
+        os.replace(temp_path, target)
+    except Exception:
+        connection.close()
+        temp_path.unlink(missing_ok=True)
+        raise
+    return {table: len(rows) for table, rows in tables.items()}
+
+
+def write_sqlite_export(
+    shipments: List[Dict[str, Any]],
+    products_data: Dict[str, Any],
+    meta: Dict[str, Any],
+    exports_dir: Path = EXPORTS_DIR,
+) -> bool:
+    """Этап sqlite: собирает базу и печатает число строк по таблицам."""
+    try:
+        counts = export_sqlite(shipments, products_data, meta, exports_dir)
+    except (OSError, sqlite3.Error) as error:
+        print(f"❌ Не удалось собрать SQLite-выгрузку: {error}")
+        return False
+    summary = ", ".join(f"{table} {count}" for table, count in counts.items() if table != "meta")
+    print(f"🗃️  SQLite-выгрузка: {exports_dir / SQLITE_FILENAME} ({summary})")
+    return True
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Выгрузка data/*.json в SQLite")
+    arg_parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="папка generated data")
+    args = arg_parser.parse_args()
+
+    generation_dir = current_generation_dir(args.data_dir)
+    try:
+        products_data = load_json_file(generation_dir / "products.json")
+        shipments = expand_shipments_payload(load_json_file(generation_dir / "shipments.json"), products_data)
+        meta = load_json_file(generation_dir / "meta.json")
+    except (OSError, ValueError) as error:
+        print(f"❌ Не удалось загрузить generated data: {error}")
+        sys.exit(1)
+    success = write_sqlite_export(shipments, products_data, meta, args.data_dir / "exports")
+    sys.exit(0 if success else 1)
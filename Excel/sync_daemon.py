@@ -0,0 +1,259 @@
+"""
+Фоновая синхронизация с Google Sheets.
+
+Демон раз в --interval секунд (со случайным разбросом --jitter, чтобы не стучаться
+ровно по расписанию) скачивает выгрузку таблицы и сравнивает её sha256 с последней
+обработанной. Если содержимое не изменилось, на этом проверка заканчивается:
+парсинг, цены, валидация и запись в data/ запускаются только на новую версию таблицы.
+
+Скачанный файл сначала разбирается из временной копии; рабочий xlsx/CSV и data/
+заменяются только после успешной валидации. При ошибке загрузки или валидации
+в data/ остаётся последняя удачная генерация, а ошибка пишется в файл статуса.
+Одна и та же сломанная версия таблицы повторно не парсится.
+
+Файл статуса (по умолчанию Excel/.cache/sync-status.json):
+lastCheckAt, lastChangeAt, lastError, contentHash, failedContentHash.
+"""
+
+import argparse
+import hashlib
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from data_validator import validate_generated_outputs
+from fetch_google_sheet import FORMAT_CSV, FORMAT_XLSX, build_export_url, is_expected_content, read_export
+from json_storage import load_json_file, write_json_atomic
+from pipeline_api import (
+    DATA_DIR,
+    JPG_DIR,
+    SCRIPT_DIR,
+    commit_generation,
+    parse_generation,
+    price_generation,
+    source_file_for_reader,
+)
+from shipment_encoding import COMPACT_SCHEMA_VERSION
+from snapshot_store import SNAPSHOT_DIR
+from workbook_readers import READER_CHOICES, READER_CSV, READER_PANDAS
+
+if sys.platform == "win32":
+    import io
+
+    try:
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
+        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+    except AttributeError:
+        pass
+
+
+STATUS_FILE = SCRIPT_DIR / ".cache" / "sync-status.json"
+
+SYNC_UNCHANGED = "unchanged"
+SYNC_UPDATED = "updated"
+SYNC_FAILED = "failed"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def next_delay(interval: float, jitter: float, rng: random.Random) -> float:
+    """Пауза до следующей проверки: interval ± jitter (доля от interval)."""
+    return max(0.0, interval * (1 + rng.uniform(-jitter, jitter)))
+
+
+class SheetSyncDaemon:
+    """Проверяет выгрузку таблицы и пересобирает data/ только при изменении содержимого."""
+
+    def __init__(
+        self,
+        reader: str = READER_PANDAS,
+        url: Optional[str] = None,
+        source_file: Optional[Path] = None,
+        jpg_dir: Path = JPG_DIR,
+        data_dir: Path = DATA_DIR,
+        status_file: Path = STATUS_FILE,
+        shipments_schema: int = 1,
+        snapshot_dir: Optional[Path] = None,
+    ):
+        self.reader = reader
+        self.export_format = FORMAT_CSV if reader == READER_CSV else FORMAT_XLSX
+        self.url = url or build_export_url(self.export_format)
+        self.source_file = source_file or source_file_for_reader(reader)
+        self.jpg_dir = jpg_dir
+        self.data_dir = data_dir
+        self.status_file = status_file
+        self.shipments_schema = shipments_schema
+        self.snapshot_dir = snapshot_dir
+        self.status = self._load_status()
+
+    def _load_status(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {
+            "lastCheckAt": None,
+            "lastChangeAt": None,
+            "lastError": None,
+            "contentHash": None,
+            "failedContentHash": None,
+        }
+        if self.status_file.exists():
+            try:
+                status.update(load_json_file(self.status_file))
+            except (OSError, ValueError):
+                # Повреждённый статус не мешает работе: следующая проверка просто пересоберёт данные
+                pass
+        return status
+
+    def _save_status(self) -> None:
+        write_json_atomic(self.status_file, self.status)
+
+    def _fail(self, message: str, failed_hash: Optional[str] = None) -> str:
+        print(f"❌ {message}")
+        print("⚠️  В data/ остаётся последняя удачная генерация")
+        self.status["lastError"] = {"at": self.status["lastCheckAt"], "message": message}
+        if failed_hash is not None:
+            self.status["failedContentHash"] = failed_hash
+        self._save_status()
+        return SYNC_FAILED
+
+    def check_once(self) -> str:
+        """Одна проверка: SYNC_UNCHANGED, SYNC_UPDATED или SYNC_FAILED."""
+        self.status["lastCheckAt"] = _now()
+
+        try:
+            content, content_type = read_export(self.url)
+        except Exception as error:
+            return self._fail(f"Не удалось скачать таблицу: {error}")
+
+        if not is_expected_content(content, self.export_format):
+            return self._fail(
+                f"Вместо {self.export_format.upper()} получен {content_type or 'неизвестный ответ'}: "
+                "проверьте доступ к таблице по ссылке"
+            )
+
+        digest = content_hash(content)
+        if digest in (self.status["contentHash"], self.status["failedContentHash"]):
+            self._save_status()
+            return SYNC_UNCHANGED
+
+        print(f"🔁 Таблица изменилась ({digest[:12]}), пересобираю data/...")
+        return self._rebuild(content, digest)
+
+    def _rebuild(self, content: bytes, digest: str) -> str:
+        # Временная копия с тем же расширением: по нему pandas/openpyxl выбирают формат
+        download_file = self.source_file.with_name(
+            f"{self.source_file.stem}.download{self.source_file.suffix}"
+        )
+        download_file.parent.mkdir(parents=True, exist_ok=True)
+        download_file.write_bytes(content)
+        try:
+            generation = parse_generation(download_file, self.reader, self.jpg_dir, self.data_dir)
+            if generation is None:
+                return self._fail("Парсинг таблицы не удался", failed_hash=digest)
+
+            price_generation(generation)
+            errors: List[str] = validate_generated_outputs(
+                generation.shipments, generation.products_data, generation.meta
+            )
+            if errors:
+                return self._fail(
+                    "Generated data не прошли валидацию: " + "; ".join(errors),
+                    failed_hash=digest,
+                )
+
+            if not commit_generation(
+                generation,
+                data_dir=self.data_dir,
+                shipments_schema=self.shipments_schema,
+                snapshot_dir=self.snapshot_dir,
+            ):
+                return self._fail("Не удалось записать data/")
+
+            # Рабочая копия таблицы обновляется только вместе с data/
+            download_file.replace(self.source_file)
+        finally:
+            download_file.unlink(missing_ok=True)
+
+        self.status.update(
+            {
+                "lastChangeAt": self.status["lastCheckAt"],
+                "contentHash": digest,
+                "failedContentHash": None,
+            }
+        )
+        self._save_status()
+        print("✅ Данные обновлены")
+        return SYNC_UPDATED
+
+    def run(
+        self,
+        interval: float,
+        jitter: float = 0.1,
+        stop_event: Optional[threading.Event] = None,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        """Проверяет таблицу до остановки (stop_event или Ctrl+C)."""
+        stop_event = stop_event or threading.Event()
+        rng = rng or random.Random()
+        while not stop_event.is_set():
+            try:
+                self.check_once()
+            except Exception as error:
+                # Демон работает без присмотра: неожиданная ошибка не должна его останавливать
+                self._fail(f"Проверка упала: {error}")
+            stop_event.wait(next_delay(interval, jitter, rng))
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Фоновая синхронизация data/ с Google Sheets")
+    arg_parser.add_argument("--interval", type=float, default=300, help="период проверки таблицы, s")
+    arg_parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.1,
+        help="случайный разброс периода, доля от --interval (0.1 — ±10%%)",
+    )
+    arg_parser.add_argument("--once", action="store_true", help="одна проверка и выход (для планировщика)")
+    arg_parser.add_argument(
+        "--reader",
+        choices=READER_CHOICES,
+        default=READER_PANDAS,
+        help="бэкенд чтения (csv — скачивать только вкладку 'Поставки')",
+    )
+    arg_parser.add_argument(
+        "--shipments-schema",
+        type=int,
+        choices=(1, COMPACT_SCHEMA_VERSION),
+        default=1,
+        help="версия схемы shipments.json",
+    )
+    arg_parser.add_argument("--status-file", type=Path, default=STATUS_FILE, help="путь к файлу статуса")
+    arg_parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="не сохранять генерации в архив снимков (см. snapshots.py)",
+    )
+    args = arg_parser.parse_args()
+
+    daemon = SheetSyncDaemon(
+        reader=args.reader,
+        status_file=args.status_file,
+        shipments_schema=args.shipments_schema,
+        snapshot_dir=None if args.no_snapshot else SNAPSHOT_DIR,
+    )
+    if args.once:
+        sys.exit(1 if daemon.check_once() == SYNC_FAILED else 0)
+
+    print(f"🔄 Синхронизация каждые {args.interval:g} s (±{args.jitter:.0%})")
+    print(f"   Статус: {args.status_file}")
+    try:
+        daemon.run(args.interval, args.jitter)
+    except KeyboardInterrupt:
+        print("\n👋 Синхронизация остановлена")
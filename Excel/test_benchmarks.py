@@ -0,0 +1,57 @@
+"""Тесты генератора синтетических таблиц и сравнения с базой бенчмарков."""
+
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from benchmarks.run_benchmarks import compare_with_baseline
+from benchmarks.workbook_generator import WorkbookSize, generate_workbook
+from catalog_pricing import apply_latest_prices
+from data_validator import validate_generated_outputs
+from excel_parser import ExcelParser
+from pipeline_api import build_meta
+from utils import aggregate_product_sizes, infer_category
+
+
+class WorkbookGeneratorTests(unittest.TestCase):
+    def test_generated_workbook_parses_into_valid_data(self):
+        size = WorkbookSize(years=2, shipments_per_year=8, items_per_shipment=6)
+        with TemporaryDirectory() as temp_dir:
+            excel_file = Path(temp_dir) / "benchmark.xlsx"
+            counts = generate_workbook(excel_file, size, seed=7)
+            products = []
+            with redirect_stdout(StringIO()):
+                shipments = ExcelParser(str(excel_file), products).parse()
+
+        items = [item for shipment in shipments for item in shipment["rawItems"]]
+        self.assertEqual(len(shipments), counts["shipmentCount"])
+        self.assertEqual(len(items), counts["itemCount"])
+        # Повторяющиеся модели склеиваются в один товар каталога
+        self.assertLess(len(products), len(items))
+        self.assertTrue(any(item.get("sample") for item in items))
+        self.assertTrue(any(item.get("sizesUnknown") for item in items))
+        # Курс J объединён на весь блок — себестоимость есть у всех позиций полученных поставок
+        received = [shipment for shipment in shipments if "receivedDate" in shipment]
+        self.assertTrue(all("cost" in item for shipment in received for item in shipment["rawItems"]))
+
+        products_data = {"products": products}
+        aggregate_product_sizes(shipments, products)
+        for product in products:
+            product["category"] = infer_category(product["name"])
+        apply_latest_prices(products_data, shipments)
+        self.assertEqual(validate_generated_outputs(shipments, products_data, build_meta()), [])
+
+    def test_slowdown_beyond_tolerance_is_reported(self):
+        baseline = {"sizes": {"small": {"stages": {"parse": {"seconds": 0.1, "peakBytes": 1000}}}}}
+        results = {"sizes": {"small": {"stages": {"parse": {"seconds": 0.2, "peakBytes": 1050}}}}}
+
+        regressions = compare_with_baseline(results, baseline, tolerance=0.3, memory_tolerance=0.1)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("small/parse", regressions[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
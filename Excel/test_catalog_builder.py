@@ -0,0 +1,73 @@
+"""Тесты сборки каталога за один проход catalog_builder.py."""
+
+import copy
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from benchmarks.workbook_generator import WorkbookSize, generate_workbook
+from catalog_builder import build_catalog
+from catalog_pricing import apply_latest_prices
+from excel_parser import ExcelParser
+from utils import aggregate_product_sizes, assign_product_photos
+
+
+class CatalogBuilderTests(unittest.TestCase):
+    def test_single_pass_matches_separate_sweeps(self):
+        size = WorkbookSize(years=2, shipments_per_year=6, items_per_shipment=5)
+        with TemporaryDirectory() as temp_dir:
+            excel_file = Path(temp_dir) / "catalog.xlsx"
+            jpg_dir = Path(temp_dir) / "jpg"
+            jpg_dir.mkdir()
+            generate_workbook(excel_file, size, seed=5)
+            products = []
+            with redirect_stdout(StringIO()):
+                shipments = ExcelParser(str(excel_file), products).parse()
+            # Фото есть у части товаров, расширение в другом регистре
+            for product in products[::3]:
+                (jpg_dir / f"{product['name']}.JPG").write_bytes(b"")
+
+            expected = {"products": copy.deepcopy(products)}
+            aggregate_product_sizes(shipments, expected["products"])
+            assign_product_photos(expected["products"], jpg_dir)
+            expected_stats = apply_latest_prices(expected, shipments)
+
+            actual = {"products": products}
+            # Порядок поставок на входе не важен: цены берутся из самых новых
+            actual_stats = build_catalog(actual, list(reversed(shipments)), jpg_dir)
+
+        self.assertEqual(actual_stats, expected_stats)
+        self.assertEqual(actual, expected)
+        # Порядок ключей товара тот же: photo перед price/cost
+        self.assertEqual(
+            [list(product) for product in actual["products"]],
+            [list(product) for product in expected["products"]],
+        )
+        self.assertTrue(any("photo" in product for product in actual["products"]))
+
+    def test_prices_of_unknown_products_are_reported(self):
+        products_data = {"products": [{"id": "auto-001", "name": "Жакет из кожи", "category": "Кожа"}]}
+        shipments = [
+            {
+                "id": "shipment-2025-1",
+                "year": 2025,
+                "number": 1,
+                "rawItems": [
+                    {"productId": "auto-001", "price": 100, "sizes": {"S": 1}},
+                    {"productId": "auto-404", "price": 50, "sizes": {"M": 1}},
+                ],
+            }
+        ]
+
+        stats = build_catalog(products_data, shipments)
+
+        self.assertEqual(stats["missingProductIds"], ["auto-404"])
+        self.assertEqual(products_data["products"][0]["price"], 100)
+        self.assertEqual(products_data["products"][0]["sizes"], ["S"])
+        self.assertNotIn("photo", products_data["products"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
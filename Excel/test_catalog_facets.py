@@ -0,0 +1,80 @@
+"""Тесты фасетного индекса каталога."""
+
+import unittest
+
+from catalog_facets import build_facet_index, select_product_ids
+
+
+class CatalogFacetTests(unittest.TestCase):
+    def build_index(self):
+        products_data = {
+            "products": [
+                {
+                    "id": "auto-002",
+                    "category": "Кожа",
+                    "sizes": ["s", "xs"],
+                    "inStock": True,
+                    "photo": "/images/products/jpg/a.jpg",
+                },
+                {
+                    "id": "auto-001",
+                    "category": "Кожа",
+                    "sizes": ["OneSize"],
+                    "inStock": True,
+                },
+                {
+                    "id": "auto-003",
+                    "category": "Мех",
+                    "sizes": ["xs"],
+                    "inStock": False,
+                },
+            ]
+        }
+        shipments = [
+            {
+                "id": "shipment-2026-1",
+                "status": "В работе 🧵",
+                "rawItems": [
+                    {"productId": "auto-001"},
+                    {"productId": "auto-003", "status": "Получено, оплачено ✅"},
+                ],
+            }
+        ]
+        return build_facet_index(products_data, shipments)
+
+    def test_facet_values_hold_sorted_ids_and_counts(self):
+        facets = self.build_index()["facets"]
+
+        self.assertEqual(
+            facets["category"]["Кожа"],
+            {"count": 2, "productIds": ["auto-001", "auto-002"]},
+        )
+        self.assertEqual(list(facets["size"]), ["xs", "s", "OneSize"])
+        self.assertEqual(facets["photo"]["missing"]["productIds"], ["auto-001", "auto-003"])
+        self.assertEqual(facets["inStock"]["false"]["productIds"], ["auto-003"])
+
+    def test_item_without_status_inherits_shipment_status(self):
+        facets = self.build_index()["facets"]
+
+        self.assertEqual(facets["status"]["В работе 🧵"]["productIds"], ["auto-001"])
+        self.assertEqual(facets["status"]["Получено, оплачено ✅"]["productIds"], ["auto-003"])
+
+    def test_selection_intersects_facets_and_unions_values(self):
+        index = self.build_index()
+
+        self.assertEqual(
+            select_product_ids(index, {"category": ["Кожа", "Мех"], "size": ["xs"]}),
+            ["auto-002", "auto-003"],
+        )
+        self.assertEqual(
+            select_product_ids(index, {"category": ["Кожа"], "inStock": ["false"]}),
+            [],
+        )
+        self.assertEqual(
+            select_product_ids(index, {}),
+            ["auto-001", "auto-002", "auto-003"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
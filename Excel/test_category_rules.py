@@ -0,0 +1,95 @@
+"""Тесты правил категорий category_rules.py."""
+
+import json
+import random
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from category_rules import CategoryMatcher, CategoryRule, default_matcher, load_category_rules
+from data_validator import ALLOWED_PRODUCT_CATEGORIES
+from utils import infer_category
+
+
+def reference_category(name):
+    """Прежняя захардкоженная логика infer_category."""
+    s = name.lower().strip()
+    for root, category in (("питон", "Экзотика"), ("кож", "Кожа"), ("мех", "Мех"), ("замш", "Замша")):
+        if root in s:
+            return category
+    return None
+
+
+class CategoryRulesTests(unittest.TestCase):
+    def write_rules(self, rules):
+        temp_dir = TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        path = Path(temp_dir.name) / "category_rules.json"
+        path.write_text(json.dumps({"rules": rules}, ensure_ascii=False), encoding="utf-8")
+        return path
+
+    def test_default_rules_match_previous_priorities(self):
+        rng = random.Random(11)
+        words = ["Жакет", "из", "кожи", "ПИТОНА", "мех", "замши", "норки", "Hermes", "— чёрный", "мехом"]
+        for _ in range(500):
+            name = " ".join(rng.choice(words) for _ in range(rng.randint(1, 5)))
+            expected = reference_category(name)
+            if expected is None:
+                with self.assertRaises(ValueError):
+                    infer_category(name)
+            else:
+                self.assertEqual(infer_category(name), expected, name)
+        self.assertEqual(ALLOWED_PRODUCT_CATEGORIES, set(default_matcher().categories))
+
+    def test_new_category_from_data_file(self):
+        path = self.write_rules(
+            [
+                {"category": "Мех", "priority": 20, "roots": ["мех"]},
+                {"category": "Овчина", "priority": 30, "roots": ["овчин", "дублён"]},
+                {"category": "Текстиль", "priority": 5, "roots": ["шерст", "хлопок"]},
+            ]
+        )
+        matcher = CategoryMatcher(load_category_rules(path))
+
+        # Приоритет важнее порядка корней в названии
+        self.assertEqual(matcher.match("Жилет с мехом из овчины"), "Овчина")
+        self.assertEqual(matcher.match("Пальто из шерсти"), "Текстиль")
+        self.assertIsNone(matcher.match("Куртка"))
+        self.assertEqual(matcher.categories, {"Мех", "Овчина", "Текстиль"})
+
+    def test_overlapping_roots_are_all_found(self):
+        matcher = CategoryMatcher(
+            [CategoryRule("Низкий", 1, ("абв",)), CategoryRule("Высокий", 2, ("бвг",))]
+        )
+
+        self.assertEqual(matcher.match("абвг"), "Высокий")
+
+    def test_results_are_memoized(self):
+        matcher = CategoryMatcher([CategoryRule("Мех", 1, ("мех",))])
+        for _ in range(3):
+            matcher.match("Шуба из меха")
+
+        self.assertEqual(matcher.match.cache_info().hits, 2)
+
+    def test_conflicting_rules_are_rejected(self):
+        duplicate_root = self.write_rules(
+            [
+                {"category": "Мех", "priority": 2, "roots": ["мех"]},
+                {"category": "Шуба", "priority": 1, "roots": ["МЕХ"]},
+            ]
+        )
+        duplicate_priority = self.write_rules(
+            [
+                {"category": "Мех", "priority": 1, "roots": ["мех"]},
+                {"category": "Кожа", "priority": 1, "roots": ["кож"]},
+            ]
+        )
+
+        with self.assertRaisesRegex(ValueError, "корень 'мех'"):
+            load_category_rules(duplicate_root)
+        with self.assertRaisesRegex(ValueError, "priority 1"):
+            load_category_rules(duplicate_priority)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Тесты ленты изменений между генерациями."""
+
+import copy
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from change_feed import build_change_feed, has_changes, load_previous_generation
+from json_storage import write_json_atomic
+from shipment_encoding import encode_shipments
+
+PRODUCTS_DATA = {
+    "products": [
+        {"id": "auto-001", "name": "Плащ из замши — коричневый", "price": 280, "sizes": ["S"], "excelRows": [3]},
+        {"id": "auto-002", "name": "Юбка из кожи — чёрная", "price": 120, "sizes": ["M"], "excelRows": [4]},
+    ]
+}
+
+SHIPMENTS = [
+    {
+        "id": "shipment-2025-1",
+        "number": 1,
+        "title": "Поставка №1",
+        "status": "В пути",
+        "rawItems": [
+            {"overrideName": "Плащ из замши — коричневый (S-2)", "productId": "auto-001", "price": 280, "sizes": {"S": 2}},
+            {"overrideName": "Юбка из кожи — чёрная (M-1)", "productId": "auto-002", "price": 120, "sizes": {"M": 1}},
+        ],
+        "year": 2025,
+        "eta": "ETA 10.11",
+    }
+]
+
+
+class ChangeFeedTests(unittest.TestCase):
+    def test_identical_generations_have_no_changes(self):
+        feed = build_change_feed((SHIPMENTS, PRODUCTS_DATA), copy.deepcopy(SHIPMENTS), copy.deepcopy(PRODUCTS_DATA))
+
+        self.assertFalse(has_changes(feed))
+        self.assertEqual(feed["affectedProductIds"], [])
+
+    def test_field_level_changes_and_added_records(self):
+        shipments = copy.deepcopy(SHIPMENTS)
+        products_data = copy.deepcopy(PRODUCTS_DATA)
+        shipment = shipments[0]
+        shipment["status"] = "Получено"
+        del shipment["eta"]
+        shipment["receivedDate"] = "12.11.2025"
+        # Правка размеров меняет название позиции, но это та же позиция
+        shipment["rawItems"][0].update({"overrideName": "Плащ из замши — коричневый (S-3)", "sizes": {"S": 3}})
+        shipment["rawItems"].append({"overrideName": "Шуба из меха — серая (L-1)", "productId": "auto-003"})
+        products_data["products"][1].update({"price": 130, "excelRows": [5]})
+        products_data["products"].append({"id": "auto-003", "name": "Шуба из меха — серая"})
+
+        feed = build_change_feed((SHIPMENTS, PRODUCTS_DATA), shipments, products_data, "2025-11-12T00:00:00")
+
+        self.assertEqual(
+            feed["shipments"]["modified"][0]["changes"],
+            {
+                "eta": {"from": "ETA 10.11", "to": None},
+                "receivedDate": {"from": None, "to": "12.11.2025"},
+                "status": {"from": "В пути", "to": "Получено"},
+            },
+        )
+        item_change = feed["items"]["modified"][0]
+        self.assertEqual(item_change["productId"], "auto-001")
+        self.assertEqual(item_change["changes"]["sizes"], {"from": {"S": 2}, "to": {"S": 3}})
+        self.assertEqual(feed["items"]["added"][0]["productId"], "auto-003")
+        # excelRows не считается изменением товара
+        self.assertEqual(feed["products"]["modified"], [{"id": "auto-002", "changes": {"price": {"from": 120, "to": 130}}}])
+        self.assertEqual(feed["products"]["added"], ["auto-003"])
+        self.assertEqual(feed["affectedProductIds"], ["auto-001", "auto-002", "auto-003"])
+
+    def test_previous_generation_is_read_from_compact_schema(self):
+        with TemporaryDirectory() as temp_dir:
+            data_dir = Path(temp_dir)
+            self.assertIsNone(load_previous_generation(data_dir))
+
+            write_json_atomic(data_dir / "products.json", PRODUCTS_DATA)
+            write_json_atomic(data_dir / "shipments.json", encode_shipments(SHIPMENTS, PRODUCTS_DATA))
+
+            self.assertEqual(load_previous_generation(data_dir), (SHIPMENTS, PRODUCTS_DATA))
+
+
+if __name__ == "__main__":
+    unittest.main()
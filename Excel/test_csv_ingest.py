@@ -0,0 +1,62 @@
+"""Тесты загрузки вкладки "Поставки" в CSV."""
+
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from excel_parser import ExcelParser
+from fetch_google_sheet import FORMAT_CSV, FORMAT_XLSX, build_export_url, is_expected_content
+from workbook_readers import READER_CSV
+
+HEADER = ",".join(f"column-{column}" for column in range(1, 17))
+
+# Курс J задан только в первой строке каждой поставки — так CSV выгружает объединённую ячейку
+SHIPMENTS_CSV = "\n".join([
+    HEADER,
+    "2025,,,,,,,,,,,,,,,",
+    '1,,Жакет из кожи — первый (XS-1),,"В пути 🚚",В работе,1,"$100",,"95,5",,,,"42 000",,01.10.2025',
+    ",,Жакет из кожи — второй (XS-1),,,,1,100,,,,,,43000,,",
+    ",,,,,,,,,,,,,,,",
+    "2,,Жакет из кожи — третий (XS-1),,,,1,100,,,,,,44000,,",
+]) + "\n"
+
+
+class CsvIngestTests(unittest.TestCase):
+    def parse_csv(self, text):
+        with TemporaryDirectory() as temp_dir:
+            csv_path = Path(temp_dir) / "Поставки.csv"
+            csv_path.write_text(text, encoding="utf-8")
+            with redirect_stdout(StringIO()):
+                return ExcelParser(str(csv_path), [], reader=READER_CSV).parse()
+
+    def test_exchange_rate_is_carried_within_shipment_block_only(self):
+        shipments = {shipment["number"]: shipment for shipment in self.parse_csv(SHIPMENTS_CSV)}
+
+        first_costs = [item.get("cost") for item in shipments[1]["rawItems"]]
+        self.assertEqual(first_costs, [42000, 43000])
+        # У следующей поставки своего курса нет — себестоимость ещё неизвестна
+        self.assertNotIn("cost", shipments[2]["rawItems"][0])
+
+    def test_formatted_cells_are_parsed_like_xlsx_values(self):
+        shipment = next(
+            shipment for shipment in self.parse_csv(SHIPMENTS_CSV) if shipment["number"] == 1
+        )
+
+        self.assertEqual(shipment["id"], "shipment-2025-1")
+        self.assertEqual(shipment["receivedDate"], "01.10.2025")
+        self.assertEqual(shipment["rawItems"][0]["price"], 100)
+        self.assertTrue(shipment["rawItems"][0]["inTransit"])
+
+    def test_csv_export_url_targets_shipments_tab(self):
+        self.assertIn("format=csv&gid=", build_export_url(FORMAT_CSV))
+        self.assertNotIn("gid=", build_export_url(FORMAT_XLSX))
+
+    def test_html_login_page_is_not_accepted_as_csv(self):
+        self.assertFalse(is_expected_content(b"<!DOCTYPE html><html>", FORMAT_CSV))
+        self.assertTrue(is_expected_content(SHIPMENTS_CSV.encode("utf-8"), FORMAT_CSV))
+
+
+if __name__ == "__main__":
+    unittest.main()
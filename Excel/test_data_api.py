@@ -0,0 +1,86 @@
+"""Тесты локального HTTP API над data/."""
+
+import gzip
+import json
+import shutil
+import threading
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from data_api import DataApiServer, DataStore
+from json_storage import load_json_file, write_json_atomic
+
+REPO_DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+class DataApiTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.data_dir = Path(temp_dir.name)
+        for name in ("shipments.json", "products.json", "meta.json", "facets.json"):
+            shutil.copy(REPO_DATA_DIR / name, self.data_dir / name)
+
+        self.store = DataStore(self.data_dir)
+        self.server = DataApiServer(("127.0.0.1", 0), self.store)
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def get(self, path, headers=None):
+        try:
+            with urlopen(Request(self.base_url + path, headers=headers or {})) as response:
+                return response.status, response.headers, response.read()
+        except HTTPError as error:
+            return error.code, error.headers, error.read()
+
+    def test_record_and_etag_revalidation(self):
+        product = load_json_file(self.data_dir / "products.json")["products"][0]
+
+        status, headers, body = self.get(f"/products/{quote(product['id'])}")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), product)
+
+        status, _, body = self.get(f"/products/{quote(product['id'])}", {"If-None-Match": headers["ETag"]})
+        self.assertEqual((status, body), (304, b""))
+        self.assertEqual(self.get("/products/missing")[0], 404)
+        self.assertEqual(self.get("/products?color=red")[0], 400)
+
+    def test_filtered_listing_uses_facets_and_gzip(self):
+        facets = load_json_file(self.data_dir / "facets.json")["facets"]
+        category, entry = next(iter(facets["category"].items()))
+
+        status, headers, body = self.get(f"/products?category={quote(category)}", {"Accept-Encoding": "gzip"})
+
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        payload = json.loads(gzip.decompress(body))
+        self.assertEqual(payload["count"], entry["count"])
+        self.assertEqual(sorted(product["id"] for product in payload["products"]), entry["productIds"])
+
+    def test_new_generation_replaces_old_and_broken_one_is_ignored(self):
+        _, headers, _ = self.get("/meta")
+        meta = load_json_file(self.data_dir / "meta.json")
+        write_json_atomic(self.data_dir / "meta.json", {**meta, "updatedAt": "2030-01-01T00:00:00+00:00"})
+
+        with redirect_stdout(StringIO()):
+            self.assertTrue(self.store.reload_if_changed())
+        status, new_headers, body = self.get("/meta", {"If-None-Match": headers["ETag"]})
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["updatedAt"], "2030-01-01T00:00:00+00:00")
+
+        (self.data_dir / "products.json").write_text("{", encoding="utf-8")
+        with redirect_stdout(StringIO()):
+            self.assertFalse(self.store.reload_if_changed())
+        self.assertEqual(self.get("/meta")[1]["ETag"], new_headers["ETag"])
+
+
+if __name__ == "__main__":
+    unittest.main()
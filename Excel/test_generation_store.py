@@ -0,0 +1,58 @@
+"""Тесты публикации генераций и блокировки записи generation_store.py."""
+
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from generation_store import (
+    KEEP_GENERATIONS,
+    current_generation_dir,
+    list_generation_ids,
+    new_generation_dir,
+    publish_generation,
+    writer_lock,
+)
+
+
+class GenerationStoreTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.data_dir = Path(temp_dir.name)
+
+    def publish(self, text):
+        generation_dir = new_generation_dir(self.data_dir)
+        (generation_dir / "meta.json").write_text(text, encoding="utf-8")
+        publish_generation(self.data_dir, generation_dir)
+        return generation_dir
+
+    def test_without_pointer_readers_use_flat_files(self):
+        self.assertEqual(current_generation_dir(self.data_dir), self.data_dir)
+
+        # Недописанная папка без указателя не становится текущей
+        new_generation_dir(self.data_dir)
+        self.assertEqual(current_generation_dir(self.data_dir), self.data_dir)
+
+    def test_publish_switches_pointer_and_keeps_recent_generations(self):
+        published = [self.publish(str(index)) for index in range(KEEP_GENERATIONS + 2)]
+
+        self.assertEqual(current_generation_dir(self.data_dir), published[-1])
+        self.assertEqual(list_generation_ids(self.data_dir), [path.name for path in published[-KEEP_GENERATIONS:]])
+        self.assertEqual((current_generation_dir(self.data_dir) / "meta.json").read_text(encoding="utf-8"), "4")
+
+    def test_second_writer_waits_for_lock(self):
+        with writer_lock(self.data_dir):
+            with redirect_stdout(StringIO()) as output, self.assertRaises(TimeoutError):
+                with writer_lock(self.data_dir, timeout=0.2):
+                    pass
+        self.assertIn("другой запуск", output.getvalue())
+
+        # После выхода из первого блока блокировка свободна
+        with writer_lock(self.data_dir, timeout=0.2):
+            pass
+
+
+if __name__ == "__main__":
+    unittest.main()
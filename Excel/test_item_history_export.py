@@ -0,0 +1,78 @@
+"""Тесты колоночной истории позиций."""
+
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from item_history_export import FORMAT_CSV, INDEX_FILENAME, append_item_history, load_item_history
+from json_storage import load_json_file
+
+
+def make_generation(price, updated_at):
+    shipments = [
+        {
+            "id": "shipment-2025-1",
+            "number": 1,
+            "title": "Поставка №1",
+            "status": "Получено ✅",
+            "rawItems": [
+                {
+                    "overrideName": "Юбка (XS-2, S-1)",
+                    "productId": "auto-001",
+                    "price": price,
+                    "cost": 9000,
+                    "sizes": {"xs": 2, "s": 1},
+                },
+                {
+                    "overrideName": "Плащ (на уточнении)",
+                    "productId": "auto-002",
+                    "sizesUnknown": True,
+                    "quantityOverride": 4,
+                    "status": "В производстве 🛠️",
+                },
+            ],
+            "year": 2025,
+        }
+    ]
+    products_data = {
+        "products": [
+            {"id": "auto-001", "name": "Юбка", "category": "Экзотика"},
+            {"id": "auto-002", "name": "Плащ", "category": "Замша"},
+        ]
+    }
+    return shipments, products_data, {"updatedAt": updated_at, "source": "excel"}
+
+
+class ItemHistoryExportTests(unittest.TestCase):
+    def test_csv_history_appends_only_changed_generations(self):
+        with TemporaryDirectory() as temp_dir:
+            exports_dir = Path(temp_dir)
+
+            first = append_item_history(
+                *make_generation(320, "2025-03-01T00:00:00+00:00"), exports_dir, export_format=FORMAT_CSV
+            )
+            repeated = append_item_history(*make_generation(320, "2025-03-02T00:00:00+00:00"), exports_dir)
+            second = append_item_history(*make_generation(340, "2025-03-03T00:00:00+00:00"), exports_dir)
+
+            self.assertEqual(first["rowsCount"], 2)
+            self.assertIsNone(repeated)
+            self.assertEqual(second["file"], first["file"])
+            self.assertEqual(len(load_json_file(exports_dir / INDEX_FILENAME)["generations"]), 2)
+
+            history = load_item_history(exports_dir)
+
+        self.assertEqual(len(history), 4)
+        self.assertEqual(history["generation_at"].nunique(), 2)
+        self.assertEqual(str(history["price"].dtype), "Float64")
+        self.assertEqual(history["price"].tolist()[::2], [320, 340])
+        skirt, coat = history.iloc[0], history.iloc[1]
+        self.assertEqual((skirt["size_xs"], skirt["size_s"], skirt["quantity"]), (2, 1, 3))
+        self.assertTrue(skirt["has_exchange_rate"])
+        self.assertEqual(skirt["product_category"], "Экзотика")
+        self.assertEqual((coat["quantity"], coat["effective_status"]), (4, "В производстве 🛠️"))
+        self.assertFalse(coat["has_exchange_rate"])
+        self.assertTrue(coat["sizes_unknown"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,8 +9,10 @@ from tempfile import TemporaryDirectory
 import pandas as pd
 from openpyxl import Workbook
 
+from benchmarks.workbook_generator import WorkbookSize, generate_workbook
 from excel_parser import ExcelParser
-from utils import parse_sizes_from_name
+from utils import collect_product_materials, merge_product_materials, parse_sizes_from_name
+from workbook_readers import READER_PANDAS, available_readers
 
 
 class ParserLogicTests(unittest.TestCase):
@@ -24,7 +26,7 @@ class ParserLogicTests(unittest.TestCase):
 
     def parse_item(self, row):
         with redirect_stdout(StringIO()):
-            return ExcelParser("unused.xlsx", [])._parse_item(row, excel_row=2)
+            return ExcelParser("unused.xlsx", [])._parse_item(row, excel_row=2).to_dict()
 
     def test_duplicate_size_stops_parsing_with_excel_row(self):
         with self.assertRaisesRegex(
@@ -59,6 +61,15 @@ class ParserLogicTests(unittest.TestCase):
 
         self.assertEqual(item["cost"], 42000)
 
+    def test_sample_quantity_keeps_json_key_order(self):
+        row = self.create_row(exchange_rate=95.5)
+        row.iloc[2] = "Жакет из кожи — тестовый (образец)"
+
+        item = self.parse_item(row)
+
+        self.assertEqual(list(item)[-2:], ["sample", "quantityOverride"])
+        self.assertEqual(item["quantityOverride"], 1)
+
     def test_merged_exchange_rate_imports_cost_for_every_position(self):
         with TemporaryDirectory() as temp_dir:
             excel_path = Path(temp_dir) / "shipments.xlsx"
@@ -93,14 +104,65 @@ class ParserLogicTests(unittest.TestCase):
             workbook.save(excel_path)
             workbook.close()
 
-            with redirect_stdout(StringIO()):
-                shipments = ExcelParser(str(excel_path), []).parse()
+            parsed_by_reader = {}
+            for reader in available_readers():
+                with redirect_stdout(StringIO()):
+                    parsed_by_reader[reader] = ExcelParser(str(excel_path), [], reader=reader).parse()
 
-        costs = [
-            item.get("cost")
-            for item in shipments[0]["rawItems"]
+        for reader, shipments in parsed_by_reader.items():
+            with self.subTest(reader=reader):
+                costs = [
+                    item.get("cost")
+                    for item in shipments[0]["rawItems"]
+                ]
+                self.assertEqual(costs, [42000, 43000])
+
+                self.assertEqual(shipments, parsed_by_reader[READER_PANDAS])
+
+    def test_parallel_parse_matches_sequential(self):
+        size = WorkbookSize(years=2, shipments_per_year=12, items_per_shipment=5)
+        with TemporaryDirectory() as temp_dir:
+            excel_path = Path(temp_dir) / "parallel.xlsx"
+            generate_workbook(excel_path, size, seed=3)
+
+            results = {}
+            for workers in (1, 2):
+                products = []
+                log = StringIO()
+                with redirect_stdout(log):
+                    shipments = ExcelParser(str(excel_path), products, workers=workers).parse()
+                results[workers] = (shipments, products, log.getvalue())
+
+        sequential, parallel = results[1], results[2]
+        # auto-id, excelRows, материалы и порядок сообщений о новых товарах — как при последовательном разборе
+        self.assertEqual(parallel[0], sequential[0])
+        self.assertEqual(parallel[1], sequential[1])
+        self.assertEqual(parallel[2], sequential[2])
+        self.assertTrue(any(len(product["excelRows"]) > 1 for product in parallel[1]))
+
+    def test_materials_merge_keeps_first_fields_and_comment_order(self):
+        rows = [
+            {"comments": "без пуговиц"},
+            {"outer": "Кожа питона", "comments": "длина 60 см"},
+            {"outer": "Кожа ягнёнка", "lining": "Шёлк", "comments": "без пуговиц"},
+            # Значение, уже входящее в собранный текст, не дописывается
+            {"lining": "Вискоза", "comments": "60 см"},
+            {"comments": "потайная молния"},
         ]
-        self.assertEqual(costs, [42000, 43000])
+        products = [{"id": "auto-001", "materials": {}}, {"id": "auto-002", "materials": {"outer": "Замша"}}]
+        candidates = {}
+        for materials in rows:
+            collect_product_materials(candidates, "auto-001", materials)
+        collect_product_materials(candidates, "auto-002", {"outer": "Кожа", "comments": "мех"})
+
+        merge_product_materials(products, candidates)
+
+        self.assertEqual(
+            products[0]["materials"],
+            {"comments": "без пуговиц\nдлина 60 см\nпотайная молния", "outer": "Кожа питона", "lining": "Шёлк"},
+        )
+        self.assertEqual(list(products[0]["materials"]), ["comments", "outer", "lining"])
+        self.assertEqual(products[1]["materials"], {"outer": "Замша", "comments": "мех"})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+"""Тесты планировщика этапов pipeline.py."""
+
+import threading
+import unittest
+
+from pipeline import STAGE_FAILED, STAGE_OK, STAGE_SKIPPED, Stage, run_stages
+
+
+class PipelineSchedulerTests(unittest.TestCase):
+    def test_failed_stage_skips_its_dependents_only(self):
+        calls = []
+
+        def succeed(name):
+            def run(context):
+                calls.append(name)
+                return True
+            return run
+
+        stages = [
+            Stage("fetch", (), lambda context: False),
+            Stage("parse", ("fetch",), succeed("parse")),
+            Stage("write", ("parse",), succeed("write")),
+            Stage("images", (), succeed("images"), required=False),
+        ]
+
+        results = run_stages(stages, {})
+
+        self.assertEqual(results["fetch"]["exitCode"], STAGE_FAILED)
+        self.assertEqual(results["parse"]["exitCode"], STAGE_SKIPPED)
+        self.assertEqual(results["write"]["exitCode"], STAGE_SKIPPED)
+        self.assertEqual(results["images"]["exitCode"], STAGE_OK)
+        self.assertEqual(calls, ["images"])
+
+    def test_independent_stages_run_concurrently(self):
+        # Оба этапа ждут друг друга: без параллельного запуска барьер не пройдёт
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_for_peer(context):
+            barrier.wait()
+            return True
+
+        stages = [
+            Stage("parse", (), wait_for_peer),
+            Stage("images", (), wait_for_peer),
+        ]
+
+        results = run_stages(stages, {})
+
+        self.assertEqual({result["exitCode"] for result in results.values()}, {STAGE_OK})
+
+    def test_stage_exception_becomes_failed_exit_code(self):
+        def explode(context):
+            raise RuntimeError("boom")
+
+        results = run_stages([Stage("parse", (), explode)], {})
+
+        self.assertEqual(results["parse"]["exitCode"], STAGE_FAILED)
+
+
+if __name__ == "__main__":
+    unittest.main()
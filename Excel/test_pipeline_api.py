@@ -0,0 +1,142 @@
+"""Тесты Python API пайплайна pipeline_api.py."""
+
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from benchmarks.workbook_generator import WorkbookSize, generate_workbook
+from generation_store import current_generation_dir
+from json_storage import load_json_file
+from pipeline_api import (
+    commit_generation,
+    load_generation,
+    parse_generation,
+    price_generation,
+    validate_generation,
+)
+from shipment_encoding import COMPACT_SCHEMA_VERSION
+
+
+class PipelineApiTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name)
+        self.excel_file = self.root / "table.xlsx"
+        self.data_dir = self.root / "data"
+        self.jpg_dir = self.root / "jpg"
+        self.data_dir.mkdir()
+        self.jpg_dir.mkdir()
+        generate_workbook(self.excel_file, WorkbookSize(years=1, shipments_per_year=4, items_per_shipment=5), seed=3)
+
+    def parse(self):
+        with redirect_stdout(StringIO()):
+            return parse_generation(self.excel_file, jpg_dir=self.jpg_dir, data_dir=self.data_dir)
+
+    def test_stages_chain_in_memory_and_commit_once(self):
+        generation = self.parse()
+        with redirect_stdout(StringIO()):
+            pricing_stats = price_generation(generation)
+            is_valid = validate_generation(generation)
+
+        self.assertTrue(is_valid)
+        self.assertIs(generation.pricing_stats, pricing_stats)
+        self.assertGreater(pricing_stats["updatedPricesCount"], 0)
+        # До commit_generation этапы не пишут в data/
+        self.assertEqual(list(self.data_dir.iterdir()), [])
+
+        with redirect_stdout(StringIO()):
+            self.assertTrue(commit_generation(generation, data_dir=self.data_dir))
+        self.assertIn("products.json", generation.write_stats["outputBytes"])
+        self.assertTrue((self.data_dir / "product-ids.json").exists())
+        # Опубликованная генерация совпадает с плоскими файлами
+        generation_dir = current_generation_dir(self.data_dir)
+        self.assertNotEqual(generation_dir, self.data_dir)
+        for name in ("shipments.json", "products.json", "facets.json", "meta.json"):
+            self.assertEqual(
+                (generation_dir / name).read_text(encoding="utf-8"),
+                (self.data_dir / name).read_text(encoding="utf-8"),
+            )
+
+    def test_loaded_generation_keeps_schema_and_round_trips(self):
+        generation = self.parse()
+        with redirect_stdout(StringIO()):
+            price_generation(generation)
+            commit_generation(generation, data_dir=self.data_dir, shipments_schema=COMPACT_SCHEMA_VERSION)
+
+        loaded = load_generation(self.data_dir)
+
+        self.assertEqual(loaded.shipments_schema, COMPACT_SCHEMA_VERSION)
+        self.assertEqual(loaded.shipments, generation.shipments)
+        self.assertEqual(loaded.products_data, generation.products_data)
+        self.assertIsNone(loaded.registry)
+        with redirect_stdout(StringIO()):
+            self.assertTrue(validate_generation(loaded))
+
+    def test_failure_after_publish_keeps_commit_successful(self):
+        generation = self.parse()
+        with redirect_stdout(StringIO()) as output, mock.patch(
+            "pipeline_api.archive_generation",
+            side_effect=OSError("диск заполнен"),
+        ):
+            self.assertTrue(commit_generation(generation, data_dir=self.data_dir, snapshot_dir=self.root / "snapshots"))
+
+        self.assertIn("Генерация опубликована, но", output.getvalue())
+        self.assertEqual(load_generation(self.data_dir).products_data, generation.products_data)
+
+    def test_bundles_belong_to_generation_and_reuse_unchanged_files(self):
+        generation = self.parse()
+        with redirect_stdout(StringIO()):
+            commit_generation(generation, data_dir=self.data_dir)
+        first_bundles = current_generation_dir(self.data_dir) / "product-bundles"
+
+        changed = generation.products_data["products"][0]
+        changed["price"] += 1
+        with redirect_stdout(StringIO()):
+            commit_generation(generation, data_dir=self.data_dir)
+        second_bundles = current_generation_dir(self.data_dir) / "product-bundles"
+
+        self.assertNotEqual(second_bundles, first_bundles)
+        self.assertEqual(generation.write_stats["bundles"]["writtenCount"], 1)
+        manifest = load_json_file(second_bundles / "index.json")["products"]
+        for product_id, filename in manifest.items():
+            if product_id == changed["id"]:
+                self.assertFalse((first_bundles / filename).exists())
+            else:
+                # Неизменившийся бандл — тот же файл, что и в прошлой генерации
+                self.assertTrue((second_bundles / filename).samefile(first_bundles / filename))
+        self.assertEqual(load_json_file(self.data_dir / "product-bundles" / "index.json")["products"], manifest)
+
+    def test_failure_before_publish_leaves_current_and_flat_files(self):
+        generation = self.parse()
+        with redirect_stdout(StringIO()):
+            commit_generation(generation, data_dir=self.data_dir)
+        published_dir = current_generation_dir(self.data_dir)
+        flat_products = (self.data_dir / "products.json").read_text(encoding="utf-8")
+        bundles_manifest = (self.data_dir / "product-bundles" / "index.json").read_text(encoding="utf-8")
+
+        generation.products_data["products"][0]["price"] += 1
+        with redirect_stdout(StringIO()), mock.patch(
+            "pipeline_api.publish_generation",
+            side_effect=OSError("диск заполнен"),
+        ):
+            self.assertFalse(commit_generation(generation, data_dir=self.data_dir))
+
+        self.assertEqual(current_generation_dir(self.data_dir), published_dir)
+        self.assertEqual(list((self.data_dir / "generations").iterdir()), [published_dir])
+        self.assertEqual((self.data_dir / "products.json").read_text(encoding="utf-8"), flat_products)
+        self.assertEqual(
+            (self.data_dir / "product-bundles" / "index.json").read_text(encoding="utf-8"),
+            bundles_manifest,
+        )
+
+    def test_missing_generation_raises_os_error(self):
+        with self.assertRaises(OSError):
+            load_generation(self.root / "missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Тесты бандлов страницы товара."""
+
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from openpyxl import load_workbook
+from openpyxl.worksheet.cell_range import CellRange
+
+from benchmarks.workbook_generator import WorkbookSize, generate_workbook
+from excel_parser import ExcelParser
+from json_storage import load_json_file
+from product_bundles import build_product_bundles, write_product_bundles
+
+
+class ProductBundleTests(unittest.TestCase):
+    def build_bundles(self, price=100):
+        shipments = [
+            {
+                "id": "shipment-2026-2",
+                "year": 2026,
+                "status": "В работе 🧵",
+                "rawItems": [
+                    {"productId": "auto-001", "price": price, "sizes": {"xs": 1}},
+                ],
+            },
+            {
+                "id": "shipment-2025-1",
+                "year": 2025,
+                "status": "Получено, оплачено ✅",
+                "rawItems": [
+                    {"productId": "auto-002", "price": 50, "cost": 4000},
+                ],
+            },
+        ]
+        products_data = {
+            "products": [
+                {"id": "auto-001", "name": "Жакет из кожи — чёрный"},
+                {"id": "auto-002", "name": "Юбка из замши — коричневый"},
+            ]
+        }
+        return build_product_bundles(shipments, products_data)
+
+    def test_bundle_holds_product_and_its_shipment_lines(self):
+        bundle = self.build_bundles()["auto-001"]
+
+        self.assertEqual(bundle["product"]["name"], "Жакет из кожи — чёрный")
+        self.assertEqual(
+            bundle["shipmentLines"],
+            [
+                {
+                    "shipmentId": "shipment-2026-2",
+                    "year": 2026,
+                    "status": "В работе 🧵",
+                    "sizes": {"xs": 1},
+                    "price": 100,
+                }
+            ],
+        )
+
+    def test_only_changed_bundles_are_rewritten(self):
+        with TemporaryDirectory() as temp_dir:
+            bundles_dir = Path(temp_dir)
+
+            first = write_product_bundles(bundles_dir, self.build_bundles())
+            second = write_product_bundles(bundles_dir, self.build_bundles(price=120))
+            manifest = load_json_file(bundles_dir / "index.json")["products"]
+            files = sorted(path.name for path in bundles_dir.glob("auto-*.json"))
+
+        self.assertEqual(first, {"writtenCount": 2, "unchangedCount": 0, "removedCount": 0})
+        self.assertEqual(second, {"writtenCount": 1, "unchangedCount": 1, "removedCount": 1})
+        self.assertEqual(sorted(manifest.values()), files)
+
+    def test_row_inserted_above_products_does_not_rewrite_bundles(self):
+        with TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            excel_file = root / "table.xlsx"
+            bundles_dir = root / "product-bundles"
+            generate_workbook(excel_file, WorkbookSize(years=1, shipments_per_year=3, items_per_shipment=4), seed=2)
+
+            def write_from_sheet():
+                products = []
+                with redirect_stdout(StringIO()):
+                    shipments = ExcelParser(str(excel_file), products).parse()
+                return products, write_product_bundles(
+                    bundles_dir,
+                    build_product_bundles(shipments, {"products": products}),
+                )
+
+            products_before, first = write_from_sheet()
+            # Пустая строка между разделителем года и первой поставкой сдвигает excelRows всех товаров
+            workbook = load_workbook(excel_file)
+            sheet = workbook.active
+            # openpyxl не сдвигает объединённые ячейки при вставке: переобъединяем сами
+            merged_ranges = [CellRange(cell_range.coord) for cell_range in sheet.merged_cells.ranges]
+            for cell_range in merged_ranges:
+                sheet.unmerge_cells(cell_range.coord)
+            sheet.insert_rows(3)
+            for cell_range in merged_ranges:
+                cell_range.shift(row_shift=1)
+                sheet.merge_cells(cell_range.coord)
+            workbook.save(excel_file)
+            products_after, second = write_from_sheet()
+
+        self.assertNotEqual(
+            [product["excelRows"] for product in products_after],
+            [product["excelRows"] for product in products_before],
+        )
+        self.assertEqual(second, {"writtenCount": 0, "unchangedCount": first["writtenCount"], "removedCount": 0})
+        self.assertNotIn("excelRows", self.build_bundles()["auto-001"]["product"])
+
+
+if __name__ == "__main__":
+    unittest.main()
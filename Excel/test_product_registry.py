@@ -0,0 +1,148 @@
+"""Тесты постоянного реестра productId."""
+
+import threading
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from benchmarks.workbook_generator import WorkbookSize, generate_workbook
+from excel_parser import ExcelParser
+from generation_store import current_generation_dir
+from json_storage import load_json_file, write_json_atomic
+from pipeline_api import write_outputs
+from product_registry import (
+    REGISTRY_FILENAME,
+    load_product_registry,
+    merge_product_registry,
+    save_product_registry,
+)
+from utils import find_or_create_product_id
+
+
+def create_ids(names, registry):
+    products = []
+    with redirect_stdout(StringIO()):
+        return [find_or_create_product_id(name, products, registry=registry) for name in names]
+
+
+class ProductRegistryTests(unittest.TestCase):
+    def test_ids_survive_reordering_and_removed_ids_are_not_reused(self):
+        registry = {}
+        first_run = create_ids(["Юбка из кожи — чёрная", "Плащ из замши — бежевый"], registry)
+        self.assertEqual(first_run, ["auto-001", "auto-002"])
+
+        # Строку с юбкой удалили, плащ переехал выше новой модели
+        second_run = create_ids(["Плащ из замши — бежевый", "Шуба из меха — серая"], registry)
+
+        self.assertEqual(second_run, ["auto-002", "auto-003"])
+        self.assertEqual(create_ids(["Юбка из кожи  — чёрная"], registry), ["auto-001"])
+
+    def test_registry_is_seeded_from_catalog_and_saved_by_id(self):
+        with TemporaryDirectory() as temp_dir:
+            data_dir = Path(temp_dir)
+            write_json_atomic(
+                data_dir / "products.json",
+                {"products": [{"id": "auto-1000", "name": "Б"}, {"id": "auto-999", "name": "А"}]},
+            )
+
+            registry = load_product_registry(data_dir)
+            self.assertEqual(registry, {"Б": "auto-1000", "А": "auto-999"})
+
+            self.assertTrue(save_product_registry(registry, data_dir))
+            self.assertFalse(save_product_registry(registry, data_dir))
+            saved = load_json_file(data_dir / REGISTRY_FILENAME)["products"]
+            self.assertEqual(list(saved.values()), ["auto-999", "auto-1000"])
+            self.assertEqual(load_product_registry(data_dir), registry)
+
+    def test_parallel_parse_uses_registry_like_sequential(self):
+        size = WorkbookSize(years=2, shipments_per_year=12, items_per_shipment=5)
+        with TemporaryDirectory() as temp_dir:
+            excel_path = Path(temp_dir) / "registry.xlsx"
+            generate_workbook(excel_path, size, seed=5)
+
+            # Реестр из «прошлого» запуска с другим порядком id
+            seed_products = []
+            with redirect_stdout(StringIO()):
+                ExcelParser(str(excel_path), seed_products).parse()
+            registry = {product["name"]: f"auto-{900 - index}" for index, product in enumerate(seed_products)}
+
+            catalogs = {}
+            for workers in (1, 2):
+                products = []
+                with redirect_stdout(StringIO()):
+                    ExcelParser(str(excel_path), products, workers=workers, registry=dict(registry)).parse()
+                catalogs[workers] = products
+
+        self.assertEqual(catalogs[2], catalogs[1])
+        self.assertEqual({product["name"]: product["id"] for product in catalogs[1]}, registry)
+
+    def test_merge_keeps_disk_ids_and_reassigns_conflicts(self):
+        with TemporaryDirectory() as temp_dir:
+            data_dir = Path(temp_dir)
+            save_product_registry({"Юбка": "auto-001", "Плащ": "auto-002"}, data_dir)
+            # Этот запуск прочитал реестр до того, как другой выдал auto-002 плащу
+            registry = {"Юбка": "auto-001", "Шуба": "auto-002", "Жакет": "auto-005"}
+
+            id_map = merge_product_registry(registry, data_dir, [{"id": "auto-002"}, {"id": "auto-005"}])
+
+        self.assertEqual(id_map, {"auto-002": "auto-006"})
+        self.assertEqual(
+            registry,
+            {"Юбка": "auto-001", "Плащ": "auto-002", "Шуба": "auto-006", "Жакет": "auto-005"},
+        )
+
+    def test_concurrent_writers_do_not_lose_allocated_ids(self):
+        with TemporaryDirectory() as temp_dir:
+            data_dir = Path(temp_dir)
+            save_product_registry({"Юбка из кожи — чёрная": "auto-001"}, data_dir)
+            both_loaded = threading.Barrier(2)
+            results = {}
+
+            def run(name):
+                # Оба запуска читают один и тот же реестр и выдают новому товару auto-002
+                registry = load_product_registry(data_dir)
+                both_loaded.wait()
+                products = []
+                product_id = find_or_create_product_id(name, products, excel_row=2, registry=registry)
+                shipments = [
+                    {
+                        "id": "shipment-2025-1",
+                        "number": 1,
+                        "title": "Поставка 1",
+                        "status": "В пути",
+                        "rawItems": [{"overrideName": name, "productId": product_id, "sizes": {"M": 1}}],
+                        "year": 2025,
+                    }
+                ]
+                results[name] = (product_id, write_outputs(
+                    shipments,
+                    {"products": products},
+                    {"updatedAt": "2025-01-01T00:00:00+00:00", "source": "excel"},
+                    data_dir=data_dir,
+                    registry=registry,
+                ))
+
+            names = ["Плащ из замши — бежевый", "Шуба из меха — серая"]
+            with redirect_stdout(StringIO()):
+                threads = [threading.Thread(target=run, args=(name,)) for name in names]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+            saved = load_product_registry(data_dir)
+            published = load_json_file(current_generation_dir(data_dir) / "products.json")["products"]
+            published_shipments = load_json_file(current_generation_dir(data_dir) / "shipments.json")
+
+        self.assertEqual([results[name] for name in names], [("auto-002", True), ("auto-002", True)])
+        self.assertEqual(set(saved), {"Юбка из кожи — чёрная", *names})
+        self.assertEqual(sorted(saved.values()), ["auto-001", "auto-002", "auto-003"])
+        # Второй писатель опубликовал товар под id из сведённого реестра
+        self.assertEqual(saved[published[0]["name"]], published[0]["id"])
+        self.assertEqual(published_shipments[0]["rawItems"][0]["productId"], published[0]["id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""Тесты профайлера этапов (--profile)."""
+
+import argparse
+import tracemalloc
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from data_validator import validate_meta
+from profiling import NULL_PROFILER, StageProfiler, add_profile_arguments, profiler_from_args
+
+
+class StageProfilerTests(unittest.TestCase):
+    def test_records_stages_in_order(self):
+        profiler = StageProfiler("test")
+        profiler.start()
+        try:
+            with profiler.stage("allocate"):
+                payload = [0] * 200_000
+            with profiler.stage("noop"):
+                pass
+        finally:
+            profiler.stop()
+
+        summary = profiler.summary()
+        self.assertEqual(summary["command"], "test")
+        self.assertEqual([stage["name"] for stage in summary["stages"]], ["allocate", "noop"])
+        allocate, noop = summary["stages"]
+        self.assertGreater(allocate["peakBytes"], len(payload) * 4)
+        self.assertLess(noop["peakBytes"], allocate["peakBytes"])
+        self.assertGreaterEqual(summary["peakBytes"], allocate["peakBytes"])
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_summary_passes_meta_validation(self):
+        profiler = StageProfiler("test")
+        profiler.start()
+        with profiler.stage("noop"):
+            pass
+        profiler.stop()
+
+        meta = {"updatedAt": "2025-01-01T00:00:00+00:00", "source": "excel", "profile": profiler.summary()}
+        self.assertEqual(validate_meta(meta), [])
+        self.assertTrue(validate_meta({**meta, "profile": {"stages": "read"}}))
+
+    def test_disabled_profiler_records_nothing(self):
+        NULL_PROFILER.start()
+        with NULL_PROFILER.stage("noop"):
+            pass
+        NULL_PROFILER.stop()
+
+        self.assertEqual(NULL_PROFILER.stages, [])
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_profile_dump_writes_cprofile_file(self):
+        arg_parser = argparse.ArgumentParser()
+        add_profile_arguments(arg_parser)
+        with TemporaryDirectory() as temp_dir:
+            dump_file = Path(temp_dir) / "run.prof"
+            profiler = profiler_from_args("test", arg_parser.parse_args(["--profile-dump", str(dump_file)]))
+            self.assertTrue(profiler.enabled)
+
+            profiler.start()
+            with profiler.stage("noop"):
+                sum(range(1000))
+            profiler.stop()
+
+            self.assertTrue(dump_file.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
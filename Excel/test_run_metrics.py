@@ -0,0 +1,70 @@
+"""Тесты журнала запусков run_metrics."""
+
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from run_metrics import append_run_record, build_run_record, find_regressions, load_history
+
+
+def make_record(parse_seconds=1.0, items_count=100, success=True):
+    return build_run_record(
+        "parse_excel",
+        success,
+        parse_seconds + 0.5,
+        {"parse": parse_seconds, "write": 0.5},
+        parse_stats={"rowsScanned": 130, "shipmentsCount": 10, "itemsCount": items_count, "productsCreatedCount": 40},
+        pricing_stats={"updatedPricesCount": 40, "updatedCostsCount": 38},
+        write_stats={
+            "outputBytes": {"shipments.json": 2048},
+            "unchangedOutputs": ["facets.json"],
+            "bundles": {"writtenCount": 1, "unchangedCount": 39, "removedCount": 0},
+        },
+    )
+
+
+class RunRecordTests(unittest.TestCase):
+    def test_record_collects_stage_stats(self):
+        record = make_record()
+
+        self.assertEqual(record["rowsScanned"], 130)
+        self.assertEqual(record["updatedCostsCount"], 38)
+        self.assertEqual(record["outputBytes"], {"shipments.json": 2048})
+        self.assertEqual(record["cacheHits"], {"unchangedOutputs": 1, "unchangedBundles": 39})
+        # Конвертация изображений в parse_excel не запускалась
+        self.assertIsNone(record["imagesConvertedCount"])
+
+    def test_history_keeps_last_runs_and_skips_broken_lines(self):
+        with TemporaryDirectory() as temp_dir:
+            history_file = Path(temp_dir) / "run-history.jsonl"
+            history_file.write_text('{"command": "parse_excel"\n', encoding="utf-8")
+
+            for items_count in range(1, 6):
+                append_run_record(make_record(items_count=items_count), history_file, limit=3)
+
+            history = load_history(history_file)
+            self.assertEqual([record["itemsCount"] for record in history], [3, 4, 5])
+            for line in history_file.read_text(encoding="utf-8").splitlines():
+                json.loads(line)
+
+
+class RegressionTests(unittest.TestCase):
+    def test_slow_stage_and_volume_drop_are_reported(self):
+        history = [make_record() for _ in range(5)]
+
+        regressions = find_regressions(make_record(parse_seconds=2.0, items_count=50), history)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertIn("parse", regressions[0])
+        self.assertIn("itemsCount", regressions[1])
+
+    def test_similar_run_and_failed_history_are_not_regressions(self):
+        history = [make_record(parse_seconds=0.1, success=False)] + [make_record() for _ in range(3)]
+
+        self.assertEqual(find_regressions(make_record(parse_seconds=1.1), history), [])
+        self.assertEqual(find_regressions(make_record(), []), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Тесты компактной схемы shipments.json."""
+
+import unittest
+
+from shipment_encoding import decode_shipments, encode_shipments, expand_shipments_payload
+
+
+class ShipmentEncodingTests(unittest.TestCase):
+    products_data = {
+        "products": [
+            {"id": "auto-001", "name": "Жакет из кожи — чёрный"},
+        ]
+    }
+
+    shipments = [
+        {
+            "id": "shipment-2026-1",
+            "number": 1,
+            "title": "Поставка №1",
+            "status": "В работе 🧵",
+            "rawItems": [
+                {
+                    "overrideName": "Жакет из кожи — чёрный (XS-2, S-1)",
+                    "productId": "auto-001",
+                    "sizes": {"xs": 2, "s": 1},
+                    "status": "В производстве 🛠️",
+                },
+                {
+                    "overrideName": "Жакет из кожи — чёрный   (образец XS-1)",
+                    "productId": "auto-001",
+                    "sizes": {"xs": 1},
+                    "status": "В производстве 🛠️",
+                    "sample": True,
+                },
+                {
+                    "overrideName": "Жакет  из кожи — чёрный (образец)",
+                    "productId": "auto-001",
+                    "sample": True,
+                },
+            ],
+        }
+    ]
+
+    def test_canonical_suffix_and_statuses_are_not_stored(self):
+        encoded = encode_shipments(self.shipments, self.products_data)
+        items = encoded["shipments"][0]["rawItems"]
+
+        self.assertEqual(encoded["strings"], ["В работе 🧵", "В производстве 🛠️"])
+        self.assertEqual(encoded["shipments"][0]["status"], 0)
+        self.assertNotIn("overrideName", items[0])
+        self.assertNotIn("nameSuffix", items[0])
+        self.assertEqual(items[0]["status"], 1)
+        self.assertEqual(items[1]["nameSuffix"], "   (образец XS-1)")
+        self.assertEqual(items[2]["overrideName"], "Жакет  из кожи — чёрный (образец)")
+
+    def test_round_trip_restores_original_shipments(self):
+        encoded = encode_shipments(self.shipments, self.products_data)
+
+        self.assertEqual(decode_shipments(encoded, self.products_data), self.shipments)
+        self.assertEqual(expand_shipments_payload(encoded, self.products_data), self.shipments)
+        self.assertIs(expand_shipments_payload(self.shipments, self.products_data), self.shipments)
+
+
+if __name__ == "__main__":
+    unittest.main()
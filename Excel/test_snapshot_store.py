@@ -0,0 +1,72 @@
+"""Тесты архива генераций с дедупликацией."""
+
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from snapshot_store import archive_generation, list_snapshots, load_snapshot, resolve_snapshot_id, save_snapshot
+
+
+def make_generation(price):
+    shipments = [
+        {
+            "id": f"shipment-2025-{number}",
+            "number": number,
+            "title": f"Поставка {number}",
+            "status": "received",
+            "rawItems": [{"overrideName": "Плащ", "productId": "auto-001", "price": price if number == 2 else 100}],
+        }
+        for number in (1, 2)
+    ]
+    products_data = {"products": [{"id": "auto-001", "name": "Плащ", "price": price}]}
+    return shipments, products_data, {"updatedAt": f"2025-03-0{price % 9}T00:00:00+00:00", "source": "excel"}
+
+
+class SnapshotStoreTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.snapshot_dir = Path(temp_dir.name)
+
+    def test_unchanged_records_are_stored_once(self):
+        first = save_snapshot(*make_generation(100), snapshot_dir=self.snapshot_dir)
+        second = save_snapshot(*make_generation(120), snapshot_dir=self.snapshot_dir)
+
+        # shipment-2025-1 и шапка каталога не изменились, остальные куски новые
+        self.assertEqual(first["stats"]["newChunkCount"], 5)
+        self.assertEqual(second["stats"]["newChunkCount"], 3)
+        self.assertEqual(first["shipments"][0], second["shipments"][0])
+        self.assertEqual(len(list((self.snapshot_dir / "objects").rglob("*.json.gz"))), 8)
+
+    def test_generation_with_same_data_does_not_create_manifest(self):
+        shipments, products_data, _ = make_generation(100)
+        save_snapshot(*make_generation(100), snapshot_dir=self.snapshot_dir)
+
+        self.assertIsNone(
+            save_snapshot(shipments, products_data, {"updatedAt": "later"}, snapshot_dir=self.snapshot_dir)
+        )
+        with redirect_stdout(StringIO()):
+            self.assertIsNone(archive_generation(*make_generation(100), snapshot_dir=self.snapshot_dir))
+        self.assertEqual(len(list_snapshots(self.snapshot_dir)), 1)
+
+    def test_load_restores_generation_and_resolves_refs(self):
+        first = save_snapshot(*make_generation(100), snapshot_dir=self.snapshot_dir)
+        second = save_snapshot(*make_generation(120), snapshot_dir=self.snapshot_dir)
+
+        shipments, products_data, meta = load_snapshot(first["id"], self.snapshot_dir)
+        self.assertEqual((shipments, products_data, meta), make_generation(100))
+        self.assertEqual(list(shipments[1]["rawItems"][0]), ["overrideName", "productId", "price"])
+
+        self.assertEqual(resolve_snapshot_id("latest", self.snapshot_dir), second["id"])
+        self.assertEqual(resolve_snapshot_id(second["id"], self.snapshot_dir), second["id"])
+        self.assertEqual([item["id"] for item in list_snapshots(self.snapshot_dir)], [first["id"], second["id"]])
+        with self.assertRaises(KeyError):
+            resolve_snapshot_id(first["id"][:8], self.snapshot_dir)
+        with self.assertRaises(KeyError):
+            resolve_snapshot_id("19990101", self.snapshot_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Тесты SQLite-выгрузки."""
+
+import sqlite3
+import unittest
+from contextlib import closing
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from sqlite_export import SQLITE_FILENAME, export_sqlite
+
+
+SHIPMENTS = [
+    {
+        "id": "shipment-2025-2",
+        "number": 2,
+        "title": "Поставка №2",
+        "status": "В работе 🧵",
+        "rawItems": [
+            {"overrideName": "Юбка (XS-2)", "productId": "auto-001", "price": 320, "sizes": {"xs": 2}},
+            {
+                "overrideName": "Юбка (S-1)",
+                "productId": "auto-001",
+                "cost": 9000,
+                "sizes": {"s": 1},
+                "status": "В производстве 🛠️",
+            },
+        ],
+        "year": 2025,
+    },
+    {
+        "id": "shipment-2024-1",
+        "number": 1,
+        "title": "Поставка №1",
+        "status": "Получено ✅",
+        "rawItems": [{"overrideName": "Юбка (M-1)", "productId": "auto-001", "price": 300, "sizes": {"m": 1}}],
+        "year": 2024,
+    },
+]
+PRODUCTS_DATA = {
+    "products": [
+        {
+            "id": "auto-001",
+            "name": "Юбка из кожи питона — чёрная",
+            "category": "Экзотика",
+            "sizes": ["xs", "s", "m"],
+            "materials": {"outer": "100% Python"},
+            "inStock": True,
+            "tags": [],
+            "price": 320,
+        }
+    ]
+}
+
+
+class SqliteExportTests(unittest.TestCase):
+    def test_export_normalizes_tables_and_replaces_database(self):
+        with TemporaryDirectory() as temp_dir:
+            exports_dir = Path(temp_dir)
+            (exports_dir / SQLITE_FILENAME).write_bytes(b"old")
+
+            counts = export_sqlite(SHIPMENTS, PRODUCTS_DATA, {"updatedAt": "2025-03-01"}, exports_dir)
+
+            self.assertEqual(counts["raw_items"], 3)
+            self.assertEqual(counts["item_sizes"], 3)
+            self.assertEqual(counts["product_sizes"], 3)
+            self.assertEqual([path.name for path in exports_dir.iterdir()], [SQLITE_FILENAME])
+            with closing(sqlite3.connect(exports_dir / SQLITE_FILENAME)) as connection:
+                statuses = connection.execute(
+                    "SELECT effective_status FROM raw_items WHERE shipment_id = ? ORDER BY position",
+                    ("shipment-2025-2",),
+                ).fetchall()
+                history = connection.execute(
+                    "SELECT shipment_id, price, cost FROM price_history WHERE product_id = ? ORDER BY year, number",
+                    ("auto-001",),
+                ).fetchall()
+                plan = connection.execute(
+                    "EXPLAIN QUERY PLAN SELECT id FROM raw_items WHERE product_id = 'auto-001'"
+                ).fetchall()
+
+            self.assertEqual(statuses, [("В работе 🧵",), ("В производстве 🛠️",)])
+            # price и cost второй поставки взяты из разных позиций, как в apply_latest_prices
+            self.assertEqual(history, [("shipment-2024-1", 300, None), ("shipment-2025-2", 320, 9000)])
+            self.assertIn("raw_items_product", str(plan))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Тесты фоновой синхронизации с локальной заменой Google Sheets."""
+
+import threading
+import unittest
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from json_storage import load_json_file
+from sync_daemon import SYNC_FAILED, SYNC_UNCHANGED, SYNC_UPDATED, SheetSyncDaemon
+from workbook_readers import READER_CSV
+
+HEADER = ",".join(f"column-{column}" for column in range(1, 17))
+
+
+def shipments_csv(price: int) -> bytes:
+    return (
+        HEADER
+        + "\n2025,,,,,,,,,,,,,,,\n"
+        + f'1,,Жакет из кожи — тестовый (XS-1),,,В работе,1,{price},,"95,5",,,,42000,,01.10.2025\n'
+    ).encode("utf-8")
+
+
+class SheetStandIn:
+    """Локальный HTTP-сервер вместо экспорта Google Sheets."""
+
+    def __init__(self):
+        self.body = b""
+        self.status_code = 200
+        self.requests = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.requests += 1
+                self.send_response(stand_in.status_code)
+                self.send_header("Content-Type", "text/csv")
+                self.end_headers()
+                self.wfile.write(stand_in.body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/export?format=csv"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SheetSyncDaemonTests(unittest.TestCase):
+    def setUp(self):
+        self.stand_in = SheetStandIn()
+        self.addCleanup(self.stand_in.close)
+        temp_dir = TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name)
+        self.data_dir = self.root / "data"
+        self.status_file = self.root / ".cache" / "sync-status.json"
+        (self.root / "jpg").mkdir()
+
+    def make_daemon(self):
+        return SheetSyncDaemon(
+            reader=READER_CSV,
+            url=self.stand_in.url,
+            source_file=self.root / "Поставки.csv",
+            jpg_dir=self.root / "jpg",
+            data_dir=self.data_dir,
+            status_file=self.status_file,
+        )
+
+    def check(self, daemon):
+        with redirect_stdout(StringIO()):
+            return daemon.check_once()
+
+    def test_rebuilds_only_when_sheet_content_changes(self):
+        daemon = self.make_daemon()
+        self.stand_in.body = shipments_csv(price=100)
+
+        self.assertEqual(self.check(daemon), SYNC_UPDATED)
+        products_mtime = (self.data_dir / "products.json").stat().st_mtime_ns
+        first_change = load_json_file(self.status_file)["lastChangeAt"]
+
+        # Перезапуск демона: хеш берётся из файла статуса, парсинга нет
+        restarted = self.make_daemon()
+        self.assertEqual(self.check(restarted), SYNC_UNCHANGED)
+        self.assertEqual((self.data_dir / "products.json").stat().st_mtime_ns, products_mtime)
+        self.assertEqual(load_json_file(self.status_file)["lastChangeAt"], first_change)
+
+        self.stand_in.body = shipments_csv(price=120)
+        self.assertEqual(self.check(restarted), SYNC_UPDATED)
+        products = load_json_file(self.data_dir / "products.json")["products"]
+        self.assertEqual(products[0]["price"], 120)
+
+    def test_fetch_failure_keeps_last_good_data(self):
+        daemon = self.make_daemon()
+        self.stand_in.body = shipments_csv(price=100)
+        self.check(daemon)
+        shipments_before = (self.data_dir / "shipments.json").read_bytes()
+
+        self.stand_in.status_code = 500
+        self.assertEqual(self.check(daemon), SYNC_FAILED)
+
+        status = load_json_file(self.status_file)
+        self.assertIn("HTTP Error 500", status["lastError"]["message"])
+        self.assertEqual((self.data_dir / "shipments.json").read_bytes(), shipments_before)
+        self.assertEqual((self.root / "Поставки.csv").read_bytes(), shipments_csv(price=100))
+
+    def test_broken_sheet_is_not_written_and_not_reparsed(self):
+        daemon = self.make_daemon()
+        self.stand_in.body = shipments_csv(price=100)
+        self.check(daemon)
+        shipments_before = (self.data_dir / "shipments.json").read_bytes()
+
+        # Маркер "(на уточнении)" без количества — ошибка данных в парсере
+        self.stand_in.body = (
+            HEADER + "\n1,,Жакет из кожи — тестовый (на уточнении),,,,,100,,,,,,,,\n"
+        ).encode("utf-8")
+        self.assertEqual(self.check(daemon), SYNC_FAILED)
+        self.assertEqual(self.check(daemon), SYNC_UNCHANGED)
+
+        self.assertEqual((self.data_dir / "shipments.json").read_bytes(), shipments_before)
+        self.assertIsNotNone(load_json_file(self.status_file)["lastError"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Тесты режима наблюдения watch_excel.py."""
+
+import queue
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from benchmarks.workbook_generator import WorkbookSize, generate_workbook
+from product_registry import load_product_registry, save_product_registry
+from watch_excel import (
+    CHANGE_PHOTOS,
+    CHANGE_WORKBOOK,
+    WarmDataBuilder,
+    classify_change,
+    collect_debounced_changes,
+    diff_snapshots,
+)
+
+
+class WatchExcelTests(unittest.TestCase):
+    excel_file = Path("/data/Excel/table.xlsx")
+    jpg_dir = Path("/data/public/images/products/jpg")
+
+    def classify(self, path):
+        return classify_change(path, self.excel_file, self.jpg_dir)
+
+    def test_only_workbook_and_catalog_photos_are_tracked(self):
+        self.assertEqual(self.classify(self.excel_file), CHANGE_WORKBOOK)
+        self.assertEqual(self.classify(self.jpg_dir / "Жакет.JPG"), CHANGE_PHOTOS)
+        self.assertIsNone(self.classify(self.excel_file.parent / "~$table.xlsx"))
+        self.assertIsNone(self.classify(self.jpg_dir / "Жакет.webp"))
+
+    def test_snapshot_diff_reports_changed_added_and_removed_files(self):
+        previous = {
+            self.excel_file: (1, 100),
+            self.jpg_dir / "a.jpg": (1, 10),
+        }
+        current = {
+            self.excel_file: (1, 100),
+            self.jpg_dir / "b.jpg": (2, 10),
+        }
+
+        self.assertEqual(diff_snapshots(previous, current, self.classify), {CHANGE_PHOTOS})
+        self.assertEqual(diff_snapshots(previous, previous, self.classify), set())
+
+    def test_burst_of_events_becomes_one_change_set(self):
+        events = queue.Queue()
+        for kind in (CHANGE_WORKBOOK, CHANGE_WORKBOOK, CHANGE_PHOTOS):
+            events.put(kind)
+
+        self.assertEqual(
+            collect_debounced_changes(events, debounce_seconds=0.05),
+            {CHANGE_WORKBOOK, CHANGE_PHOTOS},
+        )
+        self.assertTrue(events.empty())
+
+    def test_rebuild_allocates_against_registry_on_disk(self):
+        size = WorkbookSize(years=1, shipments_per_year=2, items_per_shipment=3)
+        with TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            excel_file = root / "table.xlsx"
+            data_dir = root / "data"
+            jpg_dir = root / "jpg"
+            jpg_dir.mkdir()
+            generate_workbook(excel_file, size, seed=3)
+            builder = WarmDataBuilder(excel_file, jpg_dir, data_dir)
+            with redirect_stdout(StringIO()):
+                self.assertTrue(builder.rebuild({CHANGE_WORKBOOK}))
+
+            # Пока наблюдатель работает, ручной запуск выдаёт id новому товару
+            registry = load_product_registry(data_dir)
+            external_id = f"auto-{len(registry) + 1:03d}"
+            registry["Плащ из замши — бежевый"] = external_id
+            save_product_registry(registry, data_dir)
+
+            generate_workbook(excel_file, size, seed=4)
+            with redirect_stdout(StringIO()) as output:
+                self.assertTrue(builder.rebuild({CHANGE_WORKBOOK}))
+            saved = load_product_registry(data_dir)
+
+        self.assertEqual(saved["Плащ из замши — бежевый"], external_id)
+        self.assertEqual(len(set(saved.values())), len(saved))
+        self.assertNotIn(external_id, {product["id"] for product in builder.products_data["products"]})
+        # id выданы уже по свежему реестру, переназначать при записи нечего
+        self.assertNotIn("обновил другой запуск", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""Тесты общих частей бэкендов чтения Excel."""
+
+import unittest
+from unittest import mock
+
+import workbook_readers
+from workbook_readers import (
+    READER_AUTO,
+    READER_PANDAS,
+    READER_STREAMING,
+    build_fill_down_map,
+    fill_down_merged_rows,
+    normalize_cell_value,
+    resolve_reader,
+)
+
+
+class WorkbookReadersTests(unittest.TestCase):
+    def test_fill_down_carries_value_only_inside_merged_range(self):
+        rows = [("h",), (95.5,), (None,), (None,), (None,)]
+        fill_down = build_fill_down_map([(1, 2, 1, 4)], columns=(0,))
+
+        self.assertEqual(
+            list(fill_down_merged_rows(rows, fill_down)),
+            [("h",), (95.5,), (95.5,), (95.5,), (None,)],
+        )
+
+    def test_values_are_normalized_like_pandas(self):
+        self.assertIsNone(normalize_cell_value("NA"))
+        self.assertIsNone(normalize_cell_value(""))
+        self.assertEqual(normalize_cell_value(5.0), 5)
+        self.assertIsInstance(normalize_cell_value(5.0), int)
+        self.assertEqual(normalize_cell_value(95.5), 95.5)
+
+    def test_auto_picks_first_installed_reader(self):
+        installed = {READER_STREAMING, READER_PANDAS}
+        with mock.patch.object(
+            workbook_readers,
+            "is_reader_available",
+            side_effect=lambda reader: reader in installed,
+        ):
+            self.assertEqual(resolve_reader(READER_AUTO), READER_STREAMING)
+            with self.assertRaises(ValueError):
+                resolve_reader("calamine")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,12 +3,14 @@
 Не зависит от исходного порядка shipments.json: перед обновлением сам приводит поставки к порядку от новых к старым.
 """
 
+import argparse
 import sys
 from pathlib import Path
+from typing import Optional
 
-from catalog_pricing import apply_latest_prices
-from data_validator import validate_generated_outputs
-from json_storage import load_json_file, write_json_atomic
+from pipeline_api import DATA_DIR, commit_generation, load_generation, price_generation, validate_generation
+from profiling import NULL_PROFILER, StageProfiler, add_profile_arguments, profiler_from_args
+from snapshot_store import SNAPSHOT_DIR
 
 # Настраиваем кодировку вывода для Windows (чтобы эмодзи работали)
 if sys.platform == 'win32':
@@ -21,66 +23,71 @@ if sys.platform == 'win32':
         pass
 
 
-def update_prices_from_shipments() -> bool:
-    """Обновляет цены и себестоимость в products.json на основе актуальных данных из shipments.json."""
-    script_dir = Path(__file__).parent
-    shipments_file = script_dir.parent / "data" / "shipments.json"
-    products_file = script_dir.parent / "data" / "products.json"
+def update_prices_from_shipments(
+    profiler: StageProfiler = NULL_PROFILER,
+    data_dir: Path = DATA_DIR,
+    snapshot_dir: Optional[Path] = SNAPSHOT_DIR,
+) -> bool:
+    """
+    Обновляет цены и себестоимость в products.json на основе актуальных данных из shipments.json.
 
-    if not shipments_file.exists():
-        print(f"❌ Файл shipments.json не найден: {shipments_file}")
-        return False
-
-    if not products_file.exists():
-        print(f"❌ Файл products.json не найден: {products_file}")
-        return False
-
-    print(f"📖 Загружаю поставки из {shipments_file}...")
+    Генерация читается из data_dir и записывается обратно тем же этапом write, что и после
+    парсинга (в той же схеме shipments.json): фасеты, бандлы и лента изменений не отстают
+    от каталога. При --profile сводка по этапам записывается в ключ profile файла meta.json.
+    """
+    print(f"📖 Загружаю поставки и каталог из {data_dir}...")
     try:
-        shipments = load_json_file(shipments_file)
-        print(f"✅ Загружено {len(shipments)} поставок")
-    except Exception as e:
-        print(f"❌ Ошибка при загрузке shipments.json: {e}")
+        generation = load_generation(data_dir, profiler=profiler)
+    except FileNotFoundError as e:
+        print(f"❌ Файл не найден: {e.filename}")
         return False
-
-    print(f"📖 Загружаю каталог товаров из {products_file}...")
-    try:
-        products_data = load_json_file(products_file)
-        products = products_data.get('products', [])
-        print(f"✅ Загружено {len(products)} товаров")
-    except Exception as e:
-        print(f"❌ Ошибка при загрузке products.json: {e}")
+    except (OSError, ValueError) as e:
+        print(f"❌ Ошибка при загрузке generated data: {e}")
         return False
+    print(
+        f"✅ Загружено {len(generation.shipments)} поставок и "
+        f"{len(generation.products_data.get('products', []))} товаров"
+    )
 
-    print(f"📊 Проставляю актуальные цены и себестоимость...")
-    stats = apply_latest_prices(products_data, shipments, log=print)
-
-    errors = validate_generated_outputs(shipments, products_data)
-    if errors:
-        print("❌ После обновления цен данные стали невалидны:")
-        for error in errors:
-            print(f"   - {error}")
+    stats = price_generation(generation, profiler=profiler)
+    if not validate_generation(generation, profiler=profiler):
+        print("❌ После обновления цен данные стали невалидны")
         return False
 
-    print(f"💾 Сохраняю обновлённый каталог в {products_file}...")
-    try:
-        write_json_atomic(products_file, products_data)
-        print(f"✅ Обновлено цен: {stats['updatedPricesCount']}")
-        print(f"✅ Обновлено себестоимостей: {stats['updatedCostsCount']}")
-        print(f"✅ Каталог успешно сохранён!")
-        return True
-    except Exception as e:
-        print(f"❌ Ошибка при сохранении products.json: {e}")
+    if not commit_generation(generation, data_dir=data_dir, profiler=profiler, snapshot_dir=snapshot_dir):
         return False
+    print(f"✅ Обновлено цен: {stats['updatedPricesCount']}")
+    print(f"✅ Обновлено себестоимостей: {stats['updatedCostsCount']}")
+    return True
 
 
 if __name__ == "__main__":
-    success = update_prices_from_shipments()
+    arg_parser = argparse.ArgumentParser(description="Обновление цен и себестоимости каталога")
+    arg_parser.add_argument(
+        "--auto",
+        action="store_true",
+        help="не ждать Enter после завершения (для автоматического запуска)",
+    )
+    arg_parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="не сохранять генерацию в архив снимков (см. snapshots.py)",
+    )
+    add_profile_arguments(arg_parser)
+    args = arg_parser.parse_args()
+
+    profiler = profiler_from_args("update_prices", args)
+    profiler.start()
+    try:
+        success = update_prices_from_shipments(
+            profiler=profiler,
+            snapshot_dir=None if args.no_snapshot else SNAPSHOT_DIR,
+        )
+    finally:
+        profiler.stop()
+    profiler.print_report()
     # Показываем сообщение только при интерактивном запуске (не при автоматическом вызове)
-    import sys
-    # Проверяем, запущен ли скрипт автоматически (через параметр --auto)
-    # При автоматическом запуске сообщение не показывается
-    if "--auto" not in sys.argv:
+    if not args.auto:
         try:
             print("\n" + "="*50)
             input("Нажмите Enter для перехода к следующему этапу...")
@@ -6,18 +6,37 @@
 import re
 from collections import defaultdict
 from datetime import datetime
+from itertools import chain
 from pathlib import Path
-from typing import Any, Optional, Dict, List
-import pandas as pd
+from typing import Any, Optional, Dict, Iterable, List, Sequence
+
+from category_rules import default_matcher
 
 # Порядок размеров для каталога (product.sizes)
 SIZE_ORDER = ["xs", "s", "m", "l", "xl", "onesize"]
 
+# Кандидаты материалов: productId → поле (outer, lining, comments) → значения в порядке строк
+MaterialCandidates = Dict[str, Dict[str, Dict[str, None]]]
+
 # Маркеры в последней скобке названия, означающие, что размеры пока не разбиты,
 # но позиция уже существует и участвует в заказе (количество берётся из колонки G).
 SIZES_UNKNOWN_MARKERS = ["на уточнении"]
 
 
+def is_missing_value(value: Any) -> bool:
+    """
+    Проверяет отсутствие значения ячейки без зависимости от pandas.
+
+    None, NaN и NaT считаются отсутствующими: NaN/NaT не равны сами себе.
+    """
+    if value is None:
+        return True
+    try:
+        return bool(value != value)
+    except (TypeError, ValueError):
+        return False
+
+
 def has_sizes_unknown_marker(name: str) -> bool:
     """
     Проверяет, содержит ли последняя скобка названия маркер "размеры не заданы".
@@ -130,35 +149,30 @@ def extract_product_name(full_name: str) -> str:
 
 def infer_category(name: str) -> str:
     """
-    Определяет категорию товара по названию (по корням слов).
-    Приоритет: Экзотика (питон) > Кожа > Мех > Замша.
+    Определяет категорию товара по названию (по корням слов из category_rules.json).
+    Приоритет задаётся в правилах: сейчас Экзотика (питон) > Кожа > Мех > Замша.
     Если категория не определяется, это считается ошибкой входных данных.
     """
     if not name or not name.strip():
         raise ValueError("Нельзя определить категорию для пустого названия товара")
-    s = name.lower().strip()
-    if "питон" in s:
-        return "Экзотика"
-    if "кож" in s:
-        return "Кожа"
-    if "мех" in s:
-        return "Мех"
-    if "замш" in s:
-        return "Замша"
-    raise ValueError(
-        "Не удалось определить категорию по названию "
-        f"{name!r}. Допустимые корни: питон / кож / мех / замш."
-    )
-
-
-def get_next_auto_id(products: List[Dict]) -> str:
+    matcher = default_matcher()
+    category = matcher.match(name.strip())
+    if category is None:
+        raise ValueError(
+            "Не удалось определить категорию по названию "
+            f"{name!r}. Допустимые корни: {' / '.join(matcher.roots)}."
+        )
+    return category
+
+
+def get_next_auto_id(products: List[Dict], reserved_ids: Iterable[str] = ()) -> str:
     """
     Возвращает следующий уникальный id вида auto-NNN для нового товара в каталоге.
-    Ищет среди product['id'] совпадения с шаблоном auto-(\\d+), берёт максимум, +1.
+    Ищет среди product['id'] и reserved_ids (id из реестра, в том числе товаров,
+    которых сейчас нет в таблице) совпадения с шаблоном auto-(\\d+), берёт максимум, +1.
     """
     auto_numbers = []
-    for p in products:
-        pid = p.get('id') or ''
+    for pid in chain((p.get('id') or '' for p in products), reserved_ids):
         m = re.match(r'^auto-(\d+)$', pid, re.IGNORECASE)
         if m:
             auto_numbers.append(int(m.group(1)))
@@ -166,14 +180,60 @@ def get_next_auto_id(products: List[Dict]) -> str:
     return f"auto-{next_num:03d}"
 
 
+def normalize_product_name(name: str) -> str:
+    """Ключ сравнения названий каталога: без лишних пробелов и переносов."""
+    return ' '.join(name.split())
+
+
+def new_catalog_product(product_id: str, clean_name: str, excel_row: Optional[int] = None) -> Dict:
+    """Карточка нового товара каталога, созданного по строке Excel."""
+    return {
+        "id": product_id,
+        "name": clean_name,
+        "category": infer_category(clean_name),
+        "excelRows": [excel_row] if excel_row is not None else [],
+        "sizes": [],
+        "materials": {},
+        "inStock": True,
+        "tags": [],
+    }
+
+
+def allocate_product_id(
+    clean_name: str,
+    products: List[Dict],
+    registry: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    Выдаёт id новому товару каталога.
+
+    Если название уже есть в реестре (см. product_registry), возвращается его прежний id,
+    иначе — следующий свободный auto-NNN, который сразу записывается в реестр.
+    Без реестра id идут по порядку первого появления в таблице.
+    """
+    if registry is None:
+        return get_next_auto_id(products)
+
+    key = normalize_product_name(clean_name)
+    product_id = registry.get(key)
+    if product_id and not any(product.get('id') == product_id for product in products):
+        return product_id
+
+    product_id = get_next_auto_id(products, registry.values())
+    registry[key] = product_id
+    return product_id
+
+
 def find_or_create_product_id(
     name: str,
     products: List[Dict],
     excel_row: Optional[int] = None,
+    registry: Optional[Dict[str, str]] = None,
 ) -> str:
     """
     Находит productId в каталоге по названию или создаёт новый товар и возвращает его id.
     Каталог (products) мутируется при создании нового товара.
+    Новому товару id выдаётся из реестра registry, если он передан (см. allocate_product_id).
     """
     clean_name = extract_product_name(name)
     if not clean_name:
@@ -182,59 +242,63 @@ def find_or_create_product_id(
             f"{name!r}. Проверьте формат наименования в Excel."
         )
 
-    normalized_clean = ' '.join(clean_name.split())
+    normalized_clean = normalize_product_name(clean_name)
     for product in products:
         product_name = product.get('name', '')
-        if ' '.join(product_name.split()) == normalized_clean:
+        if normalize_product_name(product_name) == normalized_clean:
             if excel_row is not None:
                 rows = product.setdefault("excelRows", [])
                 if excel_row not in rows:
                     rows.append(excel_row)
             return product.get('id', '')
 
-    new_id = get_next_auto_id(products)
-    new_product = {
-        "id": new_id,
-        "name": clean_name,
-        "category": infer_category(clean_name),
-        "excelRows": [excel_row] if excel_row is not None else [],
-        "sizes": [],
-        "materials": {},
-        "inStock": True,
-        "tags": [],
-    }
-    products.append(new_product)
+    new_id = allocate_product_id(clean_name, products, registry)
+    products.append(new_catalog_product(new_id, clean_name, excel_row))
     print(f"  + Добавлен в каталог: {clean_name}")
     return new_id
 
 
-def assign_product_photos(products: List[Dict], jpg_dir: Path) -> None:
+def index_catalog_photos(jpg_dir: Path) -> Dict[str, str]:
     """
-    Записывает photo только для товаров, у которых реально есть JPG/JPEG.
-    Точное имя файла берётся с диска, чтобы регистр расширения был корректным
-    и на case-sensitive окружениях Netlify.
+    Индекс каталожных JPG/JPEG: имя файла в casefold → точное имя на диске.
+
+    Точное имя нужно, чтобы регистр расширения был корректным и на case-sensitive
+    окружениях Netlify.
     """
     if not jpg_dir.exists():
         raise FileNotFoundError(f"Папка каталожных JPG не найдена: {jpg_dir}")
 
     supported_extensions = {".jpg", ".jpeg"}
-    files_by_name = {
+    return {
         path.name.casefold(): path.name
         for path in jpg_dir.iterdir()
         if path.is_file() and path.suffix.casefold() in supported_extensions
     }
 
-    for product in products:
-        name = str(product.get("name", "")).strip()
-        product.pop("photo", None)
-        if not name:
-            continue
 
-        for extension in (".jpg", ".jpeg"):
-            actual_name = files_by_name.get(f"{name}{extension}".casefold())
-            if actual_name:
-                product["photo"] = f"/images/products/jpg/{actual_name}"
-                break
+def set_product_photo(product: Dict, files_by_name: Dict[str, str]) -> None:
+    """Записывает photo, только если для названия товара есть JPG/JPEG (см. index_catalog_photos)."""
+    name = str(product.get("name", "")).strip()
+    product.pop("photo", None)
+    if not name:
+        return
+
+    for extension in (".jpg", ".jpeg"):
+        actual_name = files_by_name.get(f"{name}{extension}".casefold())
+        if actual_name:
+            product["photo"] = f"/images/products/jpg/{actual_name}"
+            return
+
+
+def assign_product_photos(products: List[Dict], jpg_dir: Path) -> None:
+    """
+    Записывает photo только для товаров, у которых реально есть JPG/JPEG.
+    Точное имя файла берётся с диска, чтобы регистр расширения был корректным
+    и на case-sensitive окружениях Netlify.
+    """
+    files_by_name = index_catalog_photos(jpg_dir)
+    for product in products:
+        set_product_photo(product, files_by_name)
 
 
 def parse_product_materials(raw_value: Any) -> Dict[str, str]:
@@ -245,7 +309,7 @@ def parse_product_materials(raw_value: Any) -> Dict[str, str]:
     - строка с "подклад" -> lining
     - всё остальное -> comments
     """
-    if pd.isna(raw_value) or raw_value is None:
+    if is_missing_value(raw_value):
         return {}
 
     text = str(raw_value).strip()
@@ -287,16 +351,38 @@ def parse_product_materials(raw_value: Any) -> Dict[str, str]:
     return materials
 
 
-def apply_product_materials(product_id: str, materials: Dict[str, str], products: List[Dict]) -> None:
+def collect_product_materials(
+    candidates: MaterialCandidates,
+    product_id: str,
+    materials: Dict[str, str],
+) -> None:
     """
-    Записывает materials в товар каталога, не затирая уже заполненные поля пустыми значениями.
-    Если один и тот же товар встречается в нескольких строках Excel, объединяем данные аккуратно.
+    Запоминает материалы строки Excel для товара, не трогая каталог.
+
+    Для каждого поля копится упорядоченное множество непустых значений (dict без значений):
+    повтор той же строки у популярного товара ничего не стоит. Объединение — один раз
+    в merge_product_materials после прохода по строкам.
     """
     if not product_id or not materials:
         return
 
+    product_candidates = candidates.setdefault(product_id, {})
+    for key, value in materials.items():
+        if value:
+            product_candidates.setdefault(key, {})[value] = None
+
+
+def merge_product_materials(products: List[Dict], candidates: MaterialCandidates) -> None:
+    """
+    Записывает накопленные материалы в товары каталога, не затирая заполненные поля.
+
+    Если один и тот же товар встречается в нескольких строках Excel, outer и lining берутся
+    из первой строки, где они есть, а comments склеиваются через перевод строки в порядке
+    строк, пропуская значения, уже входящие в собранный текст.
+    """
     for product in products:
-        if product.get("id") != product_id:
+        product_candidates = candidates.get(product.get("id"))
+        if not product_candidates:
             continue
 
         current = product.get("materials")
@@ -304,18 +390,26 @@ def apply_product_materials(product_id: str, materials: Dict[str, str], products
             current = {}
 
         merged = dict(current)
-        for key, value in materials.items():
-            if not value:
-                continue
-
-            existing = merged.get(key)
-            if not existing:
-                merged[key] = value
-            elif key == "comments" and value not in str(existing):
-                merged[key] = f"{existing}\n{value}"
+        for key, values in product_candidates.items():
+            for value in values:
+                existing = merged.get(key)
+                if not existing:
+                    merged[key] = value
+                elif key == "comments":
+                    if value not in str(existing):
+                        merged[key] = f"{existing}\n{value}"
+                else:
+                    # Поле уже заполнено: остальные значения его не меняют
+                    break
 
         product["materials"] = merged
-        return
+
+
+def size_sort_key(size: str) -> tuple:
+    """Ключ сортировки размеров каталога: порядок SIZE_ORDER, неизвестные — в конце."""
+    norm = size.lower() if size != "OneSize" else "onesize"
+    idx = SIZE_ORDER.index(norm) if norm in SIZE_ORDER else 99
+    return (idx, size)
 
 
 def aggregate_product_sizes(shipments: List[Dict], products: List[Dict]) -> None:
@@ -336,16 +430,11 @@ def aggregate_product_sizes(shipments: List[Dict], products: List[Dict]) -> None
             for size_key in item.get("sizes", {}).keys():
                 by_id[pid].add(size_key)
 
-    def _size_sort_key(s: str) -> tuple:
-        norm = s.lower() if s != "OneSize" else "onesize"
-        idx = SIZE_ORDER.index(norm) if norm in SIZE_ORDER else 99
-        return (idx, s)
-
     for product in products:
         pid = product.get("id")
         if not pid:
             continue
-        product["sizes"] = sorted(by_id.get(pid, set()), key=_size_sort_key)
+        product["sizes"] = sorted(by_id.get(pid, set()), key=size_sort_key)
 
 
 def parse_date(value: Any) -> Optional[str]:
@@ -353,8 +442,7 @@ def parse_date(value: Any) -> Optional[str]:
     Преобразует дату в формат "DD.MM.YYYY".
     
     Обрабатывает:
-    - datetime объекты pandas (pd.Timestamp)
-    - datetime объекты Python
+    - datetime объекты Python (в том числе pandas Timestamp — наследник datetime)
     - Строки в формате "DD.MM.YYYY"
     - Строки в формате "YYYY-MM-DD"
     
@@ -364,14 +452,10 @@ def parse_date(value: Any) -> Optional[str]:
     Returns:
         Строка в формате "DD.MM.YYYY" или None
     """
-    if pd.isna(value) or value is None:
+    if is_missing_value(value):
         return None
     
-    # Обработка pandas Timestamp
-    if isinstance(value, pd.Timestamp):
-        return value.strftime('%d.%m.%Y')
-    
-    # Обработка datetime объектов
+    # Обработка datetime объектов (включая pandas Timestamp)
     if isinstance(value, datetime):
         return value.strftime('%d.%m.%Y')
     
@@ -407,14 +491,10 @@ def is_date_value(value: Any) -> bool:
     Returns:
         True если значение является датой, иначе False
     """
-    if pd.isna(value) or value is None:
+    if is_missing_value(value):
         return False
     
-    # Проверка на pandas Timestamp
-    if isinstance(value, pd.Timestamp):
-        return True
-    
-    # Проверка на datetime
+    # Проверка на datetime (включая pandas Timestamp)
     if isinstance(value, datetime):
         return True
     
@@ -446,7 +526,7 @@ def normalize_status_text(status: Any) -> Optional[str]:
     Returns:
         Текст статуса (без начальных/конечных пробелов) или None, если пусто
     """
-    if status is None or pd.isna(status):
+    if is_missing_value(status):
         return None
     
     text = str(status).strip()
@@ -475,12 +555,12 @@ def clean_eta_text(text: str) -> str:
     return text.strip()
 
 
-def safe_get_cell(row: pd.Series, index: int, default=None) -> Any:
+def safe_get_cell(row: Sequence[Any], index: int, default=None) -> Any:
     """
     Безопасное извлечение значения ячейки из строки.
     
     Args:
-        row: Строка DataFrame
+        row: Строка листа — pandas Series или кортеж значений
         index: Индекс колонки
         default: Значение по умолчанию
         
@@ -490,10 +570,10 @@ def safe_get_cell(row: pd.Series, index: int, default=None) -> Any:
     if index >= len(row):
         return default
     
-    value = row.iloc[index]
+    value = row.iloc[index] if hasattr(row, "iloc") else row[index]
     
     # Обработка NaN
-    if pd.isna(value):
+    if is_missing_value(value):
         return default
     
     return value
@@ -509,10 +589,7 @@ def is_empty_value(value: Any) -> bool:
     Returns:
         True если значение пустое, иначе False
     """
-    if value is None:
-        return True
-    
-    if pd.isna(value):
+    if is_missing_value(value):
         return True
     
     if isinstance(value, str):
@@ -8,11 +8,13 @@ CLI smoke-check для generated data.
 - data/money.json
 """
 
+import argparse
 import sys
 from pathlib import Path
 
 from data_validator import validate_generated_outputs
-from json_storage import load_json_file
+from pipeline_api import DATA_DIR, load_generation
+from profiling import NULL_PROFILER, StageProfiler, add_profile_arguments, profiler_from_args
 
 if sys.platform == "win32":
     import io
@@ -24,20 +26,9 @@ if sys.platform == "win32":
         pass
 
 
-def validate_generated_data() -> bool:
-    script_dir = Path(__file__).parent
-    data_dir = script_dir.parent / "data"
-
-    shipments_file = data_dir / "shipments.json"
-    products_file = data_dir / "products.json"
-    meta_file = data_dir / "meta.json"
-    money_file = data_dir / "money.json"
-
+def validate_generated_data(profiler: StageProfiler = NULL_PROFILER, data_dir: Path = DATA_DIR) -> bool:
     try:
-        shipments = load_json_file(shipments_file)
-        products_data = load_json_file(products_file)
-        meta = load_json_file(meta_file)
-        money = load_json_file(money_file)
+        generation = load_generation(data_dir, with_money=True, profiler=profiler)
     except FileNotFoundError as error:
         print(f"❌ Не найден файл для проверки: {error.filename}")
         return False
@@ -45,7 +36,10 @@ def validate_generated_data() -> bool:
         print(f"❌ Не удалось загрузить generated data: {error}")
         return False
 
-    errors = validate_generated_outputs(shipments, products_data, meta, money)
+    shipments, products_data, meta = generation.shipments, generation.products_data, generation.meta
+    # Не validate_generation: у smoke-check свой формат вывода OK:/ERROR:
+    with profiler.stage("validation"):
+        errors = validate_generated_outputs(shipments, products_data, meta, generation.money)
     if errors:
         print("ERROR: Проверка generated data не пройдена:")
         for error in errors:
@@ -61,4 +55,15 @@ def validate_generated_data() -> bool:
 
 
 if __name__ == "__main__":
-    sys.exit(0 if validate_generated_data() else 1)
+    arg_parser = argparse.ArgumentParser(description="Проверка согласованности generated data")
+    add_profile_arguments(arg_parser)
+    args = arg_parser.parse_args()
+
+    profiler = profiler_from_args("validate_generated_data", args)
+    profiler.start()
+    try:
+        success = validate_generated_data(profiler=profiler)
+    finally:
+        profiler.stop()
+    profiler.print_report()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,335 @@
+"""
+Режим наблюдения: пересобирает data/ сразу после сохранения таблицы.
+
+Процесс держит импортированный парсер и последнюю удачную генерацию в памяти,
+следит за xlsx и папкой каталожных JPG и после серии сохранений (debounce)
+пересобирает только то, что затронуто:
+- изменился xlsx — полный парсинг, цены, валидация;
+- изменились только JPG — переназначаются photo у уже собранного каталога.
+
+Перед записью данные всегда проходят валидацию: сломанная правка в таблице
+не попадает в data/, а на диске остаётся последняя удачная генерация.
+Неизменившиеся файлы не перезаписываются.
+
+Изменения отслеживаются через watchdog (inotify на Linux), если пакет установлен,
+иначе — опросом mtime/размера файлов.
+"""
+
+import argparse
+import copy
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from pipeline_api import (
+    DATA_DIR,
+    EXCEL_FILE,
+    JPG_DIR,
+    build_meta,
+    parse_generation,
+    price_generation,
+    source_file_for_reader,
+    validate_outputs,
+    write_outputs,
+)
+from product_registry import load_product_registry
+from shipment_encoding import COMPACT_SCHEMA_VERSION
+from snapshot_store import SNAPSHOT_DIR
+from utils import assign_product_photos
+from workbook_readers import READER_CHOICES, READER_PANDAS
+
+if sys.platform == "win32":
+    import io
+
+    try:
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
+        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+    except AttributeError:
+        pass
+
+
+CHANGE_WORKBOOK = "workbook"
+CHANGE_PHOTOS = "photos"
+
+PHOTO_EXTENSIONS = {".jpg", ".jpeg"}
+
+# События открытия/закрытия без записи (их генерирует и сам парсер при чтении) игнорируются
+WRITE_EVENT_TYPES = {"created", "modified", "moved", "deleted", "closed"}
+
+Snapshot = Dict[Path, Tuple[int, int]]
+
+
+class WarmDataBuilder:
+    """Держит последнюю записанную генерацию в памяти и пересобирает её по изменениям."""
+
+    def __init__(
+        self,
+        excel_file: Path = EXCEL_FILE,
+        jpg_dir: Path = JPG_DIR,
+        data_dir: Path = DATA_DIR,
+        shipments_schema: int = 1,
+        reader: str = READER_PANDAS,
+        snapshot_dir: Optional[Path] = None,
+    ):
+        self.excel_file = excel_file
+        self.jpg_dir = jpg_dir
+        self.data_dir = data_dir
+        self.shipments_schema = shipments_schema
+        self.reader = reader
+        self.snapshot_dir = snapshot_dir
+        self.shipments: Optional[List[Dict[str, Any]]] = None
+        self.products_data: Optional[Dict[str, Any]] = None
+
+    def rebuild(self, changes: Set[str]) -> bool:
+        """
+        Пересобирает данные по набору изменений и записывает их после валидации.
+
+        При ошибке состояние в памяти и файлы в data/ остаются прежними.
+        Реестр productId перечитывается из data/ при каждом разборе таблицы: пока
+        наблюдатель работает, новые id могут выдать parse_excel.py, pipeline.py или sync_daemon.py.
+        """
+        registry: Optional[Dict[str, str]] = None
+        if CHANGE_WORKBOOK in changes or self.shipments is None:
+            registry = load_product_registry(self.data_dir)
+            generation = parse_generation(
+                self.excel_file,
+                self.reader,
+                self.jpg_dir,
+                self.data_dir,
+                registry=registry,
+            )
+            if generation is None:
+                return False
+            price_generation(generation)
+            shipments, products_data = generation.shipments, generation.products_data
+        else:
+            # Поменялись только фото: таблицу не перечитываем, работаем на копии каталога
+            shipments = self.shipments
+            products_data = copy.deepcopy(self.products_data)
+            assign_product_photos(products_data["products"], self.jpg_dir)
+
+        if shipments == self.shipments and products_data == self.products_data:
+            print("✅ Данные не изменились, data/ не перезаписывается")
+            return True
+
+        meta = build_meta()
+        if not validate_outputs(shipments, products_data, meta):
+            print("⚠️  В data/ остаётся последняя удачная генерация")
+            return False
+
+        if not write_outputs(
+            shipments,
+            products_data,
+            meta,
+            data_dir=self.data_dir,
+            shipments_schema=self.shipments_schema,
+            registry=registry,
+            snapshot_dir=self.snapshot_dir,
+        ):
+            return False
+
+        self.shipments = shipments
+        self.products_data = products_data
+        return True
+
+
+def classify_change(path: Path, excel_file: Path, jpg_dir: Path) -> Optional[str]:
+    """Определяет, к какому источнику относится изменённый файл."""
+    if path.name == excel_file.name and path.parent.resolve() == excel_file.parent.resolve():
+        return CHANGE_WORKBOOK
+    if path.suffix.casefold() in PHOTO_EXTENSIONS and path.parent.resolve() == jpg_dir.resolve():
+        return CHANGE_PHOTOS
+    return None
+
+
+def take_snapshot(excel_file: Path, jpg_dir: Path) -> Snapshot:
+    """Снимок mtime/размера отслеживаемых файлов для режима опроса."""
+    snapshot: Snapshot = {}
+    candidates = [excel_file]
+    if jpg_dir.exists():
+        candidates.extend(jpg_dir.iterdir())
+
+    for path in candidates:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if path.is_file():
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def diff_snapshots(
+    previous: Snapshot,
+    current: Snapshot,
+    classify: Callable[[Path], Optional[str]],
+) -> Set[str]:
+    """Возвращает виды изменений между двумя снимками."""
+    changed_paths = {
+        path
+        for path in previous.keys() | current.keys()
+        if previous.get(path) != current.get(path)
+    }
+    return {kind for kind in map(classify, changed_paths) if kind}
+
+
+class PollingWatcher(threading.Thread):
+    """Запасной наблюдатель: раз в interval секунд сравнивает снимки файлов."""
+
+    def __init__(self, excel_file: Path, jpg_dir: Path, events: "queue.Queue[str]", interval: float):
+        super().__init__(daemon=True)
+        self.excel_file = excel_file
+        self.jpg_dir = jpg_dir
+        self.events = events
+        self.interval = interval
+        self.stop_event = threading.Event()
+
+    def run(self) -> None:
+        previous = take_snapshot(self.excel_file, self.jpg_dir)
+        while not self.stop_event.wait(self.interval):
+            current = take_snapshot(self.excel_file, self.jpg_dir)
+            for kind in diff_snapshots(
+                previous,
+                current,
+                lambda path: classify_change(path, self.excel_file, self.jpg_dir),
+            ):
+                self.events.put(kind)
+            previous = current
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+
+def start_native_watcher(excel_file: Path, jpg_dir: Path, events: "queue.Queue[str]"):
+    """
+    Запускает наблюдатель watchdog (inotify / ReadDirectoryChangesW / FSEvents).
+
+    Returns:
+        Запущенный observer или None, если watchdog не установлен
+    """
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.is_directory or event.event_type not in WRITE_EVENT_TYPES:
+                return
+            # Excel сохраняет через временный файл и переименование — смотрим и на dest_path
+            for raw_path in (event.src_path, getattr(event, "dest_path", "")):
+                if not raw_path:
+                    continue
+                kind = classify_change(Path(raw_path), excel_file, jpg_dir)
+                if kind:
+                    events.put(kind)
+
+    observer = Observer()
+    handler = Handler()
+    observer.schedule(handler, str(excel_file.parent), recursive=False)
+    if jpg_dir.exists():
+        observer.schedule(handler, str(jpg_dir), recursive=False)
+    observer.start()
+    return observer
+
+
+def collect_debounced_changes(events: "queue.Queue[str]", debounce_seconds: float) -> Set[str]:
+    """
+    Ждёт первое изменение и собирает все последующие, пока не наступит пауза debounce_seconds.
+    Серия автосохранений превращается в одну пересборку.
+    """
+    changes = {events.get()}
+    while True:
+        try:
+            changes.add(events.get(timeout=debounce_seconds))
+        except queue.Empty:
+            return changes
+
+
+def watch(
+    debounce_seconds: float = 0.5,
+    poll_interval: float = 0.5,
+    force_polling: bool = False,
+    shipments_schema: int = 1,
+    reader: str = READER_PANDAS,
+    snapshot_dir: Optional[Path] = SNAPSHOT_DIR,
+) -> None:
+    """Запускает наблюдение до Ctrl+C."""
+    source_file = source_file_for_reader(reader)
+    builder = WarmDataBuilder(
+        excel_file=source_file,
+        shipments_schema=shipments_schema,
+        reader=reader,
+        snapshot_dir=snapshot_dir,
+    )
+    events: "queue.Queue[str]" = queue.Queue()
+
+    observer = None if force_polling else start_native_watcher(source_file, JPG_DIR, events)
+    poller = None
+    if observer is None:
+        poller = PollingWatcher(source_file, JPG_DIR, events, poll_interval)
+        poller.start()
+        print(f"👀 Наблюдение опросом каждые {poll_interval} s")
+    else:
+        print("👀 Наблюдение через события файловой системы")
+
+    print(f"   Таблица: {source_file}")
+    print(f"   Фото: {JPG_DIR}")
+    builder.rebuild({CHANGE_WORKBOOK})
+
+    try:
+        while True:
+            changes = collect_debounced_changes(events, debounce_seconds)
+            print("\n" + "=" * 50)
+            print(f"🔁 Изменения: {', '.join(sorted(changes))}")
+            started_at = time.perf_counter()
+            success = builder.rebuild(changes)
+            status = "✅ Данные обновлены" if success else "❌ Обновление не удалось"
+            print(f"{status} за {time.perf_counter() - started_at:.2f} s")
+    except KeyboardInterrupt:
+        print("\n👋 Наблюдение остановлено")
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
+        if poller is not None:
+            poller.stop()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Пересборка data/ при изменении таблицы или фото")
+    arg_parser.add_argument("--debounce", type=float, default=0.5, help="пауза тишины перед пересборкой, s")
+    arg_parser.add_argument("--interval", type=float, default=0.5, help="период опроса файлов, s")
+    arg_parser.add_argument("--poll", action="store_true", help="всегда использовать опрос вместо watchdog")
+    arg_parser.add_argument(
+        "--shipments-schema",
+        type=int,
+        choices=(1, COMPACT_SCHEMA_VERSION),
+        default=1,
+        help="версия схемы shipments.json",
+    )
+    arg_parser.add_argument(
+        "--reader",
+        choices=READER_CHOICES,
+        default=READER_PANDAS,
+        help="бэкенд чтения листа (auto — самый быстрый установленный)",
+    )
+    arg_parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="не сохранять генерации в архив снимков (см. snapshots.py)",
+    )
+    args = arg_parser.parse_args()
+
+    watch(
+        debounce_seconds=args.debounce,
+        poll_interval=args.interval,
+        force_polling=args.poll,
+        shipments_schema=args.shipments_schema,
+        reader=args.reader,
+        snapshot_dir=None if args.no_snapshot else SNAPSHOT_DIR,
+    )
@@ -0,0 +1,358 @@
+"""
+Бэкенды чтения листа "Поставки".
+
+Каждый бэкенд отдаёт лист одинаково: число колонок и итератор строк-кортежей
+начиная с первой строки листа, значения приведены к виду pandas.read_excel
+(NA-строки — None, целые float — int), а вертикально объединённые ячейки
+в указанных колонках развёрнуты на все строки диапазона. Поэтому правила
+разбора в ExcelParser не зависят от того, чем прочитан файл.
+
+Бэкенды:
+- pandas — pandas.read_excel (движок openpyxl), весь лист в DataFrame;
+- streaming — openpyxl в режиме read_only, построчно и без pandas;
+- calamine — python-calamine (Rust), доступен, только если пакет установлен;
+- csv — выгрузка одной вкладки в CSV (fetch_google_sheet.py --format csv).
+
+Объединённые диапазоны для xlsx-бэкендов берутся прямо из <mergeCells> в XML листа:
+read_only-лист openpyxl их не предоставляет, а полная загрузка книги ради них дорогая.
+В CSV объединений нет: их заменяет перенос значения внутри блока поставки в ExcelParser.
+"""
+
+import csv
+import importlib.util
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from datetime import date, datetime
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from openpyxl import load_workbook
+from openpyxl.utils.cell import range_boundaries
+
+from utils import is_empty_value
+
+
+READER_PANDAS = "pandas"
+READER_STREAMING = "streaming"
+READER_CALAMINE = "calamine"
+READER_CSV = "csv"
+READER_AUTO = "auto"
+
+# Бэкенды для xlsx; csv читает другой файл, поэтому в auto и сравнении не участвует
+READERS = (READER_PANDAS, READER_STREAMING, READER_CALAMINE)
+READER_CHOICES = (READER_AUTO,) + READERS + (READER_CSV,)
+
+# Порядок выбора для --reader auto: от быстрого к медленному (замеры compare_readers.py)
+AUTO_READER_ORDER = (READER_CALAMINE, READER_STREAMING, READER_PANDAS)
+
+# Модули, без которых бэкенд недоступен
+READER_REQUIREMENTS = {
+    READER_PANDAS: ("pandas", "openpyxl"),
+    READER_STREAMING: ("openpyxl",),
+    READER_CALAMINE: ("python_calamine",),
+    READER_CSV: (),
+}
+
+SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PACKAGE_RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+# Строки, которые pandas.read_excel по умолчанию превращает в NaN
+PANDAS_NA_STRINGS = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+
+# Число в CSV в том виде, как его показывает таблица: "95,5", "27 413", "$280", "1,234.50"
+CSV_NUMBER_PATTERN = re.compile(r"^[$€₽]?\s*(-?\d[\d\s\u00a0\u202f.,]*)\s*[$€₽]?$")
+CSV_DATE_PATTERN = re.compile(r"^(\d{1,2})\.(\d{1,2})\.(\d{4})$")
+
+# (min_col, min_row, max_col, max_row), 1-based, как в openpyxl
+CellRange = Tuple[int, int, int, int]
+Row = Tuple[Any, ...]
+SheetRows = Tuple[int, Iterator[Row]]
+SheetReader = Callable[[str, str, Sequence[int]], SheetRows]
+
+
+def _find_sheet_xml_path(archive: zipfile.ZipFile, sheet_name: str) -> str:
+    workbook_root = ET.fromstring(archive.read("xl/workbook.xml"))
+    relationship_id = None
+    for sheet in workbook_root.iter(f"{{{SPREADSHEET_NS}}}sheet"):
+        if sheet.get("name") == sheet_name:
+            relationship_id = sheet.get(f"{{{RELATIONSHIPS_NS}}}id")
+            break
+    if relationship_id is None:
+        raise KeyError(f"Worksheet {sheet_name} does not exist.")
+
+    relationships_root = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for relationship in relationships_root.iter(f"{{{PACKAGE_RELATIONSHIPS_NS}}}Relationship"):
+        if relationship.get("Id") == relationship_id:
+            target = relationship.get("Target", "")
+            if target.startswith("/"):
+                return target.lstrip("/")
+            return posixpath.normpath(posixpath.join("xl", target))
+
+    raise KeyError(f"Не найден XML листа {sheet_name!r} в книге")
+
+
+def read_merged_ranges(excel_file: str, sheet_name: str) -> List[CellRange]:
+    """
+    Читает объединённые диапазоны листа из <mergeCells> в XML.
+
+    Строки листа разбираются потоково и сразу освобождаются,
+    поэтому память не растёт вместе с размером листа.
+    """
+    ranges: List[CellRange] = []
+    with zipfile.ZipFile(excel_file) as archive:
+        sheet_path = _find_sheet_xml_path(archive, sheet_name)
+        with archive.open(sheet_path) as sheet_xml:
+            for _, element in ET.iterparse(sheet_xml, events=("end",)):
+                if element.tag == f"{{{SPREADSHEET_NS}}}mergeCell":
+                    reference = element.get("ref")
+                    if reference:
+                        ranges.append(range_boundaries(reference))
+                elif element.tag == f"{{{SPREADSHEET_NS}}}row":
+                    element.clear()
+    return ranges
+
+
+def normalize_cell_value(value: Any) -> Any:
+    """
+    Приводит значение ячейки к виду, который отдаёт pandas.read_excel:
+    NA-строки становятся None, целые float — int, даты — datetime.
+    """
+    if isinstance(value, str) and value in PANDAS_NA_STRINGS:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def build_fill_down_map(
+    merged_ranges: Sequence[CellRange],
+    columns: Sequence[int],
+) -> Dict[int, Dict[int, int]]:
+    """
+    Для каждой колонки (0-based) возвращает {первая строка диапазона: последняя строка}
+    по вертикальным объединениям, целиком лежащим в этой колонке.
+    """
+    fill_down: Dict[int, Dict[int, int]] = {column: {} for column in columns}
+    for min_col, min_row, max_col, max_row in merged_ranges:
+        column = min_col - 1
+        if min_col == max_col and column in fill_down:
+            fill_down[column][min_row] = max_row
+    return fill_down
+
+
+def fill_down_merged_rows(
+    rows: Iterable[Sequence[Any]],
+    fill_down: Dict[int, Dict[int, int]],
+) -> Iterator[Row]:
+    """Переносит непустое значение первой строки объединения на остальные строки диапазона."""
+    carried: Dict[int, Tuple[Any, int]] = {}
+    for row_number, row_values in enumerate(rows, start=1):
+        values = list(row_values)
+        for column, ranges in fill_down.items():
+            if column >= len(values):
+                continue
+            end_row = ranges.get(row_number)
+            if end_row is not None:
+                if not is_empty_value(values[column]):
+                    carried[column] = (values[column], end_row)
+                else:
+                    carried.pop(column, None)
+                continue
+            carried_value = carried.get(column)
+            if carried_value is not None:
+                value, until_row = carried_value
+                if row_number <= until_row:
+                    values[column] = value
+                else:
+                    del carried[column]
+        yield tuple(values)
+
+
+def _merged_fill_down(excel_file: str, sheet_name: str, columns: Sequence[int]) -> Dict[int, Dict[int, int]]:
+    if not columns:
+        return {}
+    return build_fill_down_map(read_merged_ranges(excel_file, sheet_name), columns)
+
+
+def read_with_pandas(
+    excel_file: str,
+    sheet_name: str,
+    fill_down_columns: Sequence[int] = (),
+) -> SheetRows:
+    """Читает лист целиком через pandas.read_excel."""
+    # pandas импортируется только этим бэкендом: остальные обходятся без него
+    import pandas as pd
+
+    df = pd.read_excel(excel_file, sheet_name=sheet_name, header=None)
+    fill_down = _merged_fill_down(excel_file, sheet_name, fill_down_columns)
+    return df.shape[1], fill_down_merged_rows(df.itertuples(index=False, name=None), fill_down)
+
+
+def iter_streaming_rows(
+    excel_file: str,
+    sheet_name: str,
+    fill_down_columns: Sequence[int] = (),
+) -> SheetRows:
+    """Потоково читает лист через openpyxl read_only: память не зависит от числа строк."""
+    fill_down = _merged_fill_down(excel_file, sheet_name, fill_down_columns)
+
+    workbook = load_workbook(excel_file, read_only=True, data_only=True)
+    worksheet = workbook[sheet_name]
+    column_count = worksheet.max_column or 0
+
+    def rows() -> Iterator[Row]:
+        try:
+            normalized = (
+                tuple(normalize_cell_value(value) for value in raw_values)
+                for raw_values in worksheet.iter_rows(values_only=True)
+            )
+            yield from fill_down_merged_rows(normalized, fill_down)
+        finally:
+            workbook.close()
+
+    return column_count, rows()
+
+
+def read_with_calamine(
+    excel_file: str,
+    sheet_name: str,
+    fill_down_columns: Sequence[int] = (),
+) -> SheetRows:
+    """Читает лист через python-calamine (значения кэша формул, как data_only=True)."""
+    from python_calamine import CalamineWorkbook
+
+    workbook = CalamineWorkbook.from_path(excel_file)
+    # skip_empty_area=False — строки начинаются с A1, как у остальных бэкендов
+    raw_rows = workbook.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+    fill_down = _merged_fill_down(excel_file, sheet_name, fill_down_columns)
+    column_count = max((len(row) for row in raw_rows), default=0)
+
+    normalized = (tuple(normalize_cell_value(value) for value in row) for row in raw_rows)
+    return column_count, fill_down_merged_rows(normalized, fill_down)
+
+
+def parse_csv_number(text: str) -> Any:
+    """
+    Превращает отформатированное число из CSV в int/float.
+
+    Таблица в русской локали: запятая — десятичный разделитель, пробелы — разряды.
+    Если в числе есть и запятая, и точка, запятая считается разделителем разрядов.
+    Не-число возвращается как есть.
+    """
+    match = CSV_NUMBER_PATTERN.match(text)
+    if not match:
+        return text
+    digits = re.sub(r"[\s\u00a0\u202f]", "", match.group(1))
+    if "," in digits and "." in digits:
+        digits = digits.replace(",", "")
+    else:
+        digits = digits.replace(",", ".")
+    try:
+        number = float(digits)
+    except ValueError:
+        return text
+    return int(number) if number.is_integer() else number
+
+
+def parse_csv_cell(text: str) -> Any:
+    """Приводит текст ячейки CSV к значениям, которые отдают xlsx-бэкенды."""
+    value = text.strip()
+    if value in PANDAS_NA_STRINGS:
+        return None
+    date_match = CSV_DATE_PATTERN.match(value)
+    if date_match:
+        day, month, year = (int(part) for part in date_match.groups())
+        try:
+            return datetime(year, month, day)
+        except ValueError:
+            return text
+    number = parse_csv_number(value)
+    # Текст (названия, состав, статусы) сохраняется без обрезки, как в xlsx
+    return text if number is value else number
+
+
+def read_csv_rows(
+    csv_file: str,
+    sheet_name: str = "",
+    fill_down_columns: Sequence[int] = (),
+) -> SheetRows:
+    """
+    Потоково читает выгрузку одной вкладки в CSV.
+
+    sheet_name и fill_down_columns не используются: в CSV одна вкладка и нет объединений.
+    """
+    handle = open(csv_file, encoding="utf-8-sig", newline="")
+    rows_reader = csv.reader(handle)
+    header = next(rows_reader, None)
+
+    def rows() -> Iterator[Row]:
+        try:
+            if header is None:
+                return
+            column_count = len(header)
+            for raw_values in chain([header], rows_reader):
+                values = [parse_csv_cell(value) for value in raw_values]
+                values.extend([None] * (column_count - len(values)))
+                yield tuple(values)
+        finally:
+            handle.close()
+
+    return len(header or ()), rows()
+
+
+SHEET_READERS: Dict[str, SheetReader] = {
+    READER_PANDAS: read_with_pandas,
+    READER_STREAMING: iter_streaming_rows,
+    READER_CALAMINE: read_with_calamine,
+    READER_CSV: read_csv_rows,
+}
+
+
+def is_reader_available(reader: str) -> bool:
+    """Проверяет, установлены ли модули, нужные бэкенду (без их импорта)."""
+    return all(
+        importlib.util.find_spec(module) is not None
+        for module in READER_REQUIREMENTS[reader]
+    )
+
+
+def available_readers() -> List[str]:
+    """Установленные бэкенды в порядке предпочтения для auto."""
+    return [reader for reader in AUTO_READER_ORDER if is_reader_available(reader)]
+
+
+def resolve_reader(reader: str) -> str:
+    """
+    Превращает имя из --reader в конкретный бэкенд.
+
+    auto выбирает самый быстрый установленный бэкенд.
+    """
+    if reader == READER_AUTO:
+        candidates = available_readers()
+        if not candidates:
+            raise ValueError("Не установлен ни один бэкенд чтения Excel")
+        return candidates[0]
+    if reader not in SHEET_READERS:
+        raise ValueError(f"Неизвестный бэкенд чтения Excel: {reader}")
+    if not is_reader_available(reader):
+        modules = ", ".join(READER_REQUIREMENTS[reader])
+        raise ValueError(f"Бэкенд чтения Excel {reader} недоступен: установите {modules}")
+    return reader
+
+
+def read_sheet(
+    reader: str,
+    excel_file: str,
+    sheet_name: str,
+    fill_down_columns: Sequence[int] = (),
+) -> SheetRows:
+    """Читает лист выбранным бэкендом (reader может быть auto)."""
+    return SHEET_READERS[resolve_reader(reader)](excel_file, sheet_name, fill_down_columns)
@@ -1,8 +1,25 @@
 import metaData from "@/data/meta.json";
 
+interface DataMetaProfileStage {
+  name: string;
+  wallSeconds: number;
+  cpuSeconds: number;
+  peakBytes: number;
+}
+
+interface DataMetaProfile {
+  command: string;
+  profiledAt: string;
+  totalWallSeconds: number;
+  totalCpuSeconds: number;
+  peakBytes: number;
+  stages: DataMetaProfileStage[];
+}
+
 interface DataMeta {
   updatedAt?: string;
   source?: string;
+  profile?: DataMetaProfile;
 }
 
 export function getDataMeta(): DataMeta {
@@ -0,0 +1,55 @@
+import { describe, expect, it } from "vitest";
+import { buildCanonicalNameSuffix, expandShipments } from "./shipmentEncoding";
+import type { Product } from "@/types/product";
+
+const products: Product[] = [
+  {
+    id: "auto-001",
+    name: "Жакет из кожи — чёрный",
+    category: "Кожа",
+    excelRows: [2],
+    sizes: ["xs", "s"],
+    inStock: true,
+  },
+];
+
+describe("expandShipments", () => {
+  it("возвращает обычную схему без изменений", () => {
+    const shipments = [{ id: "shipment-1", title: "Поставка №1", status: "В работе 🧵", rawItems: [] }];
+
+    expect(expandShipments(shipments, products)).toBe(shipments);
+  });
+
+  it("восстанавливает overrideName и статусы из компактной схемы", () => {
+    const payload = {
+      schemaVersion: 2,
+      strings: ["В работе 🧵", "В производстве 🛠️"],
+      shipments: [
+        {
+          id: "shipment-2026-1",
+          title: "Поставка №1",
+          status: 0,
+          rawItems: [
+            { productId: "auto-001", sizes: { xs: 2, s: 1 }, status: 1 },
+            { productId: "auto-001", nameSuffix: "  (на уточнении)", sizesUnknown: true },
+          ],
+        },
+      ],
+    };
+
+    const [shipment] = expandShipments(payload, products);
+
+    expect(shipment.status).toBe("В работе 🧵");
+    expect(shipment.rawItems[0].overrideName).toBe("Жакет из кожи — чёрный (XS-2, S-1)");
+    expect(shipment.rawItems[0].status).toBe("В производстве 🛠️");
+    expect(shipment.rawItems[1].overrideName).toBe("Жакет из кожи — чёрный  (на уточнении)");
+  });
+});
+
+describe("buildCanonicalNameSuffix", () => {
+  it("повторяет формат образцов и one size из Excel", () => {
+    expect(buildCanonicalNameSuffix({ sample: true })).toBe(" (образец)");
+    expect(buildCanonicalNameSuffix({ sample: true, sizes: { xs: 1 } })).toBe(" (образец XS-1)");
+    expect(buildCanonicalNameSuffix({ sizes: { OneSize: 5 } })).toBe(" (one size-5)");
+  });
+});
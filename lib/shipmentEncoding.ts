@@ -0,0 +1,100 @@
+/**
+ * Чтение компактной схемы shipments.json (schemaVersion 2).
+ *
+ * Компактная схема хранит позицию по productId и хвосту названия,
+ * а статусы — индексами в общей таблице строк. Логика зеркалит Excel/shipment_encoding.py.
+ */
+
+import type { Product } from "@/types/product";
+import type { ShipmentConfig, ShipmentRawItem, SizeConfig } from "@/types/shipment";
+
+export const COMPACT_SHIPMENTS_SCHEMA_VERSION = 2;
+
+type CompactRawItem = Omit<ShipmentRawItem, "overrideName" | "status"> & {
+  overrideName?: string | null;
+  nameSuffix?: string;
+  status?: number | string;
+};
+
+type CompactShipment = Omit<ShipmentConfig, "status" | "rawItems"> & {
+  status: number | string;
+  rawItems: readonly CompactRawItem[];
+};
+
+export interface CompactShipmentsPayload {
+  schemaVersion: typeof COMPACT_SHIPMENTS_SCHEMA_VERSION;
+  strings: readonly string[];
+  shipments: readonly CompactShipment[];
+}
+
+export function isCompactShipmentsPayload(payload: unknown): payload is CompactShipmentsPayload {
+  return (
+    typeof payload === "object" &&
+    payload !== null &&
+    !Array.isArray(payload) &&
+    (payload as { schemaVersion?: unknown }).schemaVersion === COMPACT_SHIPMENTS_SCHEMA_VERSION
+  );
+}
+
+/**
+ * Восстанавливает хвост названия из sizes и sample: " (XS-7, S-4)", " (образец XS-1)".
+ */
+export function buildCanonicalNameSuffix(item: { sizes?: SizeConfig; sample?: boolean }): string {
+  const sizesPart = Object.entries(item.sizes ?? {})
+    .map(([size, count]) => `${size === "OneSize" ? "one size" : size.toUpperCase()}-${count}`)
+    .join(", ");
+
+  const inner = item.sample ? (sizesPart ? `образец ${sizesPart}` : "образец") : sizesPart;
+  return inner ? ` (${inner})` : "";
+}
+
+function resolveString(value: number | string, strings: readonly string[]): string {
+  return typeof value === "number" ? strings[value] : value;
+}
+
+function expandRawItem(
+  item: CompactRawItem,
+  namesById: ReadonlyMap<string, string>,
+  strings: readonly string[]
+): ShipmentRawItem {
+  const { overrideName, nameSuffix, status, ...rest } = item;
+  const expanded: ShipmentRawItem = { ...rest };
+
+  if (overrideName !== undefined) {
+    if (overrideName !== null) {
+      expanded.overrideName = overrideName;
+    }
+  } else {
+    const catalogName = namesById.get(item.productId);
+    if (catalogName === undefined) {
+      throw new Error(`Unknown productId in compact shipment data: ${item.productId}`);
+    }
+    expanded.overrideName = `${catalogName}${nameSuffix ?? buildCanonicalNameSuffix(item)}`;
+  }
+
+  if (status !== undefined) {
+    expanded.status = resolveString(status, strings);
+  }
+
+  return expanded;
+}
+
+/**
+ * Возвращает поставки в обычной схеме независимо от версии shipments.json.
+ */
+export function expandShipments(
+  payload: unknown,
+  products: readonly Product[]
+): ShipmentConfig[] {
+  if (!isCompactShipmentsPayload(payload)) {
+    return payload as ShipmentConfig[];
+  }
+
+  const namesById = new Map(products.map((product) => [product.id, product.name]));
+
+  return payload.shipments.map((shipment) => ({
+    ...shipment,
+    status: resolveString(shipment.status, payload.strings),
+    rawItems: shipment.rawItems.map((item) => expandRawItem(item, namesById, payload.strings)),
+  }));
+}
@@ -1,11 +1,13 @@
 import shipmentsData from "@/data/shipments.json";
 import type { Product } from "@/types/product";
 import { toBatch } from "./adapters";
+import { getProducts } from "./products";
+import { expandShipments } from "./shipmentEncoding";
 import type { ShipmentConfig, ShipmentWithItems } from "@/types/shipment";
 import { isPaidStatus } from "./statusText";
 
-const SHIPMENTS_CONFIG: readonly ShipmentConfig[] =
-  shipmentsData as readonly ShipmentConfig[];
+// shipments.json может быть записан в компактной схеме (schemaVersion 2) — разворачиваем один раз
+const SHIPMENTS_CONFIG: readonly ShipmentConfig[] = expandShipments(shipmentsData, getProducts());
 
 export const buildShipments = (
   products: readonly Product[],
@@ -1,4 +1,41 @@
+const fs = require("node:fs");
+const path = require("node:path");
+const { PHASE_PRODUCTION_BUILD } = require("next/constants");
+const { GENERATION_DIRS, GENERATION_FILES, snapshotPublishedGeneration } = require("./scripts/published_generation.cjs");
+
 /** @type {import('next').NextConfig} */
 const nextConfig = {};
 
-module.exports = nextConfig;
+const dataDir = path.join(__dirname, "data");
+// Вне data/generations/: оттуда Python удаляет старые генерации при публикации
+const snapshotDir = path.join(__dirname, ".next", "cache", "data-generation");
+
+module.exports = (phase) => {
+  if (phase !== PHASE_PRODUCTION_BUILD) {
+    return nextConfig;
+  }
+
+  // Сборка берёт данные из одной опубликованной генерации (data/CURRENT), а не из
+  // плоских data/*.json, которые перегенерация заменяет по одному
+  const generationId = snapshotPublishedGeneration(dataDir, snapshotDir);
+  if (generationId === null) {
+    return nextConfig;
+  }
+  console.log(`Данные сборки: генерация ${generationId} (data/CURRENT)`);
+
+  return {
+    ...nextConfig,
+    webpack(config) {
+      const aliases = {};
+      const names = GENERATION_FILES.concat(
+        GENERATION_DIRS.filter((name) => fs.existsSync(path.join(snapshotDir, name)))
+      );
+      for (const name of names) {
+        aliases[`@/data/${name}`] = path.join(snapshotDir, name);
+        aliases[path.join(dataDir, name)] = path.join(snapshotDir, name);
+      }
+      config.resolve.alias = { ...config.resolve.alias, ...aliases };
+      return config;
+    },
+  };
+};
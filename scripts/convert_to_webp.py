@@ -48,8 +48,13 @@ def convert_to_webp(input_path: Path, output_path: Path, quality: int = 85) -> t
         print(f"❌ Ошибка при конвертации {input_path.name}: {e}")
         return 0, 0
 
-def main():
-    """Главная функция конвертации"""
+def main() -> dict:
+    """
+    Главная функция конвертации.
+
+    Returns:
+        Сводка: convertedCount, alreadyExistsCount, failedCount
+    """
     # Определяем пути
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
@@ -64,7 +69,7 @@ def main():
     if not jpg_dir.exists():
         print(f"❌ Папка не найдена: {jpg_dir}")
         print(f"💡 Сначала запустите scripts/migrate_images.py для перемещения файлов")
-        return
+        return {"convertedCount": 0, "alreadyExistsCount": 0, "failedCount": 0}
     
     # Находим все JPG/JPG файлы
     image_extensions = ['.jpg', '.jpeg', '.JPG', '.JPEG']
@@ -75,7 +80,7 @@ def main():
     if not image_files:
         print(f"❌ Не найдено изображений в {jpg_dir}")
         print(f"💡 Переместите JPG файлы в папку {jpg_dir}")
-        return
+        return {"convertedCount": 0, "alreadyExistsCount": 0, "failedCount": 0}
     
     print(f"📸 Найдено {len(image_files)} изображений для проверки\n")
     
@@ -84,6 +89,7 @@ def main():
     total_webp_size = 0
     converted_count = 0
     already_exists_count = 0
+    failed_count = 0
     
     # Конвертируем каждое изображение
     for img_path in sorted(image_files):
@@ -114,6 +120,7 @@ def main():
             print(f"✅ {original_size / 1024:.1f} KB → {webp_size / 1024:.1f} KB "
                   f"(-{saved_percent:.1f}%, экономия {saved / 1024:.1f} KB)")
         else:
+            failed_count += 1
             print("❌ Ошибка")
     
     # Итоговая статистика
@@ -131,6 +138,12 @@ def main():
         print(f"   Прирост скорости: ~{total_saved_percent * 0.8:.1f}% (примерно)")
     print(f"{'='*60}")
 
+    return {
+        "convertedCount": converted_count,
+        "alreadyExistsCount": already_exists_count,
+        "failedCount": failed_count,
+    }
+
 if __name__ == "__main__":
     main()
     # Показываем сообщение только при интерактивном запуске (не при автоматическом вызове)
@@ -0,0 +1,80 @@
+// Снимок опубликованной генерации data/ для `next build` (см. Excel/generation_store.py).
+//
+// Python-скрипты пишут каждую генерацию в data/generations/<id>/ и публикуют её заменой
+// указателя data/CURRENT, а плоские data/*.json обновляют копией уже после публикации.
+// Сборка, попавшая на перегенерацию, могла импортировать shipments.json одной генерации
+// и products.json другой. Поэтому next.config.js подменяет импорты @/data/*.json
+// и @/data/product-bundles/* файлами, скопированными из одной опубликованной генерации.
+
+const fs = require("node:fs");
+const path = require("node:path");
+
+// Файлы генерации, которые импортирует приложение (money.json ведётся вручную и в генерацию не входит)
+const GENERATION_FILES = ["shipments.json", "products.json", "meta.json"];
+// Папки генерации: бандлы страницы товара (в генерациях до их переноса папки может не быть)
+const GENERATION_DIRS = ["product-bundles"];
+// Переменная окружения, в которой процесс сборки передаёт выбранную генерацию дочерним процессам
+const PINNED_GENERATION_ENV = "MEHMET_DATA_GENERATION";
+const SNAPSHOT_ATTEMPTS = 5;
+
+function readCurrentGenerationId(dataDir) {
+  try {
+    return fs.readFileSync(path.join(dataDir, "CURRENT"), "utf8").trim() || null;
+  } catch (error) {
+    if (error.code === "ENOENT") {
+      return null;
+    }
+    throw error;
+  }
+}
+
+/**
+ * Копирует файлы текущей генерации в snapshotDir и возвращает её id.
+ *
+ * null — указателя нет (свежий checkout, сборка на Netlify) или его папка пропала:
+ * тогда сборка читает плоские data/*.json, как и Python-читатели.
+ * Опубликованная папка не меняется, поэтому блокировка записи не нужна. Если папку
+ * удалили при публикации следующих генераций, снимок берётся заново по новому указателю.
+ * Повторный вызов в том же процессе сборки (и в его дочерних процессах) возвращает уже
+ * сделанный снимок, чтобы все компиляции видели одну генерацию.
+ */
+function snapshotPublishedGeneration(dataDir, snapshotDir) {
+  const pinnedId = process.env[PINNED_GENERATION_ENV];
+  if (pinnedId) {
+    return pinnedId;
+  }
+
+  for (let attempt = 0; attempt < SNAPSHOT_ATTEMPTS; attempt += 1) {
+    const generationId = readCurrentGenerationId(dataDir);
+    if (generationId === null) {
+      return null;
+    }
+    const generationDir = path.join(dataDir, "generations", generationId);
+    if (!fs.existsSync(generationDir)) {
+      return null;
+    }
+
+    fs.rmSync(snapshotDir, { recursive: true, force: true });
+    fs.mkdirSync(snapshotDir, { recursive: true });
+    try {
+      for (const name of GENERATION_FILES) {
+        fs.copyFileSync(path.join(generationDir, name), path.join(snapshotDir, name));
+      }
+      for (const name of GENERATION_DIRS) {
+        if (fs.existsSync(path.join(generationDir, name))) {
+          fs.cpSync(path.join(generationDir, name), path.join(snapshotDir, name), { recursive: true });
+        }
+      }
+    } catch (error) {
+      if (error.code === "ENOENT") {
+        continue;
+      }
+      throw error;
+    }
+    process.env[PINNED_GENERATION_ENV] = generationId;
+    return generationId;
+  }
+  throw new Error(`Не удалось скопировать опубликованную генерацию из ${dataDir} за ${SNAPSHOT_ATTEMPTS} попыток`);
+}
+
+module.exports = { GENERATION_DIRS, GENERATION_FILES, snapshotPublishedGeneration };
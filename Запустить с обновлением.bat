@@ -15,43 +15,19 @@ echo Starting Mehmet Metrics with data update
 echo ========================================
 echo.
 
-echo [1/5] Downloading sheet from Google Docs...
+echo [1/3] Updating data: download, parse, WebP...
 pushd "Excel" >nul
-python fetch_google_sheet.py
+python pipeline.py --auto
 if %ERRORLEVEL% NEQ 0 (
     popd >nul
     echo.
-    echo ERROR: failed to download sheet from Google Docs
-    echo        refusing to parse stale local Excel data
+    echo ERROR: data update failed
     goto :fail
 )
 popd >nul
 echo.
 
-echo [2/5] Parsing Excel file...
-pushd "Excel" >nul
-python parse_excel.py --auto
-if %ERRORLEVEL% NEQ 0 (
-    popd >nul
-    echo.
-    echo ERROR: Excel parsing failed
-    goto :fail
-)
-popd >nul
-echo.
-
-echo [3/5] Converting images to WebP...
-pushd "scripts" >nul
-python convert_to_webp.py --auto
-if %ERRORLEVEL% NEQ 0 (
-    echo.
-    echo WARNING: image conversion to WebP failed
-    echo          continuing to start the project...
-)
-popd >nul
-echo.
-
-echo [4/5] Running fast startup checks...
+echo [2/3] Running fast startup checks...
 call npm run preflight:fast
 if %ERRORLEVEL% NEQ 0 (
     echo.
@@ -60,7 +36,7 @@ if %ERRORLEVEL% NEQ 0 (
 )
 echo.
 
-echo [5/5] Starting dev server...
+echo [3/3] Starting dev server...
 call "%~dp0scripts\windows\start_dev_server.bat" "%CD%" "http://localhost:3000" "npm run dev"
 if %ERRORLEVEL% NEQ 0 (
     echo.